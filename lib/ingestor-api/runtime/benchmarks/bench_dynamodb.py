@@ -0,0 +1,138 @@
+"""Benchmark request latency with and without reusing the DynamoDB table.
+
+A local HTTP stand-in for DynamoDB answers GetItem with a stored ingestion,
+and ``GET /ingestions/{id}`` is requested sequentially:
+
+* ``per request``: a new ``boto3.resource("dynamodb")`` and table per request,
+  as ``get_table`` used to do, each with a new connection pool
+* ``reused``: the table built once and kept in the app state
+
+Run from lib/ingestor-api/runtime::
+
+    uv run python benchmarks/bench_dynamodb.py
+"""
+
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import boto3
+from boto3.dynamodb.types import TypeSerializer
+
+REQUESTS = 200
+
+ITEM = {
+    "stac_version": "1.0.0",
+    "type": "Feature",
+    "id": "item",
+    "bbox": [172.91, 1.34, 172.95, 1.37],
+    "geometry": {
+        "type": "Polygon",
+        "coordinates": [
+            [[172.91, 1.34], [172.95, 1.34], [172.95, 1.37], [172.91, 1.37]]
+            + [[172.91, 1.34]]
+        ],
+    },
+    "properties": {"datetime": "2020-12-11T22:38:32.125000Z"},
+    "collection": "bench",
+    "links": [],
+    "assets": {},
+}
+
+
+class DynamoDBStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    item: dict = {}
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        type(self).connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        assert self.headers["X-Amz-Target"] == "DynamoDB_20120810.GetItem"
+        body = json.dumps({"Item": self.item}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-amz-json-1.0")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def timed(client, path) -> list:
+    latencies = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        response = client.get(path)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+    return latencies
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), DynamoDBStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    for key, value in {
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+        "AWS_DEFAULT_REGION": "us-east-1",
+        "AWS_ENDPOINT_URL_DYNAMODB": f"http://127.0.0.1:{server.server_port}",
+        "NO_PYDANTIC_SSM_SETTINGS": "1",
+        "DYNAMODB_TABLE": "bench",
+        "DATA_ACCESS_ROLE": "arn:aws:iam::123456789012:role/bench",
+        "STAC_URL": "http://127.0.0.1",
+        "ROOT_PATH": "",
+        "JWKS_URL": "",
+    }.items():
+        os.environ[key] = value
+    sys.path.insert(0, str(Path(__file__).parents[1]))
+    from fastapi.testclient import TestClient
+    from src import dependencies, schemas
+    from src.main import app
+
+    ingestion = schemas.Ingestion(
+        id="item", created_by="bench", status=schemas.Status.queued, item=ITEM
+    )
+    serializer = TypeSerializer()
+    DynamoDBStub.item = {
+        key: serializer.serialize(value)
+        for key, value in ingestion.dynamodb_dict().items()
+    }
+
+    client = TestClient(app)
+    path = "/ingestions/item?provided_by=bench"
+
+    def table_per_request():
+        return boto3.resource("dynamodb").Table(os.environ["DYNAMODB_TABLE"])
+
+    results = {}
+    app.dependency_overrides[dependencies.get_table] = table_per_request
+    DynamoDBStub.connections = 0
+    results["per request"] = (timed(client, path), DynamoDBStub.connections)
+
+    app.dependency_overrides.clear()
+    DynamoDBStub.connections = 0
+    results["reused"] = (timed(client, path), DynamoDBStub.connections)
+
+    print(f"{REQUESTS} sequential GET /ingestions/{{id}}")
+    for name, (latencies, connections) in results.items():
+        print(
+            f"{name:11s}: median {statistics.median(latencies) * 1000:5.1f} ms, "
+            f"p95 {statistics.quantiles(latencies, n=20)[-1] * 1000:5.1f} ms, "
+            f"connections opened: {connections}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark the validation of many assets against a local HTTP stub server.
+
+The stub answers HEAD requests after a fixed latency, like a remote object store,
+and the benchmark compares validating every asset of a batch:
+
+* ``sequential``: one ``requests.head`` per asset, as the validators used to do
+* ``batch``: ``validators.check_assets``, on the pooled async client
+* ``retry``: the same batch again, answered from the cache of results
+
+Run from lib/ingestor-api/runtime::
+
+    uv run python benchmarks/bench_validators.py
+"""
+
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+ASSETS = 500
+HOSTS = 4
+LATENCY_SECONDS = 0.02
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_HEAD(self):
+        time.sleep(LATENCY_SECONDS)
+        self.send_response(404 if self.path.endswith("missing.tif") else 200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    servers = [ThreadingHTTPServer(("127.0.0.1", 0), StubHandler) for _ in range(HOSTS)]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    hrefs = [
+        f"http://127.0.0.1:{servers[i % HOSTS].server_port}/assets/{i}.tif"
+        for i in range(ASSETS - 1)
+    ] + [f"http://127.0.0.1:{servers[0].server_port}/assets/missing.tif"]
+
+    os.environ.setdefault("NO_PYDANTIC_SSM_SETTINGS", "1")
+    os.environ.setdefault("DYNAMODB_TABLE", "bench")
+    os.environ.setdefault("STAC_URL", "http://127.0.0.1")
+    os.environ.setdefault("DATA_ACCESS_ROLE", "arn:aws:iam::123456789012:role/bench")
+    os.environ.setdefault("ROOT_PATH", "")
+    sys.path.insert(0, str(Path(__file__).parents[1]))
+    from src import validators
+
+    start = time.perf_counter()
+    for href in hrefs:
+        requests.head(href)
+    sequential = time.perf_counter() - start
+
+    # start the validator's loop
+    validators.check_assets([f"http://127.0.0.1:{servers[0].server_port}/warm.tif"])
+    start = time.perf_counter()
+    errors = validators.asset_errors(hrefs)
+    batch = time.perf_counter() - start
+    assert list(errors) == hrefs[-1:], errors
+
+    start = time.perf_counter()
+    assert validators.asset_errors(hrefs) == errors
+    retry = time.perf_counter() - start
+
+    print(f"{ASSETS} assets on {HOSTS} hosts, {LATENCY_SECONDS * 1000:.0f} ms latency")
+    print(f"sequential: {sequential:6.2f} s")
+    print(f"batch     : {batch:6.2f} s ({sequential / batch:.1f}x)")
+    print(f"retry     : {retry:6.2f} s, cache {validators.asset_cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Load test of the ingestion routes on a single worker.
+
+Concurrent users create ingestions and list them through one event loop, like
+one uvicorn or Mangum worker. DynamoDB is mocked with moto and every call to it
+is delayed by DYNAMODB_LATENCY_SECONDS, like a round trip to the service. The
+STAC API and the assets are served by local stub servers with their own latency.
+Each ingestion has assets of its own, so that their checks are not cached.
+
+Run from lib/ingestor-api/runtime::
+
+    uv run python benchmarks/load_test.py
+"""
+
+import asyncio
+import copy
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import boto3
+import httpx
+from moto import mock_dynamodb
+
+USERS = 20
+REQUESTS_PER_USER = 10
+DYNAMODB_LATENCY_SECONDS = 0.01
+HTTP_LATENCY_SECONDS = 0.01
+
+ITEM = {
+    "stac_version": "1.0.0",
+    "type": "Feature",
+    "id": "item",
+    "bbox": [172.91, 1.34, 172.95, 1.37],
+    "geometry": {
+        "type": "Polygon",
+        "coordinates": [
+            [[172.91, 1.34], [172.95, 1.34], [172.95, 1.37], [172.91, 1.37]]
+            + [[172.91, 1.34]]
+        ],
+    },
+    "properties": {"datetime": "2020-12-11T22:38:32.125000Z"},
+    "collection": "load-test",
+    "links": [],
+    "assets": {},
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def respond(self, body: bytes = b""):
+        time.sleep(HTTP_LATENCY_SECONDS)
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        return body
+
+    def do_HEAD(self):
+        self.respond()
+
+    def do_GET(self):
+        self.wfile.write(self.respond(b"{}"))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_table(table_name: str):
+    table = boto3.resource("dynamodb").create_table(
+        TableName=table_name,
+        AttributeDefinitions=[
+            {"AttributeName": "created_by", "AttributeType": "S"},
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "status", "AttributeType": "S"},
+            {"AttributeName": "created_at", "AttributeType": "S"},
+        ],
+        KeySchema=[
+            {"AttributeName": "created_by", "KeyType": "HASH"},
+            {"AttributeName": "id", "KeyType": "RANGE"},
+        ],
+        BillingMode="PAY_PER_REQUEST",
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": "status",
+                "KeySchema": [
+                    {"AttributeName": "status", "KeyType": "HASH"},
+                    {"AttributeName": "created_at", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            }
+        ],
+    )
+    table.meta.client.meta.events.register(
+        "before-send.dynamodb",
+        lambda **kwargs: time.sleep(DYNAMODB_LATENCY_SECONDS),
+        unique_id="load-test-latency",
+    )
+    return table
+
+
+async def user(client: httpx.AsyncClient, asset_url: str, n: int, latencies: list):
+    for i in range(REQUESTS_PER_USER):
+        item = copy.deepcopy(ITEM)
+        item["id"] = f"item-{n}-{i}"
+        item["assets"] = {
+            "data": {"href": f"{asset_url}/{item['id']}.tif", "roles": ["data"]}
+        }
+
+        start = time.perf_counter()
+        response = await client.post("/ingestions", json=item)
+        assert response.status_code == 201, response.text
+        response = await client.get("/ingestions", params={"limit": 10})
+        assert response.status_code == 200, response.text
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(app, asset_url: str):
+    latencies = []
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://ingestor"
+    ) as client:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(user(client, asset_url, n, latencies) for n in range(USERS))
+        )
+        elapsed = time.perf_counter() - start
+
+    requests = 2 * len(latencies)
+    print(
+        f"{USERS} users, {requests} requests in {elapsed:.2f} s: "
+        f"{requests / elapsed:.1f} requests/s, "
+        f"median create+list {statistics.median(latencies) * 1000:.0f} ms"
+    )
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stub_url = f"http://127.0.0.1:{server.server_port}"
+
+    for key, value in {
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+        "AWS_DEFAULT_REGION": "us-east-1",
+        "NO_PYDANTIC_SSM_SETTINGS": "1",
+        "DYNAMODB_TABLE": "load-test",
+        "DATA_ACCESS_ROLE": "arn:aws:iam::123456789012:role/load-test",
+        "ROOT_PATH": "",
+        "JWKS_URL": "",
+        "STAC_URL": stub_url,
+    }.items():
+        os.environ[key] = value
+    sys.path.insert(0, str(Path(__file__).parents[1]))
+    from src import dependencies
+    from src.main import app
+
+    with mock_dynamodb():
+        table = create_table(os.environ["DYNAMODB_TABLE"])
+        app.dependency_overrides[dependencies.get_table] = lambda: table
+        app.dependency_overrides[dependencies.get_username] = lambda: "load-test"
+        print(
+            f"DynamoDB latency {DYNAMODB_LATENCY_SECONDS * 1000:.0f} ms, "
+            f"HTTP latency {HTTP_LATENCY_SECONDS * 1000:.0f} ms"
+        )
+        asyncio.run(run(app, f"{stub_url}/assets"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pydantic
+
+from . import config, schemas, services, validators
+
+NDJSON_CONTENT_TYPES = ["application/x-ndjson", "application/ndjson"]
+
+
+def parse_items(body: bytes, content_type: str) -> List[Any]:
+    """
+    Parse the items of a bulk request, either a JSON array or newline-delimited JSON
+    """
+    if content_type.split(";")[0].strip() in NDJSON_CONTENT_TYPES:
+        try:
+            return [json.loads(line) for line in body.splitlines() if line.strip()]
+        except ValueError as e:
+            raise ValueError(f"Invalid NDJSON: {e}") from e
+
+    try:
+        items = json.loads(body)
+    except ValueError as e:
+        raise ValueError(f"Invalid JSON: {e}") from e
+    if isinstance(items, dict) and items.get("type") == "FeatureCollection":
+        items = items.get("features")
+    if not isinstance(items, list):
+        raise ValueError("Expected a JSON array of items")
+    return items
+
+
+def format_errors(error: pydantic.ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(loc) for loc in e['loc'])}: {e['msg']}" for e in error.errors()
+    ]
+
+
+def collection_errors(collection_ids: List[str]) -> Dict[str, str]:
+    """
+    Check that each distinct collection exists, concurrently
+    """
+
+    def check(collection_id: str) -> Optional[str]:
+        try:
+            validators.collection_exists(collection_id=collection_id)
+        except Exception as e:
+            return str(e)
+        return None
+
+    collection_ids = list(dict.fromkeys(collection_ids))
+    if not collection_ids:
+        return {}
+    with ThreadPoolExecutor(
+        max_workers=min(config.settings.validation_concurrency, len(collection_ids))
+    ) as executor:
+        results = executor.map(check, collection_ids)
+        return {
+            collection_id: error
+            for collection_id, error in zip(collection_ids, results)
+            if error
+        }
+
+
+def create_ingestions(
+    raw_items: List[Any], username: str, db: services.Database
+) -> schemas.BulkIngestionResponse:
+    """
+    Validate many items and queue the valid ones
+
+    Every distinct collection and asset href is checked once, concurrently, and the
+    ingestions of all valid items are written in batches. Each item gets its own
+    result, so invalid items do not prevent the others from being queued. An id can
+    only be queued once per request, so later items with the same id are rejected.
+    """
+    results = [schemas.BulkIngestionResult(index=i) for i in range(len(raw_items))]
+    items: Dict[int, schemas.IngestibleItem] = {}
+    indexes_by_id: Dict[str, int] = {}
+    for result, raw_item in zip(results, raw_items):
+        if isinstance(raw_item, dict) and isinstance(raw_item.get("id"), str):
+            result.id = raw_item["id"]
+        try:
+            item = schemas.IngestibleItem.model_validate(raw_item)
+        except pydantic.ValidationError as e:
+            result.errors = format_errors(e)
+            continue
+        if item.id in indexes_by_id:
+            result.errors.append(
+                f"id: duplicates the item at index {indexes_by_id[item.id]}"
+            )
+            continue
+        indexes_by_id[item.id] = result.index
+        items[result.index] = item
+
+    missing_collections = collection_errors([item.collection for item in items.values()])
+    inaccessible_assets = validators.asset_errors(
+        asset.href for item in items.values() for asset in item.assets.values()
+    )
+
+    ingestions = []
+    for index, item in items.items():
+        result = results[index]
+        if item.collection in missing_collections:
+            result.errors.append(f"collection: {missing_collections[item.collection]}")
+        for key, asset in item.assets.items():
+            if asset.href in inaccessible_assets:
+                result.errors.append(
+                    f"assets.{key}.href: {inaccessible_assets[asset.href]}"
+                )
+        if result.errors:
+            continue
+
+        result.ingestion = schemas.Ingestion(
+            id=item.id,
+            created_by=username,
+            item=item,
+            status=schemas.Status.queued,
+            updated_at=datetime.now(),
+        )
+        ingestions.append(result.ingestion)
+
+    db.write_many(ingestions)
+    return schemas.BulkIngestionResponse(
+        queued=len(ingestions),
+        failed=len(results) - len(ingestions),
+        results=results,
+    )
@@ -1,6 +1,6 @@
 import os
 from getpass import getuser
-from typing import Annotated, Optional
+from typing import Annotated, Literal, Optional
 
 from pydantic import (
     AfterValidator,
@@ -45,6 +45,69 @@ class Settings(BaseSettings):
         description="Path from where to serve this URL.", default=False
     )
 
+    dynamodb_max_pool_connections: int = Field(
+        default=50, description="Size of the DynamoDB connection pool"
+    )
+
+    ingestion_failure_strategy: Literal["bisect", "per-collection", "per-item"] = Field(
+        default="bisect",
+        description=(
+            "How the stream handler finds the ingestions that failed a batch load"
+        ),
+    )
+
+    bulk_ingestion_max_items: int = Field(
+        default=1000, description="Maximum number of items per bulk ingestion request"
+    )
+
+    validation_concurrency: int = Field(
+        default=16, description="Number of assets validated at the same time"
+    )
+
+    validation_concurrency_per_host: int = Field(
+        default=8,
+        description="Number of assets of one host or bucket validated at the same time",
+    )
+
+    validation_timeout: float = Field(
+        default=10.0, description="Timeout in seconds of each asset validation request"
+    )
+
+    asset_cache_size: int = Field(
+        default=10000,
+        description="Number of asset validation results cached, 0 to disable the cache",
+    )
+
+    asset_cache_ttl: float = Field(
+        default=600.0, description="Seconds for which accessible assets are cached"
+    )
+
+    asset_cache_failure_ttl: float = Field(
+        default=30.0, description="Seconds for which inaccessible assets are cached"
+    )
+
+    collection_lookup: Literal["stac", "pgstac"] = Field(
+        default="stac",
+        description="Where to check that collections exist, the STAC API or pgSTAC",
+    )
+
+    collection_lookup_pool_size: int = Field(
+        default=4, description="Number of pgSTAC connections for collection lookups"
+    )
+
+    collection_cache_size: int = Field(
+        default=1000,
+        description="Number of collection lookups cached, 0 to disable the cache",
+    )
+
+    collection_cache_ttl: float = Field(
+        default=300.0, description="Seconds for which existing collections are cached"
+    )
+
+    collection_cache_failure_ttl: float = Field(
+        default=30.0, description="Seconds for which missing collections are cached"
+    )
+
     class Config(SsmBaseSettings):
         env_file: str = ".env"
 
@@ -1,10 +1,16 @@
+import base64
+import hashlib
+import json
 import logging
-from typing import Optional
+import threading
+import time
+from typing import Dict, Optional
 
 import boto3
 import requests
 from authlib.jose import JsonWebKey, JsonWebToken, JWTClaims, KeySet, errors
-from cachetools import TTLCache, cached
+from botocore.config import Config
+from cachetools import TLRUCache
 from fastapi import Depends, HTTPException, Request, security
 
 from . import config, services
@@ -22,24 +28,140 @@ def get_jwks_url(settings: config.Settings = Depends(get_settings)) -> str:
     return settings.jwks_url
 
 
-@cached(TTLCache(maxsize=1, ttl=3600))
+JWKS_TTL_SECONDS = 3600
+# keys older than this are refreshed in the background while still being served
+JWKS_REFRESH_AFTER_SECONDS = 3000
+# a token signed with an unknown kid refetches the JWKS at most this often
+JWKS_MIN_REFETCH_SECONDS = 60
+JWKS_REQUEST_TIMEOUT_SECONDS = 5
+
+TOKEN_CACHE_SIZE = 1024
+TOKEN_CACHE_TTL_SECONDS = 300
+
+
+class JwksCache:
+    """
+    JWKS of one URL, refreshed in the background before it expires and
+    refetched when a token is signed with a key it does not have yet
+    """
+
+    def __init__(self, jwks_url: str):
+        self.jwks_url = jwks_url
+        self.keys: Optional[KeySet] = None
+        self.fetched_at = 0.0
+        self.last_fetch_attempt = 0.0
+        self.refreshing = False
+        self.lock = threading.Lock()
+
+    def fetch(self) -> KeySet:
+        self.last_fetch_attempt = time.monotonic()
+        with requests.get(
+            self.jwks_url, timeout=JWKS_REQUEST_TIMEOUT_SECONDS
+        ) as response:
+            response.raise_for_status()
+            keys = JsonWebKey.import_key_set(response.json())
+        self.keys, self.fetched_at = keys, time.monotonic()
+        return keys
+
+    def refresh_in_background(self) -> None:
+        try:
+            self.fetch()
+        except Exception:
+            logger.exception("Unable to refresh JWKS")
+        finally:
+            self.refreshing = False
+
+    def get(self, kid: Optional[str] = None) -> KeySet:
+        now = time.monotonic()
+        with self.lock:
+            if self.keys is None or now - self.fetched_at > JWKS_TTL_SECONDS:
+                return self.fetch()
+
+            if kid is not None and not has_key(self.keys, kid):
+                if now - self.last_fetch_attempt >= JWKS_MIN_REFETCH_SECONDS:
+                    logger.info(f"Refetching JWKS for unknown kid {kid}")
+                    return self.fetch()
+                return self.keys
+
+            keys = self.keys
+            if now - self.fetched_at > JWKS_REFRESH_AFTER_SECONDS and not self.refreshing:
+                self.refreshing = True
+                threading.Thread(target=self.refresh_in_background, daemon=True).start()
+
+            return keys
+
+
+_jwks_caches: Dict[str, JwksCache] = {}
+_jwks_caches_lock = threading.Lock()
+
+_verified_tokens: TLRUCache = TLRUCache(
+    maxsize=TOKEN_CACHE_SIZE,
+    # cached claims expire with the token, and after TOKEN_CACHE_TTL_SECONDS
+    ttu=lambda _key, entry, now: (
+        now + min(entry[1] - time.time(), TOKEN_CACHE_TTL_SECONDS)
+    ),
+)
+_verified_tokens_lock = threading.Lock()
+
+
+def has_key(keys: KeySet, kid: str) -> bool:
+    try:
+        keys.find_by_kid(kid)
+    except ValueError:
+        return False
+    return True
+
+
+def get_jwks_cache(jwks_url: str = Depends(get_jwks_url)) -> JwksCache:
+    with _jwks_caches_lock:
+        if jwks_url not in _jwks_caches:
+            _jwks_caches[jwks_url] = JwksCache(jwks_url)
+        return _jwks_caches[jwks_url]
+
+
 def get_jwks(jwks_url: str = Depends(get_jwks_url)) -> KeySet:
-    with requests.get(jwks_url) as response:
-        response.raise_for_status()
-        return JsonWebKey.import_key_set(response.json())
+    return get_jwks_cache(jwks_url).get()
+
+
+def token_kid(token: str) -> Optional[str]:
+    """
+    Return the kid of a JWT's header, without verifying it
+    """
+    try:
+        header_segment = token.split(".", 1)[0]
+        header_segment += "=" * (-len(header_segment) % 4)
+        header = json.loads(base64.urlsafe_b64decode(header_segment))
+    except ValueError as e:
+        raise errors.DecodeError("Invalid token header") from e
+    if not isinstance(header, dict):
+        raise errors.DecodeError("Invalid token header")
+
+    kid = header.get("kid")
+    if kid is not None and not isinstance(kid, str):
+        raise errors.DecodeError("Invalid token kid")
+    return kid
 
 
 def decode_token(
     token: security.HTTPAuthorizationCredentials = Depends(token_scheme),
-    jwks: KeySet = Depends(get_jwks),
+    jwks_cache: JwksCache = Depends(get_jwks_cache),
 ) -> JWTClaims:
     """
     Validate & decode JWT
+
+    Verified claims are cached by a hash of the token until the token expires,
+    so repeated requests with the same token skip the signature verification.
     """
+    token_hash = hashlib.sha256(token.credentials.encode("utf-8")).hexdigest()
+    with _verified_tokens_lock:
+        cached = _verified_tokens.get(token_hash)
+    if cached is not None:
+        return cached[0]
+
     try:
         claims = JsonWebToken(["RS256"]).decode(
             s=token.credentials,
-            key=jwks,
+            key=jwks_cache.get(kid=token_kid(token.credentials)),
             claims_options={
                 # # Example of validating audience to match expected value
                 # "aud": {"essential": True, "values": [APP_CLIENT_ID]}
@@ -51,11 +173,15 @@ def decode_token(
             claims.setdefault("aud", claims["client_id"])
 
         claims.validate()
-        return claims
-    except errors.JoseError as e:
+    except (errors.JoseError, ValueError) as e:
         logger.exception("Unable to decode token")
         raise HTTPException(status_code=403, detail="Bad auth token") from e
 
+    if "exp" in claims:
+        with _verified_tokens_lock:
+            _verified_tokens[token_hash] = (claims, claims["exp"])
+    return claims
+
 
 def get_username_from_token(
     claims: Optional[security.HTTPBasicCredentials] = Depends(decode_token),
@@ -72,9 +198,37 @@ get_username = (
 )
 
 
-def get_table(settings: config.Settings = Depends(get_settings)):
-    client = boto3.resource("dynamodb")
-    return client.Table(settings.dynamodb_table)
+_table_lock = threading.Lock()
+
+
+def build_table(settings: config.Settings):
+    """
+    Build the DynamoDB table, with a connection pool sized for the worker threads
+    """
+    resource = boto3.resource(
+        "dynamodb",
+        config=Config(
+            max_pool_connections=settings.dynamodb_max_pool_connections,
+            retries={"max_attempts": 5, "mode": "adaptive"},
+            tcp_keepalive=True,
+            connect_timeout=5,
+            read_timeout=10,
+        ),
+    )
+    return resource.Table(settings.dynamodb_table)
+
+
+def get_table(request: Request, settings: config.Settings = Depends(get_settings)):
+    """
+    DynamoDB table of the app, built on first use and shared by all requests
+    """
+    table = getattr(request.app.state, "dynamodb_table", None)
+    if table is None:
+        with _table_lock:
+            table = getattr(request.app.state, "dynamodb_table", None)
+            if table is None:
+                table = request.app.state.dynamodb_table = build_table(settings)
+    return table
 
 
 def get_db(table=Depends(get_table)) -> services.Database:
@@ -1,13 +1,18 @@
+import functools
 import os
 from datetime import datetime
-from typing import TYPE_CHECKING, Iterator, List, Optional, Sequence
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence, Tuple
 
+import psycopg
 from boto3.dynamodb.types import TypeDeserializer
+from psycopg_pool import ConnectionPool
+from pypgstac.db import PgstacDB
 
 from .config import settings
-from .dependencies import get_table
+from .dependencies import build_table
+from .loader import Loader
 from .schemas import Ingestion, Status
-from .utils import get_db_credentials, load_items
+from .utils import DbCreds, get_db_credentials, load_ingestions
 
 if TYPE_CHECKING:
     from aws_lambda_typing import context as context_
@@ -15,6 +20,87 @@ if TYPE_CHECKING:
     from aws_lambda_typing.events.dynamodb_stream import DynamodbRecord
 
 
+# seconds to wait for a pgSTAC connection before giving up, e.g. after the
+# credentials were rotated
+DB_CONNECT_TIMEOUT_SECONDS = 10
+
+# kept across invocations of a container
+_db_creds: Optional[DbCreds] = None
+_db: Optional[PgstacDB] = None
+_loader: Optional[Loader] = None
+
+
+def get_db(refresh: bool = False) -> PgstacDB:
+    """
+    Return the pgSTAC connection kept across invocations
+
+    The credentials and the connection are reused until refresh is set, after they
+    failed, when the credentials are fetched again in case the secret was rotated.
+    """
+    global _db_creds, _db
+
+    if refresh:
+        if _db is not None:
+            _db.close()
+        _db_creds = _db = None
+
+    if _db is None:
+        if _db_creds is None:
+            _db_creds = get_db_credentials(os.environ["DB_SECRET_ARN"])
+        pool = ConnectionPool(
+            conninfo=_db_creds.dsn_string,
+            min_size=0,
+            max_size=1,
+            timeout=DB_CONNECT_TIMEOUT_SECONDS,
+            open=True,
+        )
+        try:
+            _db = PgstacDB(dsn=_db_creds.dsn_string, pool=pool, debug=True)
+        except Exception:
+            pool.close()
+            raise
+
+    return _db
+
+
+def get_loader(refresh: bool = False) -> Loader:
+    """
+    Return the pgSTAC loader kept across invocations, on the kept connection
+
+    The database version is only checked when the loader is created. pypgstac caches
+    each collection's base item and partitioning, which would go stale once the
+    collection is updated, so that cache is cleared on every later call.
+    """
+    global _loader
+
+    if refresh:
+        _loader = None
+
+    if _loader is None:
+        _loader = Loader(db=get_db(refresh=refresh))
+    else:
+        _loader.clear_collection_cache()
+
+    return _loader
+
+
+def load_items(ingestions: Sequence[Ingestion]):
+    """
+    Load the ingestions into pgSTAC, reconnecting with fresh credentials once if the
+    connection fails
+    """
+    try:
+        return load_ingestions(get_loader(), ingestions)
+    except psycopg.OperationalError as e:
+        print(f"Reconnecting to pgSTAC after: {e}")
+        return load_ingestions(get_loader(refresh=True), ingestions)
+
+
+@functools.cache
+def get_table():
+    return build_table(settings)
+
+
 def get_queued_ingestions(records: List["DynamodbRecord"]) -> Iterator[Ingestion]:
     deserializer = TypeDeserializer()
     for record in records:
@@ -32,26 +118,93 @@ def update_dynamodb(
     ingestions: Sequence[Ingestion],
     status: Status,
     message: Optional[str] = None,
+    messages: Optional[Sequence[Optional[str]]] = None,
 ):
     """
     Bulk update DynamoDB with ingestion results.
+
+    `messages` gives each ingestion a message of its own, instead of `message`.
     """
     # Update records in DynamoDB
-    print(f"Updating ingested items status in DynamoDB, marking as {status}...")
-    table = get_table(settings)
+    print(
+        f"Updating {len(ingestions)} ingested items status in DynamoDB, "
+        f"marking as {status}..."
+    )
+    if messages is None:
+        messages = [message] * len(ingestions)
+    table = get_table()
     with table.batch_writer(overwrite_by_pkeys=["created_by", "id"]) as batch:
-        for ingestion in ingestions:
+        for ingestion, ingestion_message in zip(ingestions, messages):
             batch.put_item(
                 Item=ingestion.model_copy(
                     update={
                         "status": status,
-                        "message": message,
+                        "message": ingestion_message,
                         "updated_at": datetime.now(),
                     }
                 ).dynamodb_dict()
             )
 
 
+def isolate_failures(
+    ingestions: List[Ingestion], error: Exception, strategy: str
+) -> Tuple[List[Ingestion], List[Tuple[Ingestion, str]]]:
+    """
+    Load the ingestions of a failed batch again in smaller batches, so that only
+    the offending ingestions fail, each with its own error
+
+    * bisect: load each half of a failed batch, down to single ingestions
+    * per-collection: load the ingestions of each collection together
+    * per-item: load every ingestion on its own
+
+    Returns the loaded ingestions, and the failed ones with their errors.
+    """
+    loaded: List[Ingestion] = []
+    failed: List[Tuple[Ingestion, str]] = []
+    db_error: Optional[Exception] = None
+
+    def load(batch: List[Ingestion]) -> Optional[Exception]:
+        """Load a batch, returning its error if it has to be isolated further"""
+        nonlocal db_error
+        if db_error is None:
+            try:
+                load_items(ingestions=batch)
+                loaded.extend(batch)
+                return None
+            except psycopg.OperationalError as e:
+                db_error = e
+            except Exception as e:
+                return e
+        # the database is unavailable, no smaller batch would load either
+        failed.extend((ingestion, str(db_error)) for ingestion in batch)
+        return None
+
+    def bisect(batch: List[Ingestion], batch_error: Exception):
+        if len(batch) == 1:
+            failed.append((batch[0], str(batch_error)))
+            return
+        middle = len(batch) // 2
+        for half in [batch[:middle], batch[middle:]]:
+            if (half_error := load(half)) is not None:
+                bisect(half, half_error)
+
+    if strategy == "bisect":
+        bisect(ingestions, error)
+    else:
+        if strategy == "per-collection":
+            groups: Dict[Optional[str], List[Ingestion]] = {}
+            for ingestion in ingestions:
+                groups.setdefault(ingestion.item.collection, []).append(ingestion)
+            batches = list(groups.values())
+        else:
+            batches = [[ingestion] for ingestion in ingestions]
+        for batch in batches:
+            if (batch_error := load(batch)) is not None:
+                failed.extend((ingestion, str(batch_error)) for ingestion in batch)
+
+    return loaded, failed
+
+
 def handler(event: "events.DynamoDBStreamEvent", context: "context_.Context"):
     # Parse input
     ingestions = list(get_queued_ingestions(event["Records"]))
@@ -60,23 +213,31 @@ def handler(event: "events.DynamoDBStreamEvent", context: "context_.Context"):
         return
 
     # Insert into PgSTAC DB
-    outcome = Status.succeeded
-    message = None
+    loaded, failed = ingestions, []
     try:
-        load_items(
-            creds=get_db_credentials(os.environ["DB_SECRET_ARN"]),
-            ingestions=ingestions,
-        )
+        load_items(ingestions=ingestions)
     except Exception as e:
         print(f"Encountered failure loading items into pgSTAC: {e}")
-        outcome = Status.failed
-        message = str(e)
+        if isinstance(e, psycopg.OperationalError) or len(ingestions) == 1:
+            loaded, failed = [], [(ingestion, str(e)) for ingestion in ingestions]
+        else:
+            print(
+                f"Isolating failures of {len(ingestions)} ingestions with the "
+                f"{settings.ingestion_failure_strategy} strategy"
+            )
+            loaded, failed = isolate_failures(
+                ingestions, e, settings.ingestion_failure_strategy
+            )
 
     # Update DynamoDB with outcome
-    update_dynamodb(
-        ingestions=ingestions,
-        status=outcome,
-        message=message,
-    )
+    if loaded:
+        update_dynamodb(ingestions=loaded, status=Status.succeeded)
+    if failed:
+        print(f"Failed to load {len(failed)} of {len(ingestions)} ingestions")
+        update_dynamodb(
+            ingestions=[ingestion for ingestion, _ in failed],
+            status=Status.failed,
+            messages=[message for _, message in failed],
+        )
 
     print("Completed batch...")
@@ -12,9 +12,21 @@ class Loader(BaseLoader):
 
     def __init__(self, db) -> None:
         super().__init__(db)
+        self._version_checked = False
         self.check_version()
         self.conn = self.db.connect()
 
+    def check_version(self) -> None:
+        """Check the database version once, as a loader keeps to one connection."""
+        if not self._version_checked:
+            super().check_version()
+            self._version_checked = True
+
+    def clear_collection_cache(self) -> None:
+        """Forget the collections cached by collection_json, which go stale once
+        a collection is updated."""
+        BaseLoader.collection_json.cache_clear()
+
     def delete_collection(self, collection_id: str) -> None:
         with self.conn.cursor() as cur:
             with self.conn.transaction():
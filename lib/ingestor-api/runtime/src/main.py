@@ -1,7 +1,8 @@
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 
+from . import bulk, config, dependencies, schemas, services, validators
 from . import collection as collection_loader
-from . import config, dependencies, schemas, services
 
 app = FastAPI(
     root_path=config.settings.root_path,
@@ -14,8 +15,11 @@ async def list_ingestions(
     list_request: schemas.ListIngestionRequest = Depends(),
     db: services.Database = Depends(dependencies.get_db),
 ):
-    return db.fetch_many(
-        status=list_request.status, next=list_request.next, limit=list_request.limit
+    return await run_in_threadpool(
+        db.fetch_many,
+        status=list_request.status,
+        next=list_request.next,
+        limit=list_request.limit,
     )
 
 
@@ -26,16 +30,56 @@ async def list_ingestions(
     status_code=201,
 )
 async def create_ingestion(
-    item: schemas.AccessibleItem,
+    item: schemas.IngestibleItem,
     username: str = Depends(dependencies.get_username),
     db: services.Database = Depends(dependencies.get_db),
 ) -> schemas.Ingestion:
-    return schemas.Ingestion(
+    # the collection and assets are checked off the event loop
+    item = await run_in_threadpool(schemas.AccessibleItem.from_request_item, item)
+    ingestion = schemas.Ingestion(
         id=item.id,
         created_by=username,
         item=item,
         status=schemas.Status.queued,
-    ).enqueue(db)
+    )
+    return await run_in_threadpool(ingestion.enqueue, db)
+
+
+@app.post(
+    "/ingestions/bulk",
+    response_model=schemas.BulkIngestionResponse,
+    tags=["Ingestion"],
+)
+async def create_bulk_ingestion(
+    request: Request,
+    username: str = Depends(dependencies.get_username),
+    db: services.Database = Depends(dependencies.get_db),
+    settings: config.Settings = Depends(dependencies.get_settings),
+) -> schemas.BulkIngestionResponse:
+    """
+    Queue many items at once
+
+    The body is a JSON array of STAC items, or newline-delimited JSON with the
+    `application/x-ndjson` content type. Each item gets its own result with either
+    its ingestion or its validation errors.
+    """
+    try:
+        raw_items = bulk.parse_items(
+            await request.body(), request.headers.get("content-type", "")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    if len(raw_items) > settings.bulk_ingestion_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=(
+                f"Too many items: {len(raw_items)}, "
+                f"the maximum is {settings.bulk_ingestion_max_items}"
+            ),
+        )
+
+    return await run_in_threadpool(bulk.create_ingestions, raw_items, username, db)
 
 
 @app.get(
@@ -92,6 +136,7 @@ def publish_collection(collection: schemas.StacCollection):
     # pgstac create collection
     try:
         collection_loader.ingest(collection)
+        validators.invalidate_collection(collection.id)
         return {f"Successfully published: {collection.id}"}
     except Exception as e:
         raise HTTPException(
@@ -108,6 +153,7 @@ def publish_collection(collection: schemas.StacCollection):
 def delete_collection(collection_id: str):
     try:
         collection_loader.delete(collection_id=collection_id)
+        validators.invalidate_collection(collection_id)
         return {f"Successfully deleted: {collection_id}"}
     except Exception as e:
         print(e)
@@ -7,12 +7,15 @@ from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 from urllib.parse import urlparse
 
 from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from pydantic import (
     BaseModel,
     Json,
     PositiveInt,
+    ValidationError,
     dataclasses,
     field_validator,
+    model_validator,
 )
 from stac_pydantic import Collection, Item, shared
 
@@ -25,6 +28,12 @@ if TYPE_CHECKING:
 class AccessibleAsset(shared.Asset):
     @field_validator("href")
     def is_accessible(cls, href):
+        checked = validators.checked_assets.get()
+        if checked is not None and href in checked:
+            if checked[href]:
+                raise ValueError(checked[href])
+            return href
+
         url = urlparse(href)
 
         if url.scheme in ["https", "http"]:
@@ -48,6 +57,52 @@ class AccessibleItem(Item):
         validators.collection_exists(collection_id=collection)
         return collection
 
+    @model_validator(mode="wrap")
+    @classmethod
+    def check_assets_in_batch(cls, data, handler):
+        """
+        Check all the assets of the item concurrently before they are validated
+        """
+        assets = data.get("assets") if isinstance(data, dict) else None
+        if not isinstance(assets, dict):
+            return handler(data)
+
+        hrefs = [
+            asset["href"]
+            for asset in assets.values()
+            if isinstance(asset, dict) and isinstance(asset.get("href"), str)
+        ]
+        token = validators.checked_assets.set(validators.check_assets(hrefs))
+        try:
+            return handler(data)
+        finally:
+            validators.checked_assets.reset(token)
+
+    @classmethod
+    def from_request_item(cls, item: "IngestibleItem") -> "AccessibleItem":
+        """
+        Validate the collection and assets of an item from a request body
+
+        Validation errors are raised as request validation errors, located in the
+        request body.
+        """
+        try:
+            return cls.model_validate(
+                item.model_dump(mode="json", by_alias=True, exclude_unset=True)
+            )
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**error, "loc": ("body", *error["loc"])} for error in e.errors()]
+            ) from e
+
+
+class IngestibleItem(Item):
+    """
+    Item with a collection, before its collection and assets are validated
+    """
+
+    collection: str  # override because default is str | None
+
 
 class StacCollection(Collection):
     id: str
@@ -135,6 +190,19 @@ class ListIngestionResponse(BaseModel):
         return next
 
 
+class BulkIngestionResult(BaseModel):
+    index: int
+    id: Optional[str] = None
+    ingestion: Optional[Ingestion] = None
+    errors: List[str] = []
+
+
+class BulkIngestionResponse(BaseModel):
+    queued: int
+    failed: int
+    results: List[BulkIngestionResult]
+
+
 class UpdateIngestionRequest(BaseModel):
     status: Optional[Status] = None
     message: Optional[str] = None
@@ -16,6 +16,11 @@ class Database:
     def write(self, ingestion: schemas.Ingestion):
         self.table.put_item(Item=ingestion.dynamodb_dict())
 
+    def write_many(self, ingestions: List[schemas.Ingestion]):
+        with self.table.batch_writer(overwrite_by_pkeys=["created_by", "id"]) as batch:
+            for ingestion in ingestions:
+                batch.put_item(Item=ingestion.dynamodb_dict())
+
     def fetch_one(self, username: str, ingestion_id: str):
         response = self.table.get_item(
             Key={"created_by": username, "id": ingestion_id},
@@ -33,18 +33,21 @@ def get_db_credentials(secret_arn: str) -> DbCreds:
     return DbCreds.parse_raw(response["SecretString"])
 
 
+def load_ingestions(loader: Loader, ingestions: Sequence[Ingestion]):
+    """
+    Bulk insert STAC records into pgSTAC with an existing loader.
+    """
+    items = [i.item.model_dump(mode="json") for i in ingestions]
+    return loader.load_items(
+        file=items,
+        # use insert_ignore to avoid overwritting existing items or upsert to replace
+        insert_mode=Methods.upsert,
+    )
+
+
 def load_items(creds: DbCreds, ingestions: Sequence[Ingestion]):
     """
     Bulk insert STAC records into pgSTAC.
     """
     with PgstacDB(dsn=creds.dsn_string, debug=True) as db:
-        loader = Loader(db=db)
-
-        items = [i.item.model_dump(mode="json") for i in ingestions]
-        loading_result = loader.load_items(
-            file=items,
-            # use insert_ignore to avoid overwritting existing items or upsert to replace
-            insert_mode=Methods.upsert,
-        )
-
-        return loading_result
+        return load_ingestions(Loader(db=db), ingestions)
@@ -1,7 +1,37 @@
+import asyncio
+import contextvars
 import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    Hashable,
+    Iterable,
+    Optional,
+    TypeVar,
+)
+from urllib.parse import urlparse
 
 import boto3
+import httpx
 import requests
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError
+from cachetools import TLRUCache
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# results of the assets checked in batch for the item being validated, by href
+checked_assets: contextvars.ContextVar[Optional[Dict[str, Optional[str]]]] = (
+    contextvars.ContextVar("checked_assets", default=None)
+)
 
 
 @functools.cache
@@ -21,41 +51,330 @@ def get_s3_credentials():
     }
 
 
-def s3_object_is_accessible(bucket: str, key: str):
+@functools.cache
+def get_s3_client(
+    aws_access_key_id: Optional[str] = None,
+    aws_secret_access_key: Optional[str] = None,
+    aws_session_token: Optional[str] = None,
+):
     """
-    Ensure we can send HEAD requests to S3 objects.
+    S3 client of a credential set, shared by all asset validations
     """
     from .config import settings
 
-    client = boto3.client("s3", **get_s3_credentials())
+    return boto3.client(
+        "s3",
+        aws_access_key_id=aws_access_key_id,
+        aws_secret_access_key=aws_secret_access_key,
+        aws_session_token=aws_session_token,
+        config=Config(
+            max_pool_connections=settings.validation_concurrency,
+            connect_timeout=settings.validation_timeout,
+            read_timeout=settings.validation_timeout,
+        ),
+    )
+
+
+def head_s3_object(bucket: str, key: str):
+    from .config import settings
+
+    client = get_s3_client(**get_s3_credentials())
     try:
         client.head_object(
             Bucket=bucket,
             Key=key,
             **{"RequestPayer": "requester"} if settings.requester_pays else {},
         )
+    except BotoCoreError as e:
+        # parameters botocore rejects, e.g. an empty bucket, or no connection
+        raise ValueError(f"Asset not accessible: {e}") from e
     except client.exceptions.ClientError as e:
         raise ValueError(
             f"Asset not accessible: {e.__dict__['response']['Error']['Message']}"
         ) from e
 
 
+class AssetValidator:
+    """
+    Checks the accessibility of assets on an event loop of its own
+
+    HTTP assets share one pooled client and S3 assets share a client per credential
+    set. The number of checks in flight is limited per host (or bucket) as well as
+    overall, so a batch of assets on one server does not overwhelm it.
+
+    Results are cached by href, or by bucket, key and requester-pays for S3 objects,
+    with a shorter TTL for inaccessible assets so that fixed assets are soon
+    accepted again.
+    """
+
+    def __init__(
+        self,
+        max_connections: int,
+        max_connections_per_host: int,
+        timeout: float,
+        cache_size: int = 0,
+        cache_ttl: float = 0,
+        cache_failure_ttl: float = 0,
+    ):
+        self.max_connections_per_host = max_connections_per_host
+        self.semaphore = asyncio.Semaphore(max_connections)
+        self.host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.http_client = httpx.AsyncClient(
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+        # only used from the validator's loop, like the semaphores
+        self.cache: TLRUCache = TLRUCache(
+            maxsize=cache_size,
+            ttu=lambda _key, error, now: (
+                now + (cache_failure_ttl if error else cache_ttl)
+            ),
+        )
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.loop = asyncio.new_event_loop()
+        # S3 requests are blocking, they run on the loop's executor
+        self.loop.set_default_executor(
+            ThreadPoolExecutor(
+                max_workers=max_connections, thread_name_prefix="asset-validator"
+            )
+        )
+        threading.Thread(
+            target=self.loop.run_forever, name="asset-validator", daemon=True
+        ).start()
+
+    def run(self, coroutine: Coroutine[None, None, T]) -> T:
+        """
+        Run a coroutine on the validator's loop and wait for its result
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def host_semaphore(self, host: str) -> asyncio.Semaphore:
+        # only used from the validator's loop, which runs in a single thread
+        if host not in self.host_semaphores:
+            self.host_semaphores[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return self.host_semaphores[host]
+
+    def cache_info(self) -> Dict[str, int]:
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "size": len(self.cache),
+            "maxsize": int(self.cache.maxsize),
+        }
+
+    async def cached(self, key: Hashable, check: Callable[[], Awaitable[None]]):
+        """
+        Run a check, or raise the error it raised last time, while it is cached
+        """
+        self.cache.expire()
+        if key in self.cache:
+            self.cache_hits += 1
+            error = self.cache[key]
+        else:
+            self.cache_misses += 1
+            try:
+                await check()
+                error = None
+            except ValueError as e:
+                error = str(e)
+            if self.cache.maxsize:
+                self.cache[key] = error
+        if error:
+            raise ValueError(error)
+
+    async def head_url(self, href: str):
+        async with self.semaphore, self.host_semaphore(urlparse(href).netloc):
+            try:
+                response = await self.http_client.head(href)
+                response.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                raise ValueError(
+                    f"Asset not accessible: "
+                    f"{e.response.status_code} {e.response.reason_phrase}"
+                ) from e
+            except (httpx.HTTPError, httpx.InvalidURL, ValueError) as e:
+                # ValueError: hrefs httpx cannot build a request for, e.g. bad IDNA
+                raise ValueError(f"Asset not accessible: {e!r}") from e
+
+    async def head_s3_object(self, bucket: str, key: str):
+        async with self.semaphore, self.host_semaphore(f"s3://{bucket}"):
+            await self.loop.run_in_executor(None, head_s3_object, bucket, key)
+
+    async def check_url(self, href: str):
+        await self.cached(href, lambda: self.head_url(href))
+
+    async def check_s3_object(self, bucket: str, key: str):
+        from .config import settings
+
+        await self.cached(
+            ("s3", bucket, key, settings.requester_pays),
+            lambda: self.head_s3_object(bucket, key),
+        )
+
+    async def check(self, href: str) -> Optional[str]:
+        """
+        Return the error of an inaccessible asset, or None
+        """
+        try:
+            url = urlparse(href)
+            bucket, key = url.hostname, url.path.lstrip("/")
+        except ValueError as e:
+            return f"Asset not accessible: {e}"
+
+        try:
+            if url.scheme in ["https", "http"]:
+                await self.check_url(href)
+            elif url.scheme in ["s3"]:
+                if not bucket or not key:
+                    return f"Asset not accessible: invalid S3 URL {href}"
+                await self.check_s3_object(bucket=bucket, key=key)
+        except ValueError as e:
+            return str(e)
+        except Exception as e:
+            # a single href that cannot be checked must not fail the whole batch
+            logger.exception(f"Failed to check asset {href}")
+            return f"Asset not accessible: {e!r}"
+        return None
+
+    async def check_many(self, hrefs: Iterable[str]) -> Dict[str, Optional[str]]:
+        hrefs = list(dict.fromkeys(hrefs))
+        errors = await asyncio.gather(*(self.check(href) for href in hrefs))
+        return dict(zip(hrefs, errors))
+
+
+@functools.cache
+def get_asset_validator() -> AssetValidator:
+    from .config import settings
+
+    return AssetValidator(
+        max_connections=settings.validation_concurrency,
+        max_connections_per_host=settings.validation_concurrency_per_host,
+        timeout=settings.validation_timeout,
+        cache_size=settings.asset_cache_size,
+        cache_ttl=settings.asset_cache_ttl,
+        cache_failure_ttl=settings.asset_cache_failure_ttl,
+    )
+
+
+def asset_cache_info() -> Dict[str, int]:
+    """
+    Hits, misses and size of the cache of asset accessibility results
+    """
+    return get_asset_validator().cache_info()
+
+
+def s3_object_is_accessible(bucket: str, key: str):
+    """
+    Ensure we can send HEAD requests to S3 objects.
+    """
+    validator = get_asset_validator()
+    validator.run(validator.check_s3_object(bucket=bucket, key=key))
+
+
 def url_is_accessible(href: str):
     """
     Ensure URLs are accessible via HEAD requests.
     """
-    try:
-        requests.head(href).raise_for_status()
-    except requests.exceptions.HTTPError as e:
-        raise ValueError(
-            f"Asset not accessible: {e.response.status_code} {e.response.reason}"
-        ) from e
+    validator = get_asset_validator()
+    validator.run(validator.check_url(href))
+
+
+def check_assets(hrefs: Iterable[str]) -> Dict[str, Optional[str]]:
+    """
+    Check the accessibility of many assets concurrently. Returns the error of each
+    href, None for accessible ones.
+    """
+    validator = get_asset_validator()
+    hits, misses = validator.cache_hits, validator.cache_misses
+    results = validator.run(validator.check_many(hrefs))
+    logger.info(
+        f"Checked {len(results)} assets, {validator.cache_hits - hits} cached, "
+        f"{validator.cache_misses - misses} requested"
+    )
+    return results
+
+
+def asset_errors(hrefs: Iterable[str]) -> Dict[str, str]:
+    """
+    Return the error of each inaccessible href
+    """
+    return {href: error for href, error in check_assets(hrefs).items() if error}
+
+
+_collections_lock = threading.Lock()
 
 
 @functools.cache
-def collection_exists(collection_id: str) -> bool:
+def get_collection_cache() -> TLRUCache:
     """
-    Ensure collection exists in STAC
+    Results of collection lookups: True, or the error of a missing collection
+    """
+    from .config import settings
+
+    return TLRUCache(
+        maxsize=settings.collection_cache_size,
+        ttu=lambda _key, value, now: (
+            now
+            + (
+                settings.collection_cache_ttl
+                if value is True
+                else settings.collection_cache_failure_ttl
+            )
+        ),
+    )
+
+
+def invalidate_collection(collection_id: Optional[str] = None):
+    """
+    Forget the cached existence of a collection, or of all collections
+
+    Called when a collection is published or deleted through this API. Other
+    instances of the API only notice the change once their cached result expires.
+    """
+    with _collections_lock:
+        cache = get_collection_cache()
+        if collection_id is None:
+            cache.clear()
+        else:
+            cache.pop(collection_id, None)
+
+
+@functools.cache
+def get_stac_session() -> requests.Session:
+    """
+    HTTP session shared by the collection lookups in the STAC API
+    """
+    return requests.Session()
+
+
+@functools.cache
+def get_pgstac_pool():
+    """
+    Pool of connections to pgSTAC shared by the collection lookups
+    """
+    from psycopg_pool import ConnectionPool
+
+    from .config import settings
+    from .utils import get_db_credentials
+
+    creds = get_db_credentials(os.environ["DB_SECRET_ARN"])
+    return ConnectionPool(
+        conninfo=creds.dsn_string,
+        min_size=0,
+        max_size=settings.collection_lookup_pool_size,
+        kwargs={"connect_timeout": int(settings.validation_timeout)},
+        open=True,
+    )
+
+
+def stac_collection_error(collection_id: str) -> Optional[str]:
+    """
+    Look a collection up in the STAC API, returning an error if it is missing
     """
     from .config import settings
 
@@ -63,10 +382,59 @@ def collection_exists(collection_id: str) -> bool:
         f"{url.strip('/')}" for url in [settings.stac_url, "collections", collection_id]
     )
 
-    if (response := requests.get(url)).ok:
-        return True
+    response = get_stac_session().get(url, timeout=settings.validation_timeout)
+    if response.ok:
+        return None
 
-    raise ValueError(
+    error = (
         f"Invalid collection '{collection_id}', received "
         f"{response.status_code} response code from STAC API"
     )
+    if response.status_code != 404:
+        # not cached, the next lookup tries again
+        raise ValueError(error)
+    return error
+
+
+def pgstac_collection_error(collection_id: str) -> Optional[str]:
+    """
+    Look a collection up in pgSTAC, returning an error if it is missing
+    """
+    with get_pgstac_pool().connection() as conn:
+        row = conn.execute(
+            "SELECT EXISTS (SELECT 1 FROM pgstac.collections WHERE id = %s)",
+            (collection_id,),
+        ).fetchone()
+    if row[0]:
+        return None
+    return f"Invalid collection '{collection_id}', not found in pgSTAC"
+
+
+def collection_exists(collection_id: str) -> bool:
+    """
+    Ensure collection exists in STAC
+
+    Existing collections are cached for COLLECTION_CACHE_TTL and missing ones for
+    COLLECTION_CACHE_FAILURE_TTL. Collections are looked up in the STAC API, or
+    straight in pgSTAC when COLLECTION_LOOKUP is "pgstac".
+    """
+    from .config import settings
+
+    with _collections_lock:
+        cache = get_collection_cache()
+        cache.expire()
+        result = cache.get(collection_id)
+
+    if result is None:
+        if settings.collection_lookup == "pgstac":
+            error = pgstac_collection_error(collection_id)
+        else:
+            error = stac_collection_error(collection_id)
+        result = error or True
+        if settings.collection_cache_size:
+            with _collections_lock:
+                get_collection_cache()[collection_id] = result
+
+    if result is True:
+        return True
+    raise ValueError(result)
@@ -0,0 +1,169 @@
+import copy
+import json
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+import pytest
+
+if TYPE_CHECKING:
+    from fastapi.testclient import TestClient
+    from src import services
+
+bulk_endpoint = "/ingestions/bulk"
+
+MISSING_HREF = "https://TEST_API.com/missing.tif"
+
+
+@pytest.fixture()
+def validators():
+    checked_hrefs = []
+
+    def check_assets(hrefs):
+        hrefs = list(dict.fromkeys(hrefs))
+        checked_hrefs.extend(hrefs)
+        return {
+            href: "MOCKED INACCESSIBLE URL ERROR" if href == MISSING_HREF else None
+            for href in hrefs
+        }
+
+    def collection_exists(collection_id: str):
+        if collection_id != "simple-collection":
+            raise ValueError("MOCKED MISSING COLLECTION ERROR")
+
+    with (
+        patch("src.validators.check_assets", side_effect=check_assets),
+        patch(
+            "src.validators.collection_exists", side_effect=collection_exists
+        ) as collection_check,
+    ):
+        yield checked_hrefs, collection_check
+
+
+class TestBulkCreate:
+    @pytest.fixture(autouse=True)
+    def setup(
+        self,
+        api_client: "TestClient",
+        mock_table: "services.Table",
+        example_stac_item: dict,
+    ):
+        from src import services
+
+        self.api_client = api_client
+        self.db = services.Database(mock_table)
+        self.example_stac_item = example_stac_item
+
+    def make_items(self, count):
+        items = []
+        for i in range(count):
+            item = copy.deepcopy(self.example_stac_item)
+            item["id"] = f"item-{i}"
+            items.append(item)
+        return items
+
+    def test_unauthenticated_create(self):
+        response = self.api_client.post(bulk_endpoint, json=self.make_items(2))
+        assert response.status_code == 401
+
+    def test_bulk_create(self, client_authenticated, validators):
+        checked_hrefs, collection_check = validators
+        items = self.make_items(5)
+
+        response = self.api_client.post(bulk_endpoint, json=items)
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["queued"] == 5
+        assert body["failed"] == 0
+        assert [result["id"] for result in body["results"]] == [
+            item["id"] for item in items
+        ]
+        assert all(result["errors"] == [] for result in body["results"])
+        stored = self.db.fetch_many(status="queued")["items"]
+        assert sorted(ingestion.id for ingestion in stored) == sorted(
+            item["id"] for item in items
+        )
+        assert {ingestion.created_by for ingestion in stored} == {"test_user"}
+
+        # shared collections and hrefs are only checked once
+        collection_check.assert_called_once_with(collection_id="simple-collection")
+        assert len(checked_hrefs) == 2
+
+    def test_bulk_create_ndjson(self, client_authenticated, validators):
+        items = self.make_items(3)
+
+        response = self.api_client.post(
+            bulk_endpoint,
+            content="\n".join(json.dumps(item) for item in items) + "\n",
+            headers={"content-type": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["queued"] == 3
+        assert len(self.db.fetch_many(status="queued")["items"]) == 3
+
+    def test_bulk_create_per_item_errors(self, client_authenticated, validators):
+        items = self.make_items(4)
+        items[1]["assets"]["visual"]["href"] = MISSING_HREF
+        items[2]["collection"] = "missing-collection"
+        del items[3]["geometry"]
+
+        response = self.api_client.post(bulk_endpoint, json=items)
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert response.json()["queued"] == 1
+        assert response.json()["failed"] == 3
+        assert results[0]["errors"] == []
+        assert results[0]["ingestion"]["id"] == "item-0"
+        assert results[1]["errors"] == [
+            "assets.visual.href: MOCKED INACCESSIBLE URL ERROR"
+        ]
+        assert results[2]["errors"] == ["collection: MOCKED MISSING COLLECTION ERROR"]
+        assert results[3]["id"] == "item-3"
+        assert any(error.startswith("geometry") for error in results[3]["errors"])
+        assert all(result["ingestion"] is None for result in results[1:])
+        stored = self.db.fetch_many(status="queued")["items"]
+        assert [ingestion.id for ingestion in stored] == ["item-0"]
+
+    def test_bulk_create_rejects_duplicate_ids(self, client_authenticated, validators):
+        items = self.make_items(3)
+        items[2]["id"] = "item-0"
+        items[2]["properties"]["title"] = "second"
+
+        response = self.api_client.post(bulk_endpoint, json=items)
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["queued"] == 2
+        assert body["failed"] == 1
+        assert body["results"][2]["id"] == "item-0"
+        assert body["results"][2]["errors"] == ["id: duplicates the item at index 0"]
+        assert body["results"][2]["ingestion"] is None
+        stored = self.db.fetch_many(status="queued")["items"]
+        assert sorted(ingestion.id for ingestion in stored) == ["item-0", "item-1"]
+        assert all(
+            ingestion.item.properties.model_dump().get("title") is None
+            for ingestion in stored
+        )
+
+    def test_bulk_create_rejects_bad_bodies(self, client_authenticated, validators):
+        response = self.api_client.post(
+            bulk_endpoint,
+            content="not json",
+            headers={"content-type": "application/json"},
+        )
+        assert response.status_code == 400
+
+        response = self.api_client.post(bulk_endpoint, json=self.example_stac_item)
+        assert response.status_code == 400
+
+    def test_bulk_create_max_items(
+        self, app, client_authenticated, validators, monkeypatch
+    ):
+        monkeypatch.setattr(app.extra["settings"], "bulk_ingestion_max_items", 2)
+
+        response = self.api_client.post(bulk_endpoint, json=self.make_items(3))
+
+        assert response.status_code == 413
+        assert len(self.db.fetch_many(status="queued")["items"]) == 0
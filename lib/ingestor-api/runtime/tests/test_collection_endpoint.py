@@ -4,9 +4,10 @@ publish_collections_endpoint = "/collections"
 delete_collection_endpoint = "/collections/{collection_id}"
 
 
+@patch("src.validators.invalidate_collection")
 @patch("src.collection.ingest")
 def test_auth_publish_collection(
-    ingest, stac_collection, example_stac_collection, client_authenticated
+    ingest, invalidate, stac_collection, example_stac_collection, client_authenticated
 ):
     token = "token"
     response = client_authenticated.post(
@@ -15,6 +16,7 @@ def test_auth_publish_collection(
         json=example_stac_collection,
     )
     ingest.assert_called_once_with(stac_collection)
+    invalidate.assert_called_once_with(example_stac_collection["id"])
     assert response.status_code == 201
 
 
@@ -23,14 +25,18 @@ def test_unauth_publish_collection(client, example_stac_collection):
     assert response.status_code == 401
 
 
+@patch("src.validators.invalidate_collection")
 @patch("src.collection.delete")
-def test_auth_delete_collection(delete, example_stac_collection, client_authenticated):
+def test_auth_delete_collection(
+    delete, invalidate, example_stac_collection, client_authenticated
+):
     token = "token"
     response = client_authenticated.delete(
         delete_collection_endpoint.format(collection_id=example_stac_collection["id"]),
         headers={"Authorization": f"bearer {token}"},
     )
     delete.assert_called_once_with(collection_id=example_stac_collection["id"])
+    invalidate.assert_called_once_with(example_stac_collection["id"])
     assert response.status_code == 200
 
 
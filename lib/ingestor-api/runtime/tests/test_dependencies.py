@@ -0,0 +1,187 @@
+import base64
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from authlib.jose import JsonWebKey, jwt
+from fastapi import HTTPException, security
+from moto import mock_dynamodb
+
+
+@pytest.fixture
+def dependencies(test_environ, mock_ssm_parameter_store, monkeypatch):
+    from src import dependencies
+
+    monkeypatch.setattr(dependencies, "_jwks_caches", {})
+    monkeypatch.setattr(
+        dependencies,
+        "_verified_tokens",
+        dependencies.TLRUCache(
+            maxsize=dependencies.TOKEN_CACHE_SIZE,
+            ttu=dependencies._verified_tokens.ttu,
+        ),
+    )
+    return dependencies
+
+
+def make_key(kid):
+    return JsonWebKey.generate_key("RSA", 2048, is_private=True, options={"kid": kid})
+
+
+@pytest.fixture
+def jwks_server(dependencies, monkeypatch):
+    """Serve the public part of `keys` from a mocked JWKS URL."""
+    server = MagicMock()
+    server.keys = [make_key("key-1")]
+
+    def _get(url, timeout):
+        assert timeout == dependencies.JWKS_REQUEST_TIMEOUT_SECONDS
+        server.requests += 1
+        response = MagicMock()
+        response.__enter__.return_value = response
+        response.json.return_value = {
+            "keys": [key.as_dict(is_private=False) for key in server.keys]
+        }
+        return response
+
+    server.requests = 0
+    monkeypatch.setattr(dependencies.requests, "get", _get)
+    return server
+
+
+def make_token(key, **claims):
+    payload = {"sub": "user", "exp": int(time.time()) + 600, **claims}
+    token = jwt.encode({"alg": "RS256", "kid": key.kid}, payload, key)
+    return security.HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=token.decode()
+    )
+
+
+def test_decode_token_caches_verified_claims(dependencies, jwks_server, monkeypatch):
+    cache = dependencies.get_jwks_cache("https://test-jwks.url")
+    token = make_token(jwks_server.keys[0])
+
+    claims = dependencies.decode_token(token, cache)
+
+    decode = MagicMock(side_effect=AssertionError("signature verified again"))
+    monkeypatch.setattr(dependencies.JsonWebToken, "decode", decode)
+    assert dependencies.decode_token(token, cache) is claims
+    assert claims["sub"] == "user"
+    assert jwks_server.requests == 1
+
+
+def test_decode_token_cache_bounded_by_expiry(dependencies, jwks_server):
+    cache = dependencies.get_jwks_cache("https://test-jwks.url")
+    token = make_token(jwks_server.keys[0], exp=int(time.time()) + 1)
+
+    dependencies.decode_token(token, cache)
+    time.sleep(2.1)
+
+    with pytest.raises(HTTPException) as exc_info:
+        dependencies.decode_token(token, cache)
+    assert exc_info.value.status_code == 403
+
+
+def test_decode_token_rejects_bad_tokens(dependencies, jwks_server):
+    cache = dependencies.get_jwks_cache("https://test-jwks.url")
+    token = make_token(make_key("key-1"))
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc_info:
+            dependencies.decode_token(token, cache)
+        assert exc_info.value.status_code == 403
+
+    with pytest.raises(HTTPException):
+        dependencies.decode_token(
+            security.HTTPAuthorizationCredentials(scheme="Bearer", credentials="x.y.z"),
+            cache,
+        )
+
+
+@pytest.mark.parametrize(
+    "header", [b"[]", b'"header"', b"1", b"null", b'{"kid": ["key-1"]}']
+)
+def test_decode_token_rejects_bad_headers(dependencies, jwks_server, header):
+    cache = dependencies.get_jwks_cache("https://test-jwks.url")
+    header_segment = base64.urlsafe_b64encode(header).decode().rstrip("=")
+
+    with pytest.raises(HTTPException) as exc_info:
+        dependencies.decode_token(
+            security.HTTPAuthorizationCredentials(
+                scheme="Bearer", credentials=f"{header_segment}.e30.c2ln"
+            ),
+            cache,
+        )
+    assert exc_info.value.status_code == 403
+
+
+def test_jwks_refetched_for_unknown_kid(dependencies, jwks_server, monkeypatch):
+    cache = dependencies.get_jwks_cache("https://test-jwks.url")
+    dependencies.decode_token(make_token(jwks_server.keys[0]), cache)
+
+    # the issuer rotates its keys a while later
+    jwks_server.keys.append(make_key("key-2"))
+    cache.last_fetch_attempt -= dependencies.JWKS_MIN_REFETCH_SECONDS
+    claims = dependencies.decode_token(make_token(jwks_server.keys[1]), cache)
+
+    assert claims["sub"] == "user"
+    assert jwks_server.requests == 2
+
+
+def test_jwks_refetch_rate_limited(dependencies, jwks_server):
+    cache = dependencies.get_jwks_cache("https://test-jwks.url")
+    cache.get()
+    cache.last_fetch_attempt = 0  # long enough ago
+
+    for i in range(5):
+        with pytest.raises(HTTPException):
+            dependencies.decode_token(make_token(make_key(f"unknown-{i}")), cache)
+
+    assert jwks_server.requests == 2
+
+
+def test_jwks_refreshed_in_background(dependencies, jwks_server, monkeypatch):
+    cache = dependencies.get_jwks_cache("https://test-jwks.url")
+    keys = cache.get()
+    cache.fetched_at -= dependencies.JWKS_REFRESH_AFTER_SECONDS + 1
+    jwks_server.keys = [make_key("key-2")]
+
+    # stale keys are served while the refresh runs
+    assert cache.get() is keys
+    for _ in range(50):
+        if not cache.refreshing:
+            break
+        time.sleep(0.01)
+
+    assert jwks_server.requests == 2
+    assert dependencies.has_key(cache.get(), "key-2")
+
+
+def test_jwks_refetched_after_ttl(dependencies, jwks_server):
+    cache = dependencies.get_jwks_cache("https://test-jwks.url")
+    cache.get()
+    cache.fetched_at -= dependencies.JWKS_TTL_SECONDS + 1
+
+    cache.get()
+
+    assert jwks_server.requests == 2
+    assert dependencies.get_jwks_cache("https://test-jwks.url") is cache
+
+
+def test_table_built_once(dependencies):
+    from fastapi import FastAPI
+    from src.config import settings
+
+    app = FastAPI()
+    request = MagicMock(app=app)
+
+    with mock_dynamodb():
+        table = dependencies.get_table(request, settings)
+        assert dependencies.get_table(request, settings) is table
+
+    assert app.state.dynamodb_table is table
+    assert table.name == settings.dynamodb_table
+    client_config = table.meta.client.meta.config
+    assert client_config.max_pool_connections == settings.dynamodb_max_pool_connections
+    assert client_config.tcp_keepalive
+    assert client_config.retries["mode"] == "adaptive"
@@ -1,6 +1,8 @@
-from unittest.mock import patch
+from unittest.mock import MagicMock, PropertyMock, patch
 
+import psycopg
 import pytest
+from moto import mock_dynamodb
 
 
 @pytest.fixture()
@@ -20,13 +22,32 @@ def get_queued_ingestions(example_ingestion):
 
 @pytest.fixture()
 def get_db_credentials():
-    with patch("src.ingestor.get_db_credentials", return_value="", autospec=True) as m:
+    with patch(
+        "src.ingestor.get_db_credentials",
+        side_effect=lambda secret_arn: MagicMock(dsn_string="postgresql://"),
+    ) as m:
         yield m
 
 
 @pytest.fixture()
-def load_items():
-    with patch("src.ingestor.load_items", return_value=0, autospec=True) as m:
+def pgstac(test_environ, monkeypatch, get_db_credentials):
+    """Mock the pgSTAC connection, and forget the one kept by previous tests."""
+    import src.ingestor as ingestor
+
+    monkeypatch.setattr(ingestor, "_db_creds", None)
+    monkeypatch.setattr(ingestor, "_db", None)
+    monkeypatch.setattr(ingestor, "_loader", None)
+    with (
+        patch("src.ingestor.ConnectionPool") as pool,
+        patch("src.ingestor.PgstacDB") as db,
+        patch("src.ingestor.Loader") as loader,
+    ):
+        yield pool, db, loader
+
+
+@pytest.fixture()
+def load_ingestions():
+    with patch("src.ingestor.load_ingestions", return_value=0, autospec=True) as m:
         yield m
 
 
@@ -42,19 +63,248 @@ def test_handler(
     dynamodb_stream_event,
     example_ingestion,
     get_queued_ingestions,
-    get_db_credentials,
-    load_items,
+    pgstac,
+    load_ingestions,
     get_table,
     mock_table,
 ):
     import src.ingestor as ingestor
 
+    _, _, loader = pgstac
+
     ingestor.handler(dynamodb_stream_event, {})
-    load_items.assert_called_once_with(
-        creds="",
-        ingestions=[example_ingestion],
-    )
+    load_ingestions.assert_called_once_with(loader.return_value, [example_ingestion])
     response = mock_table.get_item(
         Key={"created_by": example_ingestion.created_by, "id": example_ingestion.id}
     )
     assert response["Item"]["status"] == "succeeded"
+
+
+def test_connection_kept_across_invocations(
+    example_ingestion, get_db_credentials, pgstac, load_ingestions
+):
+    import src.ingestor as ingestor
+
+    pool, db, loader = pgstac
+
+    for _ in range(3):
+        ingestor.load_items([example_ingestion])
+
+    get_db_credentials.assert_called_once_with("testing")
+    pool.assert_called_once()
+    db.assert_called_once()
+    loader.assert_called_once_with(db=db.return_value)
+    # no collection is cached across invocations
+    assert loader.return_value.clear_collection_cache.call_count == 2
+    assert all(
+        call.args[0] is loader.return_value for call in load_ingestions.call_args_list
+    )
+    assert load_ingestions.call_count == 3
+
+
+def test_connection_refreshed_after_connection_failure(
+    example_ingestion, get_db_credentials, pgstac, load_ingestions
+):
+    import src.ingestor as ingestor
+
+    _, db, loader = pgstac
+    load_ingestions.side_effect = [
+        0,
+        psycopg.OperationalError("password authentication failed"),
+        0,
+    ]
+
+    ingestor.load_items([example_ingestion])
+    ingestor.load_items([example_ingestion])
+
+    # the secret was fetched again and the old connection closed
+    assert get_db_credentials.call_count == 2
+    assert db.call_count == 2
+    db.return_value.close.assert_called_once()
+    assert loader.call_count == 2
+    assert load_ingestions.call_count == 3
+
+
+def test_version_checked_once_per_connection(
+    test_environ, monkeypatch, get_db_credentials, example_ingestion
+):
+    import src.ingestor as ingestor
+    from pypgstac.load import Loader as BaseLoader
+
+    monkeypatch.setattr(ingestor, "_db_creds", None)
+    monkeypatch.setattr(ingestor, "_db", None)
+    monkeypatch.setattr(ingestor, "_loader", None)
+    version = PropertyMock(return_value="unreleased")
+
+    def load_items(self, **kwargs):
+        # pypgstac checks the database version at the start of every load
+        self.check_version()
+
+    with (
+        patch("src.ingestor.ConnectionPool"),
+        patch("src.ingestor.PgstacDB") as db,
+        patch.object(BaseLoader, "load_items", load_items),
+    ):
+        type(db.return_value).version = version
+        ingestor.load_items([example_ingestion])
+        ingestor.load_items([example_ingestion])
+
+    version.assert_called_once()
+
+
+def test_pool_closed_when_connection_setup_fails(get_db_credentials, pgstac):
+    import src.ingestor as ingestor
+
+    pool, db, _ = pgstac
+    db.side_effect = RuntimeError("bad dsn")
+
+    with pytest.raises(RuntimeError):
+        ingestor.get_loader()
+
+    pool.return_value.close.assert_called_once()
+    assert ingestor._db is None
+
+
+def test_handler_marks_failures(
+    test_environ,
+    dynamodb_stream_event,
+    example_ingestion,
+    get_queued_ingestions,
+    pgstac,
+    load_ingestions,
+    get_table,
+    mock_table,
+):
+    import src.ingestor as ingestor
+
+    load_ingestions.side_effect = psycopg.OperationalError("connection refused")
+
+    ingestor.handler(dynamodb_stream_event, {})
+
+    response = mock_table.get_item(
+        Key={"created_by": example_ingestion.created_by, "id": example_ingestion.id}
+    )
+    assert response["Item"]["status"] == "failed"
+    assert response["Item"]["message"] == "connection refused"
+    assert load_ingestions.call_count == 2
+
+
+def test_table_kept_across_invocations(test_environ, mock_ssm_parameter_store):
+    import src.ingestor as ingestor
+    from src.config import settings
+
+    ingestor.get_table.cache_clear()
+    with mock_dynamodb():
+        table = ingestor.get_table()
+        assert ingestor.get_table() is table
+    assert table.name == settings.dynamodb_table
+    ingestor.get_table.cache_clear()
+
+
+@pytest.fixture()
+def ingestions(example_ingestion):
+    """Ingestions of two collections, one of them bad"""
+    return [
+        example_ingestion.model_copy(
+            update={
+                "id": f"item-{i}",
+                "item": example_ingestion.item.model_copy(
+                    update={"id": f"item-{i}", "collection": collection}
+                ),
+            }
+        )
+        for i, collection in enumerate(["a", "a", "a", "b", "b", "b"])
+    ]
+
+
+@pytest.fixture()
+def load_items(ingestions):
+    """Fail loading any batch that contains the bad ingestion"""
+
+    def load(ingestions):
+        for ingestion in ingestions:
+            if ingestion.id == "item-4":
+                raise ValueError(f"{ingestion.id} is invalid")
+
+    with patch("src.ingestor.load_items", side_effect=load, autospec=True) as m:
+        yield m
+
+
+def get_statuses(mock_table, ingestions):
+    items = [
+        mock_table.get_item(Key={"created_by": ingestion.created_by, "id": ingestion.id})[
+            "Item"
+        ]
+        for ingestion in ingestions
+    ]
+    return {item["id"]: (item["status"], item.get("message")) for item in items}
+
+
+@pytest.mark.parametrize(
+    "strategy,loads,failed",
+    [
+        ("bisect", 7, ["item-4"]),
+        ("per-collection", 3, ["item-3", "item-4", "item-5"]),
+        ("per-item", 7, ["item-4"]),
+    ],
+)
+def test_handler_isolates_failures(
+    monkeypatch,
+    test_environ,
+    dynamodb_stream_event,
+    ingestions,
+    load_items,
+    get_table,
+    mock_table,
+    strategy,
+    loads,
+    failed,
+):
+    import src.ingestor as ingestor
+
+    monkeypatch.setattr(ingestor.settings, "ingestion_failure_strategy", strategy)
+    monkeypatch.setattr(
+        ingestor, "get_queued_ingestions", lambda records: iter(ingestions)
+    )
+
+    ingestor.handler(dynamodb_stream_event, {})
+
+    assert load_items.call_count == loads
+    assert get_statuses(mock_table, ingestions) == {
+        ingestion.id: (
+            ("failed", "item-4 is invalid")
+            if ingestion.id in failed
+            else ("succeeded", None)
+        )
+        for ingestion in ingestions
+    }
+
+
+def test_handler_stops_isolating_when_database_fails(
+    monkeypatch,
+    test_environ,
+    dynamodb_stream_event,
+    ingestions,
+    load_items,
+    get_table,
+    mock_table,
+):
+    import src.ingestor as ingestor
+
+    monkeypatch.setattr(ingestor.settings, "ingestion_failure_strategy", "per-item")
+    monkeypatch.setattr(
+        ingestor, "get_queued_ingestions", lambda records: iter(ingestions)
+    )
+    load_items.side_effect = [
+        ValueError("item-4 is invalid"),
+        None,
+        psycopg.OperationalError("connection refused"),
+    ]
+
+    ingestor.handler(dynamodb_stream_event, {})
+
+    # no ingestion is loaded again once the database is unavailable
+    assert load_items.call_count == 3
+    statuses = get_statuses(mock_table, ingestions)
+    assert statuses.pop("item-0") == ("succeeded", None)
+    assert set(statuses.values()) == {("failed", "connection refused")}
@@ -1,8 +1,9 @@
+import asyncio
 import base64
 import json
 from datetime import timedelta
 from typing import TYPE_CHECKING, List
-from unittest.mock import call, patch
+from unittest.mock import patch
 
 import pydantic
 import pytest
@@ -32,16 +33,19 @@ def collection_missing():
 
 @pytest.fixture()
 def asset_exists():
-    with patch("src.validators.url_is_accessible", return_value=True) as m:
+    def good_asset_urls(hrefs):
+        return dict.fromkeys(hrefs)
+
+    with patch("src.validators.check_assets", side_effect=good_asset_urls) as m:
         yield m
 
 
 @pytest.fixture()
 def asset_missing():
-    def bad_asset_url(href: str):
-        raise ValueError("MOCKED INACCESSIBLE URL ERROR")
+    def bad_asset_urls(hrefs):
+        return dict.fromkeys(hrefs, "MOCKED INACCESSIBLE URL ERROR")
 
-    with patch("src.validators.url_is_accessible", side_effect=bad_asset_url) as m:
+    with patch("src.validators.check_assets", side_effect=bad_asset_urls) as m:
         yield m
 
 
@@ -85,6 +89,21 @@ class TestCreate:
             json.loads(stored_data[0].model_dump_json(by_alias=True)) == response.json()
         )
 
+    def test_create_validates_off_event_loop(self, client_authenticated, asset_exists):
+        def collection_exists(collection_id: str):
+            with pytest.raises(RuntimeError):
+                asyncio.get_running_loop()
+            return True
+
+        with patch("src.validators.collection_exists", side_effect=collection_exists):
+            response = self.api_client.post(
+                ingestion_endpoint,
+                json=jsonable_encoder(self.example_ingestion.item),
+            )
+
+        assert response.status_code == 201
+        assert asset_exists.call_count == 1
+
     def test_validates_missing_collection(
         self, client_authenticated, collection_missing, asset_exists
     ):
@@ -124,12 +143,8 @@ class TestCreate:
         collection_exists.assert_called_once_with(
             collection_id=self.example_ingestion.item.collection
         )
-        asset_missing.assert_has_calls(
-            [
-                call(href=asset.href)
-                for asset in self.example_ingestion.item.assets.values()
-            ],
-            any_order=True,
+        asset_missing.assert_called_once_with(
+            [asset.href for asset in self.example_ingestion.item.assets.values()]
         )
         assert response.status_code == 422, "should get validation error"
         for asset_type in self.example_ingestion.item.assets.keys():
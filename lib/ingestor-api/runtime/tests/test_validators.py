@@ -1,7 +1,12 @@
+import asyncio
+import time
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
+import httpx
 import pytest
 import requests
+from botocore.exceptions import EndpointConnectionError
 from pydantic import AnyHttpUrl
 from src import validators
 
@@ -35,8 +40,13 @@ def mock_requests():
         mock_requests.head.return_value = mock_response
 
         mock_requests.exceptions = requests.exceptions
+        mock_requests.Session.return_value = mock_requests
 
+        validators.get_stac_session.cache_clear()
+        validators.invalidate_collection()
         yield mock_requests
+        validators.get_stac_session.cache_clear()
+        validators.invalidate_collection()
 
 
 @pytest.fixture
@@ -62,25 +72,56 @@ def mock_boto3():
 
         mock_boto3.client.side_effect = mock_client_factory
 
+        validators.get_s3_client.cache_clear()
         yield mock_boto3, mock_client
+        validators.get_s3_client.cache_clear()
+
+
+@pytest.fixture
+def mock_http(request, monkeypatch):
+    """Fixture to serve the asset validator's HTTP requests from a handler."""
+    requests_made = []
+    responses = {}
+    in_flight = {"current": 0, "max": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests_made.append(request)
+        in_flight["current"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["current"])
+        await asyncio.sleep(0.01)
+        in_flight["current"] -= 1
+        return responses.get(str(request.url), httpx.Response(200))
+
+    validator = validators.AssetValidator(
+        max_connections=4,
+        max_connections_per_host=2,
+        timeout=1,
+        **getattr(request, "param", {}),
+    )
+    validator.http_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), follow_redirects=True
+    )
+    monkeypatch.setattr(validators, "get_asset_validator", lambda: validator)
+    yield SimpleNamespace(
+        requests=requests_made, responses=responses, in_flight=in_flight
+    )
+    validator.loop.call_soon_threadsafe(validator.loop.stop)
 
 
 class TestValidators:
     def test_collection_exists_success(self, mock_settings, mock_requests):
         """Test collection_exists when the collection exists."""
-        validators.collection_exists.cache_clear()
-
         result = validators.collection_exists("test-collection")
 
         assert result
 
         expected_url = f"{mock_settings.stac_url}collections/test-collection"
-        mock_requests.get.assert_called_once_with(expected_url)
+        mock_requests.get.assert_called_once_with(
+            expected_url, timeout=mock_settings.validation_timeout
+        )
 
     def test_collection_exists_failure(self, mock_settings, mock_requests):
         """Test collection_exists when the collection doesn't exist."""
-        validators.collection_exists.cache_clear()
-
         mock_response = MagicMock()
         mock_response.ok = False
         mock_response.status_code = 404
@@ -92,24 +133,189 @@ class TestValidators:
         assert "Invalid collection 'nonexistent-collection'" in str(excinfo.value)
         assert "404 response code" in str(excinfo.value)
 
-    def test_url_is_accessible_success(self, mock_requests):
+    def test_collection_exists_cached(self, mock_settings, mock_requests):
+        """Test collection lookups are cached until the collection is invalidated."""
+        missing = MagicMock(ok=False, status_code=404)
+        mock_requests.get.return_value = missing
+
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                validators.collection_exists("test-collection")
+        assert mock_requests.get.call_count == 1
+
+        # the collection is published
+        mock_requests.get.return_value = MagicMock(ok=True)
+        validators.invalidate_collection("test-collection")
+        for _ in range(2):
+            assert validators.collection_exists("test-collection")
+        assert mock_requests.get.call_count == 2
+
+    def test_collection_exists_errors_not_cached(self, mock_settings, mock_requests):
+        """Test failed lookups other than a missing collection are retried."""
+        mock_requests.get.return_value = MagicMock(ok=False, status_code=503)
+
+        for _ in range(2):
+            with pytest.raises(ValueError, match="503 response code"):
+                validators.collection_exists("test-collection")
+        assert mock_requests.get.call_count == 2
+
+    def test_collection_exists_in_pgstac(self, mock_settings, monkeypatch):
+        """Test collections can be looked up straight in pgSTAC."""
+        mock_settings.collection_lookup = "pgstac"
+        mock_pool = MagicMock()
+        conn = mock_pool.connection.return_value.__enter__.return_value
+        conn.execute.return_value.fetchone.side_effect = [(True,), (False,)]
+        monkeypatch.setattr(validators, "get_pgstac_pool", lambda: mock_pool)
+        validators.invalidate_collection()
+
+        assert validators.collection_exists("test-collection")
+        with pytest.raises(ValueError, match="not found in pgSTAC"):
+            validators.collection_exists("missing-collection")
+        assert validators.collection_exists("test-collection")
+
+        assert conn.execute.call_count == 2
+        assert conn.execute.call_args.args[1] == ("missing-collection",)
+        validators.invalidate_collection()
+
+    def test_url_is_accessible_success(self, mock_http):
         """Test url_is_accessible when the URL is accessible."""
         validators.url_is_accessible("https://example.com/asset.tif")
 
-        mock_requests.head.assert_called_once_with("https://example.com/asset.tif")
+        assert [(r.method, str(r.url)) for r in mock_http.requests] == [
+            ("HEAD", "https://example.com/asset.tif")
+        ]
 
-    def test_url_is_accessible_failure(self, mock_requests):
+    def test_url_is_accessible_failure(self, mock_http):
         """Test url_is_accessible when the URL is not accessible."""
-        mock_response = MagicMock()
-        mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError(
-            response=MagicMock(status_code=403, reason="Forbidden")
-        )
-        mock_requests.head.return_value = mock_response
+        mock_http.responses["https://example.com/private.tif"] = httpx.Response(403)
 
         with pytest.raises(ValueError) as excinfo:
             validators.url_is_accessible("https://example.com/private.tif")
 
-        assert "Asset not accessible" in str(excinfo.value)
+        assert "Asset not accessible: 403 Forbidden" in str(excinfo.value)
+
+    def test_url_is_accessible_follows_redirects(self, mock_http):
+        """Test url_is_accessible checks the target of a redirect."""
+        mock_http.responses["https://example.com/moved.tif"] = httpx.Response(
+            301, headers={"location": "https://example.com/gone.tif"}
+        )
+        mock_http.responses["https://example.com/gone.tif"] = httpx.Response(404)
+
+        with pytest.raises(ValueError) as excinfo:
+            validators.url_is_accessible("https://example.com/moved.tif")
+
+        assert "404 Not Found" in str(excinfo.value)
+
+    def test_check_assets(self, mock_settings, mock_http, mock_boto3):
+        """Test check_assets checks each distinct href once."""
+        _, mock_s3_client = mock_boto3
+        mock_http.responses["https://example.com/missing.tif"] = httpx.Response(404)
+
+        results = validators.check_assets(
+            [
+                "https://example.com/a.tif",
+                "https://example.com/missing.tif",
+                "https://example.com/a.tif",
+                "s3://test-bucket/test-key",
+                "ftp://example.com/unsupported.tif",
+            ]
+        )
+
+        assert results == {
+            "https://example.com/a.tif": None,
+            "https://example.com/missing.tif": "Asset not accessible: 404 Not Found",
+            "s3://test-bucket/test-key": None,
+            "ftp://example.com/unsupported.tif": None,
+        }
+        assert len(mock_http.requests) == 2
+        mock_s3_client.head_object.assert_called_once_with(
+            Bucket="test-bucket", Key="test-key"
+        )
+
+    def test_check_assets_reports_bad_hrefs(self, mock_settings, mock_http, mock_boto3):
+        """Test hrefs that cannot be requested fail on their own."""
+        _, mock_s3_client = mock_boto3
+        mock_s3_client.head_object.side_effect = EndpointConnectionError(
+            endpoint_url="https://test-bucket.s3.amazonaws.com"
+        )
+        hrefs = [
+            "https://example.com/a.tif",
+            "http://example.com:abc/a.tif",
+            "http://xn--a.com/a.tif",
+            "http://[::1/a.tif",
+            "s3:///test-key",
+            "s3://test-bucket/",
+            "s3://test-bucket/test-key",
+        ]
+
+        results = validators.check_assets(hrefs)
+
+        assert list(results) == hrefs
+        assert results["https://example.com/a.tif"] is None
+        for href in hrefs[1:]:
+            assert results[href].startswith("Asset not accessible"), href
+        assert "Could not connect" in results["s3://test-bucket/test-key"]
+        mock_s3_client.head_object.assert_called_once_with(
+            Bucket="test-bucket", Key="test-key"
+        )
+
+    def test_check_assets_limits_concurrency(self, mock_http):
+        """Test check_assets keeps at most the per-host and overall limits in flight."""
+        validators.check_assets([f"https://a.example.com/{i}.tif" for i in range(10)])
+        assert mock_http.in_flight["max"] == 2
+
+        mock_http.in_flight["max"] = 0
+        validators.check_assets(
+            [f"https://{host}.example.com/{i}.tif" for host in "bcd" for i in range(10)]
+        )
+        assert mock_http.in_flight["max"] == 4
+
+    @pytest.mark.parametrize(
+        "mock_http",
+        [{"cache_size": 10, "cache_ttl": 60, "cache_failure_ttl": 0.2}],
+        indirect=True,
+    )
+    def test_check_assets_cached(self, mock_http):
+        """Test check results are cached, failures for a shorter time."""
+        mock_http.responses["https://example.com/missing.tif"] = httpx.Response(404)
+        hrefs = ["https://example.com/a.tif", "https://example.com/missing.tif"]
+
+        first = validators.check_assets(hrefs)
+        second = validators.check_assets(hrefs)
+        with pytest.raises(ValueError, match="404 Not Found"):
+            validators.url_is_accessible("https://example.com/missing.tif")
+
+        assert first == second
+        assert len(mock_http.requests) == 2
+        assert validators.asset_cache_info() == {
+            "hits": 3,
+            "misses": 2,
+            "size": 2,
+            "maxsize": 10,
+        }
+
+        # the asset is fixed, the failure expires
+        del mock_http.responses["https://example.com/missing.tif"]
+        time.sleep(0.3)
+        assert validators.check_assets(hrefs) == dict.fromkeys(hrefs)
+        assert [str(r.url) for r in mock_http.requests[2:]] == [hrefs[1]]
+
+    @pytest.mark.parametrize(
+        "mock_http",
+        [{"cache_size": 10, "cache_ttl": 60, "cache_failure_ttl": 60}],
+        indirect=True,
+    )
+    def test_s3_check_cached_by_requester_pays(
+        self, mock_settings, mock_http, mock_boto3
+    ):
+        """Test S3 results are cached by bucket, key and requester pays."""
+        _, mock_s3_client = mock_boto3
+
+        for requester_pays in [False, False, True, True]:
+            mock_settings.requester_pays = requester_pays
+            validators.s3_object_is_accessible("test-bucket", "test-key")
+
+        assert mock_s3_client.head_object.call_count == 2
 
     def test_s3_object_is_accessible_success(self, mock_settings, mock_boto3):
         """Test s3_object_is_accessible when the object is accessible."""
@@ -139,6 +139,30 @@ export interface StacLoaderProps {
    * If you want to enable the option to upload a boilerplate collection record
    * in the event that the collection record does not yet exist for an item that
    * is set to be loaded, set the variable `"CREATE_COLLECTIONS_IF_MISSING": "TRUE"`.
+   *
+   * Other optional settings:
+   * - `FAST_VALIDATION`: when set, items are only checked for the fields the
+   *   loader needs (id, type, collection, geometry, bbox, datetime) and the full
+   *   stac-pydantic validation is only run for items that fail that check. The
+   *   check is strict: items whose values stac-pydantic would have to convert,
+   *   such as numeric datetimes or string bbox values, are validated in full.
+   * - `S3_FETCH_CONCURRENCY`: number of STAC objects fetched from S3 in parallel
+   *   for S3 event notifications (default 16).
+   * - `LOAD_CONCURRENCY`: number of collections in a batch whose items are
+   *   loaded in parallel, each on its own database connection (default 1). Every
+   *   concurrent Lambda instance may hold this many connections.
+   * - `TIME_BUDGET_MARGIN_SECONDS`: collection loads are not started when their
+   *   estimated duration (from recent loads) would end less than this many
+   *   seconds before the function timeout; their messages are returned as
+   *   batch item failures and retried (default 10).
+   * - `BULK_LOAD`: when set, items are streamed into pgstac's upsert staging
+   *   table with `COPY` and upserted set-wise by pgstac, instead of going through
+   *   the pypgstac loader. Recommended for large batches.
+   * - `COLLECTION_CACHE_TTL_SECONDS`: how long a warm function remembers that a
+   *   collection exists before checking again when
+   *   `CREATE_COLLECTIONS_IF_MISSING` is set (default 300).
+   * - `JSON_BACKEND`: set to `json` to decode messages with the standard library
+   *   instead of orjson.
    */
   readonly environment?: { [key: string]: string };
 
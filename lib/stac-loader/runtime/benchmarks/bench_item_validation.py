@@ -0,0 +1,134 @@
+"""Microbenchmark full vs. fast item validation in the stac-loader.
+
+Runs ``process_record`` over a batch of SQS records carrying realistic items
+with many assets (raster/eo metadata per asset) and reports records/sec and the
+peak memory allocated while processing the batch::
+
+    uv run python lib/stac-loader/runtime/benchmarks/bench_item_validation.py
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "utils"))
+
+from stac_loader.handler import process_record  # noqa: E402
+
+
+def make_item(item_id, n_assets):
+    assets = {
+        f"B{i:02d}": {
+            "href": f"s3://bench-bucket/scenes/{item_id}/B{i:02d}.tif",
+            "type": "image/tiff; application=geotiff; profile=cloud-optimized",
+            "title": f"Band {i}",
+            "roles": ["data"],
+            "eo:bands": [{"name": f"B{i:02d}", "center_wavelength": 0.4 + i / 100}],
+            "raster:bands": [
+                {
+                    "nodata": 0,
+                    "data_type": "uint16",
+                    "spatial_resolution": 10,
+                    "scale": 0.0001,
+                    "offset": -0.1,
+                    "statistics": {"minimum": 1, "maximum": 65535},
+                }
+            ],
+            "proj:shape": [10980, 10980],
+            "proj:transform": [10, 0, 600000, 0, -10, 5000040, 0, 0, 1],
+        }
+        for i in range(n_assets)
+    }
+    return {
+        "type": "Feature",
+        "stac_version": "1.1.0",
+        "stac_extensions": [
+            "https://stac-extensions.github.io/eo/v1.1.0/schema.json",
+            "https://stac-extensions.github.io/raster/v1.1.0/schema.json",
+            "https://stac-extensions.github.io/projection/v1.1.0/schema.json",
+        ],
+        "id": item_id,
+        "collection": "bench-collection",
+        "geometry": {
+            "type": "Polygon",
+            "coordinates": [
+                [
+                    [-105.0, 39.0],
+                    [-104.0, 39.0],
+                    [-104.0, 40.0],
+                    [-105.0, 40.0],
+                    [-105.0, 39.0],
+                ]
+            ],
+        },
+        "bbox": [-105.0, 39.0, -104.0, 40.0],
+        "properties": {
+            "datetime": "2025-01-01T17:30:00Z",
+            "platform": "sentinel-2a",
+            "eo:cloud_cover": 12.5,
+            "proj:epsg": 32613,
+        },
+        "links": [
+            {"rel": "self", "href": f"https://example.com/items/{item_id}.json"},
+            {"rel": "collection", "href": "https://example.com/collection.json"},
+        ],
+        "assets": assets,
+    }
+
+
+def make_records(n_records, n_assets):
+    records = []
+    for i in range(n_records):
+        sns_message = {
+            "Message": json.dumps(make_item(f"bench-item-{i}", n_assets)),
+            "Timestamp": "2025-01-01T00:00:00Z",
+        }
+        records.append({"messageId": f"message-{i}", "body": json.dumps(sns_message)})
+    return records
+
+
+def run(records):
+    collections_dict = defaultdict(tuple)
+    items_by_collection = defaultdict(dict)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for record in records:
+        failure = process_record(record, collections_dict, items_by_collection)
+        assert failure is None, failure
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--assets", type=int, default=40)
+    args = parser.parse_args()
+
+    records = make_records(args.records, args.assets)
+    print(f"{args.records} records with {args.assets} assets each")
+
+    for mode in ("full", "fast"):
+        if mode == "fast":
+            os.environ["FAST_VALIDATION"] = "true"
+        else:
+            os.environ.pop("FAST_VALIDATION", None)
+
+        elapsed, peak = run(records)
+        print(
+            f"{mode:>5}: {args.records / elapsed:10.1f} records/s  "
+            f"peak memory {peak / 2**20:8.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Microbenchmark the stdlib and orjson JSON backends in the stac-loader.
+
+Decodes the SQS -> SNS -> STAC nesting of a batch of records with each backend,
+then runs the whole ``process_record`` path (fast validation) with each backend
+so the decode share of a batch is visible::
+
+    uv run python lib/stac-loader/runtime/benchmarks/bench_json_decode.py
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "utils"))
+
+from bench_item_validation import make_records  # noqa: E402
+from stac_loader import json_backend  # noqa: E402
+from stac_loader.handler import process_record  # noqa: E402
+
+
+def decode(records):
+    start = time.perf_counter()
+    for record in records:
+        sns_notification = json_backend.loads(record["body"])
+        json_backend.loads(sns_notification["Message"])
+    return time.perf_counter() - start
+
+
+def process(records):
+    collections_dict = defaultdict(tuple)
+    items_by_collection = defaultdict(dict)
+
+    start = time.perf_counter()
+    for record in records:
+        failure = process_record(record, collections_dict, items_by_collection)
+        assert failure is None, failure
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--assets", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if json_backend.orjson is None:
+        sys.exit("orjson is not installed")
+
+    os.environ["FAST_VALIDATION"] = "true"
+    records = make_records(args.records, args.assets)
+    print(f"{args.records} records with {args.assets} assets each")
+
+    for backend in ("json", "orjson"):
+        json_backend.BACKEND = backend
+        decode_time = min(decode(records) for _ in range(args.repeat))
+        process_time = min(process(records) for _ in range(args.repeat))
+        print(
+            f"{backend:>6}: decode {args.records / decode_time:10.1f} records/s  "
+            f"process_record {args.records / process_time:10.1f} records/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Benchmark serial vs. concurrent fetching of S3-event STAC objects.
+
+S3 is emulated with moto, so add a simulated round-trip latency with
+``--latency-ms`` to get numbers closer to a real bucket::
+
+    uv run --with "moto[s3]" python \\
+        lib/stac-loader/runtime/benchmarks/bench_s3_prefetch.py --records 1000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import boto3
+from botocore import handlers
+from moto import mock_s3
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "utils"))
+
+from stac_loader import handler as stac_loader  # noqa: E402
+
+BUCKET = "bench-bucket"
+
+
+def make_item(item_id):
+    return {
+        "id": item_id,
+        "type": "Feature",
+        "collection": "bench-collection",
+        "geometry": {"type": "Point", "coordinates": [0, 0]},
+        "bbox": [0, 0, 0, 0],
+        "properties": {"datetime": "2025-01-01T00:00:00Z"},
+        "assets": {},
+        "links": [],
+        "stac_version": "1.1.0",
+    }
+
+
+def make_record(key, message_id):
+    s3_event = {
+        "Records": [
+            {
+                "eventSource": "aws:s3",
+                "s3": {"bucket": {"name": BUCKET}, "object": {"key": key}},
+            }
+        ]
+    }
+    sns_message = {"Message": json.dumps(s3_event), "Timestamp": "2025-01-01T00:00:00Z"}
+    return {"messageId": message_id, "body": json.dumps(sns_message)}
+
+
+def serial(records):
+    for record in records:
+        message_str = json.loads(record["body"])["Message"]
+        stac_loader.process_s3_event(message_str)
+
+
+def concurrent(records):
+    for future in stac_loader.prefetch_s3_objects(records).values():
+        future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+    def simulate_latency(**kwargs):
+        time.sleep(args.latency_ms / 1000)
+
+    handlers.BUILTIN_HANDLERS.append(("before-call.s3.GetObject", simulate_latency))
+
+    with mock_s3():
+        s3 = boto3.client("s3")
+        s3.create_bucket(Bucket=BUCKET)
+        records = []
+        for i in range(args.records):
+            key = f"items/bench-item-{i}.json"
+            s3.put_object(Bucket=BUCKET, Key=key, Body=json.dumps(make_item(key)))
+            records.append(make_record(key, f"message-{i}"))
+
+        print(
+            f"{args.records} records, {args.latency_ms}ms simulated latency, "
+            f"S3_FETCH_CONCURRENCY={stac_loader.S3_FETCH_CONCURRENCY}"
+        )
+        for name, fetch in (("serial", serial), ("concurrent", concurrent)):
+            start = time.perf_counter()
+            fetch(records)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{name:>10}: {elapsed:8.3f}s  {args.records / elapsed:10.1f} records/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
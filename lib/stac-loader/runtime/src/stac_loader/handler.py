@@ -1,22 +1,34 @@
-import json
 import logging
 import os
-from collections import defaultdict
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from queue import Queue
 from typing import (
     TYPE_CHECKING,
     Annotated,
     Any,
+    Callable,
     DefaultDict,
+    Deque,
     Dict,
+    Iterable,
     List,
+    Literal,
+    NotRequired,
     Optional,
+    Set,
     Tuple,
     TypedDict,
 )
 
 import boto3.session
-from pydantic import ValidationError
+import orjson
+from botocore.config import Config
+from pydantic import AfterValidator, AwareDatetime, TypeAdapter, ValidationError
 from pypgstac.db import PgstacDB
 from pypgstac.load import Loader, Methods
 from stac_pydantic.collection import Collection, Extent, SpatialExtent, TimeInterval
@@ -24,6 +36,8 @@ from stac_pydantic.item import Item
 from stac_pydantic.links import Link, Links
 from utils import get_secret_dict_by_name
 
+from stac_loader import json_backend
+
 if TYPE_CHECKING:
     from aws_lambda_typing.context import Context
 else:
@@ -46,6 +60,14 @@ logger.addHandler(log_handler)
 botocore_logger = logging.getLogger("botocore")
 botocore_logger.setLevel(logging.WARN)
 
+S3_FETCH_CONCURRENCY = int(os.environ.get("S3_FETCH_CONCURRENCY", "16"))
+LOAD_CONCURRENCY = max(1, int(os.environ.get("LOAD_CONCURRENCY", "1")))
+COLLECTION_CACHE_TTL_SECONDS = float(
+    os.environ.get("COLLECTION_CACHE_TTL_SECONDS", "300")
+)
+TIME_BUDGET_MARGIN_SECONDS = float(os.environ.get("TIME_BUDGET_MARGIN_SECONDS", "10"))
+LOAD_HISTORY_SIZE = 20
+
 CollectionRecords = DefaultDict[str, Tuple[Dict[str, Any], str, datetime]]
 CollectionItems = DefaultDict[str, Dict[str, Tuple[Dict[str, Any], str, datetime]]]
 
@@ -58,6 +80,104 @@ class PartialBatchFailureResponse(TypedDict):
     batchItemFailures: List[BatchItemFailure]
 
 
+RFC3339_DATETIME_PATTERN = re.compile(
+    r"\d{4}-\d{2}-\d{2}[Tt ]\d{2}:\d{2}:\d{2}(\.\d+)?([Zz]|[+-]\d{2}:\d{2})"
+)
+aware_datetime_adapter = TypeAdapter(AwareDatetime)
+
+
+def check_rfc3339_datetime(value: str) -> str:
+    """Check that a string is an RFC 3339 date-time, keeping it unchanged."""
+    if not RFC3339_DATETIME_PATTERN.fullmatch(value):
+        raise ValueError(f"{value!r} is not an RFC 3339 date-time")
+    aware_datetime_adapter.validate_strings(value, strict=True)
+    return value
+
+
+def check_bbox_length(value: List[float]) -> List[float]:
+    if len(value) not in (4, 6):
+        raise ValueError("bbox must have 4 or 6 values")
+    return value
+
+
+Rfc3339Datetime = Annotated[str, AfterValidator(check_rfc3339_datetime)]
+
+
+class ItemGeometryStructure(TypedDict):
+    type: Literal[
+        "Point",
+        "MultiPoint",
+        "LineString",
+        "MultiLineString",
+        "Polygon",
+        "MultiPolygon",
+        "GeometryCollection",
+    ]
+    coordinates: NotRequired[List[Any]]
+    geometries: NotRequired[List[Any]]
+
+
+class ItemPropertiesStructure(TypedDict):
+    datetime: Optional[Rfc3339Datetime]
+    start_datetime: NotRequired[Rfc3339Datetime]
+    end_datetime: NotRequired[Rfc3339Datetime]
+
+
+class ItemStructure(TypedDict):
+    """The parts of a STAC item that are checked in fast validation mode.
+
+    Validated in strict mode, so that any item stac-pydantic would have to
+    coerce is left to full validation instead of being loaded as it is.
+    """
+
+    id: str
+    type: Literal["Feature"]
+    stac_version: str
+    collection: str
+    geometry: ItemGeometryStructure
+    bbox: Annotated[List[float], AfterValidator(check_bbox_length)]
+    properties: ItemPropertiesStructure
+    assets: Dict[str, Any]
+    links: List[Any]
+
+
+item_structure_adapter = TypeAdapter(ItemStructure)
+
+
+# Warm pgstac connections kept at module level so that they are shared by every
+# collection in a batch and reused across invocations of a warm Lambda container.
+# Each connection is only used by one thread at a time.
+_pgstac_dbs: List[PgstacDB] = []
+_pgstac_db_dsn: Optional[str] = None
+_pgstac_version_checked: Set[PgstacDB] = set()
+
+
+# Ids of collections known to exist in pgstac, mapped to the time.monotonic()
+# value at which that knowledge expires.
+_known_collections: Dict[str, float] = {}
+
+
+# Recent (item count, seconds) samples of item loads per collection, used to
+# estimate how long the next load of a collection will take. Collections are
+# loaded on several threads, so it is only accessed under its lock.
+_load_history: DefaultDict[str, Deque[Tuple[int, float]]] = defaultdict(
+    lambda: deque(maxlen=LOAD_HISTORY_SIZE)
+)
+_load_history_lock = threading.Lock()
+
+
+class BatchLoader(Loader):
+    """pypgstac Loader that only checks the database version once per connection."""
+
+    def check_version(self) -> None:
+        if self.db in _pgstac_version_checked:
+            return
+
+        super().check_version()
+        if any(self.db is db for db in _pgstac_dbs):
+            _pgstac_version_checked.add(self.db)
+
+
 def get_pgstac_dsn() -> str:
     secret_arn = os.getenv("PGSTAC_SECRET_ARN")
     if not secret_arn:
@@ -69,15 +189,99 @@ def get_pgstac_dsn() -> str:
     return f"postgres://{secret_dict['username']}:{secret_dict['password']}@{secret_dict['host']}:{secret_dict['port']}/{secret_dict['dbname']}"
 
 
+def _close_db(db: PgstacDB) -> None:
+    pool = db.pool
+    try:
+        db.disconnect()
+        if pool is not None:
+            pool.close()
+    except Exception as e:
+        logger.debug(f"error while closing pgstac connection: {e}")
+    _pgstac_version_checked.discard(db)
+
+
+def close_pgstac_db() -> None:
+    """Close the warm pgstac connections and forget what is cached about the database."""
+    global _pgstac_dbs, _pgstac_db_dsn
+
+    for db in _pgstac_dbs:
+        _close_db(db)
+
+    _pgstac_dbs = []
+    _pgstac_db_dsn = None
+    _pgstac_version_checked.clear()
+    _known_collections.clear()
+    with _load_history_lock:
+        _load_history.clear()
+
+
+def pgstac_db_is_healthy(db: PgstacDB) -> bool:
+    """Check that a pgstac connection is still open and answering queries."""
+    conn = db.connection
+    if conn is None or conn.closed or conn.broken:
+        return False
+
+    try:
+        conn.execute("SELECT 1", prepare=False)
+    except Exception as e:
+        logger.warning(f"warm pgstac connection failed health check: {e}")
+        return False
+
+    return True
+
+
+def get_pgstac_dbs(pgstac_dsn: str, count: int) -> List[PgstacDB]:
+    """Return ``count`` warm pgstac connections, (re)connecting missing or stale ones."""
+    global _pgstac_dbs, _pgstac_db_dsn
+
+    if _pgstac_db_dsn != pgstac_dsn:
+        close_pgstac_db()
+        _pgstac_db_dsn = pgstac_dsn
+
+    dbs: List[PgstacDB] = []
+    spare = _pgstac_dbs[count:]
+    try:
+        for db in _pgstac_dbs[:count]:
+            if pgstac_db_is_healthy(db):
+                logger.debug("reusing warm pgstac connection.")
+                dbs.append(db)
+            else:
+                _close_db(db)
+
+        while len(dbs) < count:
+            logger.info("opening new pgstac connection.")
+            db = PgstacDB(dsn=pgstac_dsn)
+            db.connect()
+            dbs.append(db)
+    finally:
+        _pgstac_dbs = dbs + spare
+
+    return dbs
+
+
+def get_pgstac_db(pgstac_dsn: str) -> PgstacDB:
+    """Return the warm pgstac connection, (re)connecting if it is missing or stale."""
+    return get_pgstac_dbs(pgstac_dsn, 1)[0]
+
+
 def is_s3_event(message_str: str) -> bool:
     """Check if the event data is an S3 event notification."""
     return "aws:s3" in message_str
 
 
-def get_stac_object_from_s3(bucket_name: str, object_key: str) -> Dict[str, Any]:
-    """Fetch STAC JSON from S3."""
+def get_s3_client(max_pool_connections: int = S3_FETCH_CONCURRENCY):
+    """Create an S3 client that can be shared by the threads fetching a batch."""
     session = boto3.session.Session()
-    s3_client = session.client("s3")
+    return session.client("s3", config=Config(max_pool_connections=max_pool_connections))
+
+
+def get_stac_object_from_s3(
+    bucket_name: str, object_key: str, s3_client=None
+) -> Dict[str, Any]:
+    """Fetch STAC JSON from S3."""
+    if s3_client is None:
+        session = boto3.session.Session()
+        s3_client = session.client("s3")
 
     try:
         logger.debug(f"Fetching STAC object from s3://{bucket_name}/{object_key}")
@@ -92,7 +296,7 @@ def get_stac_object_from_s3(bucket_name: str, object_key: str) -> Dict[str, Any]
             )
             raise ValueError("S3 object is not valid UTF-8 text") from e
 
-        stac_data = json.loads(stac_json)
+        stac_data = json_backend.loads(stac_json)
         logger.debug(
             f"Successfully parsed STAC metadata from S3: {stac_data.get('id', 'unknown')}"
         )
@@ -106,27 +310,33 @@ def get_stac_object_from_s3(bucket_name: str, object_key: str) -> Dict[str, Any]
         raise
 
 
-def process_s3_event(message_str: str) -> Dict[str, Any]:
+def get_s3_object_location(message_str: str) -> Tuple[str, str]:
+    """Return the bucket and key of the STAC object in an S3 event notification."""
+    message_data = json_backend.loads(message_str)
+    records: List[Dict[str, Any]] = message_data.get("Records", [])
+    if not records:
+        raise ValueError("no S3 event records!")
+    elif len(records) > 1:
+        raise ValueError("more than one S3 event record!")
+
+    s3_data = records[0]["s3"]
+    bucket_name = s3_data["bucket"]["name"]
+    object_key = s3_data["object"]["key"]
+
+    # Validate that this looks like a STAC file
+    if not object_key.endswith((".json", ".geojson")):
+        raise ValueError(
+            f"S3 object key does not appear to be a STAC document: {object_key}"
+        )
+
+    return bucket_name, object_key
+
+
+def process_s3_event(message_str: str, s3_client=None) -> Dict[str, Any]:
     """Process an S3 event notification and return STAC metadata."""
     try:
-        message_data = json.loads(message_str)
-        records: List[Dict[str, Any]] = message_data.get("Records", [])
-        if not records:
-            raise ValueError("no S3 event records!")
-        elif len(records) > 1:
-            raise ValueError("more than one S3 event record!")
-
-        s3_data = records[0]["s3"]
-        bucket_name = s3_data["bucket"]["name"]
-        object_key = s3_data["object"]["key"]
-
-        # Validate that this looks like a STAC file
-        if not object_key.endswith((".json", ".geojson")):
-            raise ValueError(
-                f"S3 object key does not appear to be a STAC document: {object_key}"
-            )
-
-        stac_data = get_stac_object_from_s3(bucket_name, object_key)
+        bucket_name, object_key = get_s3_object_location(message_str)
+        stac_data = get_stac_object_from_s3(bucket_name, object_key, s3_client)
 
         return stac_data
 
@@ -138,42 +348,185 @@ def process_s3_event(message_str: str) -> Dict[str, Any]:
         raise
 
 
-def parse_message_data(message_id: str, message_str: str) -> Dict[str, Any]:
+def prefetch_s3_objects(
+    records: List[Dict[str, Any]],
+) -> Dict[str, "Future[Dict[str, Any]]"]:
+    """Start fetching the STAC objects referenced by the S3 events in a batch.
+
+    The objects are fetched concurrently through one shared S3 client and the
+    futures are keyed by SQS message id. Records that cannot be parsed here are
+    skipped so that process_record reports their failure as usual.
+    """
+    locations: Dict[str, Tuple[str, str]] = {}
+    for record in records:
+        message_id = record.get("messageId")
+        sqs_body_str = record.get("body")
+        if not message_id or not isinstance(sqs_body_str, str):
+            continue
+        if not is_s3_event(sqs_body_str):
+            continue
+
+        try:
+            message_str = json_backend.loads(sqs_body_str)["Message"]
+            if is_s3_event(message_str):
+                locations[message_id] = get_s3_object_location(message_str)
+        except Exception:
+            continue
+
+    if not locations:
+        return {}
+
+    logger.info(f"Fetching {len(locations)} STAC objects from S3.")
+    max_workers = max(1, min(S3_FETCH_CONCURRENCY, len(locations)))
+    s3_client = get_s3_client(max_pool_connections=max_workers)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = {
+        message_id: executor.submit(
+            get_stac_object_from_s3, bucket_name, object_key, s3_client
+        )
+        for message_id, (bucket_name, object_key) in locations.items()
+    }
+    executor.shutdown(wait=False)
+
+    return futures
+
+
+def parse_message_data(
+    message_id: str,
+    message_str: str,
+    prefetched_objects: Optional[Dict[str, "Future[Dict[str, Any]]"]] = None,
+) -> Dict[str, Any]:
     """Parse message data, handling both S3 events and direct STAC JSON."""
     if is_s3_event(message_str):
         logger.debug(f"[{message_id}] Processing S3 event notification")
+        if prefetched_objects and message_id in prefetched_objects:
+            return prefetched_objects[message_id].result()
         return process_s3_event(message_str)
     else:
-        return json.loads(message_str)
+        return json_backend.loads(message_str)
+
+
+def is_position(value: Any) -> bool:
+    return (
+        isinstance(value, list)
+        and len(value) in (2, 3)
+        and all(
+            isinstance(number, (int, float)) and not isinstance(number, bool)
+            for number in value
+        )
+    )
+
+
+def is_line_string(value: Any, min_positions: int = 2) -> bool:
+    return (
+        isinstance(value, list)
+        and len(value) >= min_positions
+        and all(is_position(position) for position in value)
+    )
+
+
+def is_linear_ring(value: Any) -> bool:
+    return is_line_string(value, min_positions=4) and value[0] == value[-1]
+
+
+def is_list_of(value: Any, check: Callable[[Any], bool]) -> bool:
+    return isinstance(value, list) and all(check(part) for part in value)
+
+
+def has_valid_geometry(geometry: Any) -> bool:
+    """Check that a GeoJSON geometry's coordinates nest as its type requires."""
+    if not isinstance(geometry, dict):
+        return False
+
+    geometry_type = geometry.get("type")
+    if geometry_type == "GeometryCollection":
+        return is_list_of(geometry.get("geometries"), has_valid_geometry)
+
+    coordinates = geometry.get("coordinates")
+    if geometry_type == "Point":
+        return is_position(coordinates)
+    if geometry_type == "MultiPoint":
+        return is_list_of(coordinates, is_position)
+    if geometry_type == "LineString":
+        return is_line_string(coordinates)
+    if geometry_type == "MultiLineString":
+        return is_list_of(coordinates, is_line_string)
+    if geometry_type == "Polygon":
+        return is_list_of(coordinates, is_linear_ring)
+    if geometry_type == "MultiPolygon":
+        return is_list_of(
+            coordinates, lambda polygon: is_list_of(polygon, is_linear_ring)
+        )
+    return False
+
+
+def has_valid_item_structure(message_data: Dict[str, Any]) -> bool:
+    """Cheaply check the fields of a STAC item that the loader depends on."""
+    try:
+        item = item_structure_adapter.validate_python(message_data, strict=True)
+    except ValidationError:
+        return False
+
+    if not has_valid_geometry(item["geometry"]):
+        return False
+
+    properties = item["properties"]
+    if ("start_datetime" in properties) != ("end_datetime" in properties):
+        return False
+    if properties["datetime"] is None:
+        return "start_datetime" in properties
+
+    return True
+
+
+def validate_item(message_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a STAC item and return it as a JSON-compatible dict.
+
+    When FAST_VALIDATION is set, items that pass the structural check are
+    returned as parsed, and the full stac-pydantic model is only built for
+    items that fail it.
+    """
+    if os.getenv("FAST_VALIDATION") and has_valid_item_structure(message_data):
+        return message_data
+
+    # stac-pydantic defaults a missing stac_version but leaves it out of the dump,
+    # and creating a missing collection reads it from the items
+    if "stac_version" not in message_data:
+        raise ValueError(f"item {message_data.get('id')} is missing a stac_version")
+
+    return Item(**message_data).model_dump(mode="json")
 
 
 def store_item_if_newer(
     items_by_collection: DefaultDict[
         str, Dict[str, Tuple[Dict[str, Any], str, datetime]]
     ],
-    item: Item,
+    item: Dict[str, Any],
     message_id: str,
     sns_timestamp: datetime,
 ) -> None:
     """Store item if it's newer than existing version."""
-    if not item.collection:
-        raise KeyError(f"item {item.id} is missing a collection id!")
+    item_id = item["id"]
+    collection_id = item.get("collection")
+    if not collection_id:
+        raise KeyError(f"item {item_id} is missing a collection id!")
 
-    existing = items_by_collection[item.collection].get(item.id)
+    existing = items_by_collection[collection_id].get(item_id)
     if existing is None or sns_timestamp > existing[2]:
         if existing:
             logger.debug(
-                f"[{message_id}] Replacing older version of item {item.id} "
+                f"[{message_id}] Replacing older version of item {item_id} "
                 f"(old timestamp: {existing[2]}, new timestamp: {sns_timestamp})"
             )
-        items_by_collection[item.collection][item.id] = (
-            item.model_dump(mode="json"),
+        items_by_collection[collection_id][item_id] = (
+            item,
             message_id,
             sns_timestamp,
         )
     else:
         logger.debug(
-            f"[{message_id}] Skipping older version of item {item.id} "
+            f"[{message_id}] Skipping older version of item {item_id} "
             f"(existing timestamp: {existing[2]}, message timestamp: {sns_timestamp})"
         )
 
@@ -208,6 +561,7 @@ def process_record(
     record: Dict[str, Any],
     collections_dict: CollectionRecords,
     items_by_collection: CollectionItems,
+    prefetched_objects: Optional[Dict[str, "Future[Dict[str, Any]]"]] = None,
 ) -> Optional[BatchItemFailure]:
     """Process a single SQS record and return failure if processing fails."""
     message_id = record.get("messageId")
@@ -218,7 +572,7 @@ def process_record(
     try:
         sqs_body_str = record["body"]
         logger.debug(f"[{message_id}] SQS message body: {sqs_body_str}")
-        sns_notification = json.loads(sqs_body_str)
+        sns_notification = json_backend.loads(sqs_body_str)
 
         message_str = sns_notification["Message"]
         logger.debug(f"[{message_id}] SNS Message content: {message_str}")
@@ -227,10 +581,10 @@ def process_record(
         sns_timestamp = datetime.fromisoformat(sns_timestamp_str.replace("Z", "+00:00"))
         logger.debug(f"[{message_id}] SNS Timestamp: {sns_timestamp}")
 
-        message_data = parse_message_data(message_id, message_str)
+        message_data = parse_message_data(message_id, message_str, prefetched_objects)
 
         if message_data["type"] == "Feature":
-            item = Item(**message_data)
+            item = validate_item(message_data)
             store_item_if_newer(items_by_collection, item, message_id, sns_timestamp)
         elif message_data["type"] == "Collection":
             collection = Collection(**message_data)
@@ -245,7 +599,7 @@ def process_record(
         logger.debug(f"[{message_id}] Successfully processed.")
         return None
 
-    except (ValueError, KeyError, ValidationError, json.JSONDecodeError) as e:
+    except (ValueError, KeyError, ValidationError, json_backend.JSONDecodeError) as e:
         logger.error(f"[{message_id}] Failed with error: {e}", extra=record)
         return {"itemIdentifier": message_id}
     except Exception as e:
@@ -255,7 +609,7 @@ def process_record(
 
 def load_collections_to_db(
     collections_dict: DefaultDict[str, Tuple[Dict[str, Any], str, datetime]],
-    pgstac_dsn: str,
+    db: PgstacDB,
 ) -> List[BatchItemFailure]:
     """Load collections to database and return failures."""
     if not collections_dict:
@@ -265,20 +619,44 @@ def load_collections_to_db(
     message_ids = [msg_id for _, msg_id, _ in collections_dict.values()]
 
     try:
-        with PgstacDB(dsn=pgstac_dsn) as db:
-            loader = Loader(db=db)
-            logger.info("loading collections into database.")
-            loader.load_collections(
-                file=collections,  # type: ignore
-                insert_mode=Methods.upsert,
-            )
-            logger.info(f"successfully loaded {len(collections)} collections.")
+        loader = BatchLoader(db=db)
+        logger.info("loading collections into database.")
+        loader.load_collections(
+            file=collections,  # type: ignore
+            insert_mode=Methods.upsert,
+        )
+        logger.info(f"successfully loaded {len(collections)} collections.")
+        remember_collections(collections_dict.keys())
         return []
     except Exception as e:
         logger.error(f"failed to load collections: {str(e)}")
         return [{"itemIdentifier": message_id} for message_id in message_ids]
 
 
+def remember_collections(collection_ids: Iterable[str]) -> None:
+    """Cache the given collection ids as existing for COLLECTION_CACHE_TTL_SECONDS."""
+    expires = time.monotonic() + COLLECTION_CACHE_TTL_SECONDS
+    for collection_id in collection_ids:
+        _known_collections[collection_id] = expires
+
+
+def is_known_collection(collection_id: str) -> bool:
+    """Check whether a collection is cached as existing and the entry has not expired."""
+    expires = _known_collections.get(collection_id)
+    return expires is not None and expires > time.monotonic()
+
+
+def lookup_collections(db: PgstacDB, collection_ids: Iterable[str]) -> None:
+    """Cache which of the given collections exist, with one query for uncached ids."""
+    uncached = [cid for cid in collection_ids if not is_known_collection(cid)]
+    if not uncached:
+        logger.debug("all collections in the batch are cached as existing.")
+        return
+
+    rows = db.query("SELECT id FROM collections WHERE id = ANY(%s)", (uncached,))
+    remember_collections(row[0] for row in rows if row is not None)
+
+
 def ensure_collection_exists(
     db: PgstacDB, loader: Loader, collection_id: str, items: List[Dict[str, Any]]
 ) -> None:
@@ -286,10 +664,12 @@ def ensure_collection_exists(
     if not os.getenv("CREATE_COLLECTIONS_IF_MISSING"):
         return
 
-    collection_exists = db.query_one(
-        f"SELECT count(*) as count from collections where id = '{collection_id}'"
-    )
-    if not collection_exists:
+    if is_known_collection(collection_id):
+        return
+
+    # check again right before creating, the upsert would replace a real collection
+    lookup_collections(db, [collection_id])
+    if not is_known_collection(collection_id):
         logger.info(
             f"[{collection_id}] loading collection into database because it is missing."
         )
@@ -309,36 +689,258 @@ def ensure_collection_exists(
             [collection.model_dump()],  # type: ignore
             insert_mode=Methods.upsert,
         )
+        remember_collections([collection_id])
+
+
+def copy_items_to_db(items: Iterable[Dict[str, Any]], db: PgstacDB) -> int:
+    """Stream items into pgstac's upsert staging table with COPY.
+
+    Each item is serialized and written to the COPY stream one row at a time, so
+    no intermediate list or NDJSON buffer of the whole batch is built. pgstac's
+    statement trigger on ``items_staging_upsert`` then creates any missing
+    partitions and upserts the staged rows into ``items`` set-wise, in the same
+    transaction. Returns the number of rows written.
+
+    Items are serialized with orjson whatever JSON_BACKEND is, as pypgstac's
+    loader does, so both modes store the same content: NaN and Infinity, which
+    jsonb cannot hold, are written as null.
+    """
+    count = 0
+    conn = db.connect()
+    with conn.transaction():
+        with conn.cursor() as cur:
+            with cur.copy("COPY items_staging_upsert (content) FROM STDIN") as copy:
+                for item in items:
+                    copy.write_row((orjson.dumps(item).decode(),))
+                    count += 1
+    return count
+
+
+def get_partition_key(
+    item: Dict[str, Any], partition_trunc: Optional[str]
+) -> Optional[str]:
+    """Return the pgstac datetime partition (YYYY or YYYYMM) an item belongs to.
+
+    Follows pypgstac's Loader.format_item: the start_datetime of items with a
+    datetime range, otherwise the datetime, truncated as written in the item.
+    Returns None when the collection is not partitioned by datetime, or when the
+    item has no datetime string; pgstac still routes or rejects such items itself.
+    """
+    if partition_trunc not in ("year", "month"):
+        return None
+
+    properties = item.get("properties") or {}
+    if (
+        properties.get("start_datetime") is not None
+        and properties.get("end_datetime") is not None
+    ):
+        value = properties["start_datetime"]
+    else:
+        value = properties.get("datetime")
+    if not isinstance(value, str):
+        return None
+
+    return value.replace("-", "")[: 4 if partition_trunc == "year" else 6]
+
+
+def group_items_by_partition(
+    items_dict: Dict[str, Tuple[Dict[str, Any], str, datetime]],
+    partition_trunc: Optional[str],
+) -> List[Tuple[Optional[str], List[Tuple[Dict[str, Any], str]]]]:
+    """Group items by partition key, ordered by key, keeping message ids alongside."""
+    partitions: DefaultDict[Optional[str], List[Tuple[Dict[str, Any], str]]] = (
+        defaultdict(list)
+    )
+    for item_data, msg_id, _ in items_dict.values():
+        partitions[get_partition_key(item_data, partition_trunc)].append(
+            (item_data, msg_id)
+        )
+
+    return sorted(partitions.items(), key=lambda p: (p[0] is not None, p[0] or ""))
+
+
+def load_partition_items(
+    collection_id: str,
+    partition_key: Optional[str],
+    partition_items: List[Tuple[Dict[str, Any], str]],
+    loader: Loader,
+    db: PgstacDB,
+) -> List[BatchItemFailure]:
+    """Load the items of one partition of a collection and return failures."""
+    partition = partition_key or "default"
+    start = time.perf_counter()
+
+    try:
+        if os.getenv("BULK_LOAD"):
+            count = copy_items_to_db((item_data for item_data, _ in partition_items), db)
+        else:
+            count = len(partition_items)
+            loader.load_items(
+                file=[item_data for item_data, _ in partition_items],  # type: ignore
+                insert_mode=Methods.upsert,
+            )
+    except Exception as e:
+        logger.error(
+            f"[{collection_id}] failed to load items for partition {partition}: {str(e)}"
+        )
+        return [{"itemIdentifier": msg_id} for _, msg_id in partition_items]
+
+    logger.info(
+        f"[{collection_id}] loaded {count} items into partition {partition} "
+        f"in {time.perf_counter() - start:.3f}s."
+    )
+    return []
 
 
 def load_items_for_collection(
     collection_id: str,
     items_dict: Dict[str, Tuple[Dict[str, Any], str, datetime]],
-    pgstac_dsn: str,
+    db: PgstacDB,
 ) -> List[BatchItemFailure]:
-    """Load items for a single collection to database and return failures."""
+    """Load items for a single collection to database and return failures.
+
+    Items are grouped by their pgstac partition and each partition is loaded in
+    its own transaction, so a load only locks one partition at a time and a
+    failure only affects the messages of that partition.
+    """
     items = [item_data for item_data, _, _ in items_dict.values()]
-    message_ids = [msg_id for _, msg_id, _ in items_dict.values()]
 
     logger.debug(
         f"[{collection_id}] Processing {len(items)} unique items from {len(items_dict)} dict entries. Item IDs: {list(items_dict.keys())}"
     )
 
     try:
-        with PgstacDB(dsn=pgstac_dsn) as db:
-            loader = Loader(db=db)
-            ensure_collection_exists(db, loader, collection_id, items)
-
-            logger.info(f"[{collection_id}] loading items into database.")
-            loader.load_items(
-                file=items,  # type: ignore
-                insert_mode=Methods.upsert,
-            )
-            logger.info(f"[{collection_id}] successfully loaded {len(items)} items.")
-        return []
+        loader = BatchLoader(db=db)
+        ensure_collection_exists(db, loader, collection_id, items)
+        # (base_item, key, partition_trunc); pypgstac 0.10 appends base_item_id
+        partition_trunc = loader.collection_json(collection_id)[2]
     except Exception as e:
         logger.error(f"[{collection_id}] failed to load items: {str(e)}")
-        return [{"itemIdentifier": msg_id} for msg_id in message_ids]
+        return [{"itemIdentifier": msg_id} for _, msg_id, _ in items_dict.values()]
+
+    partitions = group_items_by_partition(items_dict, partition_trunc)
+    logger.info(
+        f"[{collection_id}] loading {len(items)} items into database "
+        f"({len(partitions)} partition(s), partition_trunc={partition_trunc})."
+    )
+
+    start = time.perf_counter()
+    batch_failures: List[BatchItemFailure] = []
+    for partition_key, partition_items in partitions:
+        batch_failures.extend(
+            load_partition_items(
+                collection_id, partition_key, partition_items, loader, db
+            )
+        )
+
+    logger.info(
+        f"[{collection_id}] loaded {len(items) - len(batch_failures)} of "
+        f"{len(items)} items in {time.perf_counter() - start:.3f}s."
+    )
+    return batch_failures
+
+
+def record_load_time(collection_id: str, item_count: int, seconds: float) -> None:
+    """Remember how long loading a number of items into a collection took."""
+    with _load_history_lock:
+        _load_history[collection_id].append((item_count, seconds))
+
+
+def estimate_load_time(collection_id: str, item_count: int) -> float:
+    """Estimate the seconds needed to load a number of items into a collection.
+
+    Uses the per-item rate of recent loads into the same collection, or of all
+    collections when it has no history yet, and 0 when nothing has been loaded.
+    """
+    with _load_history_lock:
+        samples = list(_load_history.get(collection_id, ()))
+        if not samples:
+            samples = [sample for history in _load_history.values() for sample in history]
+
+    total_items = sum(count for count, _ in samples)
+    if not total_items:
+        return 0.0
+
+    return item_count * sum(seconds for _, seconds in samples) / total_items
+
+
+def load_items_by_collection(
+    items_by_collection: CollectionItems,
+    dbs: List[PgstacDB],
+    deadline: Optional[float] = None,
+) -> List[BatchItemFailure]:
+    """Load the items of every collection, one load per connection at a time.
+
+    Failures are returned in collection order, whichever load finishes first.
+    When a ``deadline`` (a ``time.monotonic()`` value) is given, a collection
+    load is not started if its estimated duration would run past it; the
+    messages of such collections are reported as failures so that only they
+    are retried.
+    """
+
+    def load(
+        collection_id: str,
+        items_dict: Dict[str, Tuple[Dict[str, Any], str, datetime]],
+        db: PgstacDB,
+    ) -> List[BatchItemFailure]:
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            estimate = estimate_load_time(collection_id, len(items_dict))
+            if estimate >= remaining:
+                logger.warning(
+                    f"[{collection_id}] not loading {len(items_dict)} items: "
+                    f"estimated {estimate:.1f}s, {remaining:.1f}s of budget left."
+                )
+                return [
+                    {"itemIdentifier": msg_id} for _, msg_id, _ in items_dict.values()
+                ]
+
+        start = time.monotonic()
+        failures = load_items_for_collection(collection_id, items_dict, db)
+        # failed loads, e.g. of a missing collection, can end before any item
+        # was loaded and would make the estimates too low
+        if not failures:
+            record_load_time(collection_id, len(items_dict), time.monotonic() - start)
+        return failures
+
+    if len(dbs) == 1 or len(items_by_collection) <= 1:
+        return [
+            failure
+            for collection_id, items_dict in items_by_collection.items()
+            for failure in load(collection_id, items_dict, dbs[0])
+        ]
+
+    idle_dbs: Queue[PgstacDB] = Queue()
+    for db in dbs:
+        idle_dbs.put(db)
+
+    def load_on_idle_db(
+        collection_id: str, items_dict: Dict[str, Tuple[Dict[str, Any], str, datetime]]
+    ) -> List[BatchItemFailure]:
+        db = idle_dbs.get()
+        try:
+            return load(collection_id, items_dict, db)
+        finally:
+            idle_dbs.put(db)
+
+    with ThreadPoolExecutor(max_workers=len(dbs)) as executor:
+        futures = {
+            collection_id: executor.submit(load_on_idle_db, collection_id, items_dict)
+            for collection_id, items_dict in items_by_collection.items()
+        }
+
+    batch_failures: List[BatchItemFailure] = []
+    for collection_id, future in futures.items():
+        try:
+            batch_failures.extend(future.result())
+        except Exception as e:
+            logger.error(f"[{collection_id}] failed to load items: {str(e)}")
+            batch_failures.extend(
+                {"itemIdentifier": msg_id}
+                for _, msg_id, _ in items_by_collection[collection_id].values()
+            )
+
+    return batch_failures
 
 
 def handler(
@@ -352,22 +954,52 @@ def handler(
     logger.debug(
         f"Lambda Context: RequestId={aws_request_id}, RemainingTime={remaining_time}ms"
     )
+    deadline = (
+        time.monotonic() + remaining_time / 1000 - TIME_BUDGET_MARGIN_SECONDS
+        if isinstance(remaining_time, (int, float))
+        else None
+    )
     pgstac_dsn = get_pgstac_dsn()
 
     batch_failures: List[BatchItemFailure] = []
     collections_dict: CollectionRecords = defaultdict(tuple)
     items_by_collection: CollectionItems = defaultdict(dict)
 
+    prefetched_objects = prefetch_s3_objects(records)
+
     for record in records:
-        if failure := process_record(record, collections_dict, items_by_collection):
+        if failure := process_record(
+            record, collections_dict, items_by_collection, prefetched_objects
+        ):
             batch_failures.append(failure)
 
-    batch_failures.extend(load_collections_to_db(collections_dict, pgstac_dsn))
+    if collections_dict or items_by_collection:
+        try:
+            dbs = get_pgstac_dbs(
+                pgstac_dsn, min(LOAD_CONCURRENCY, max(1, len(items_by_collection)))
+            )
+        except Exception as e:
+            logger.error(f"failed to connect to pgstac: {str(e)}")
+            batch_failures.extend(
+                {"itemIdentifier": msg_id} for _, msg_id, _ in collections_dict.values()
+            )
+            batch_failures.extend(
+                {"itemIdentifier": msg_id}
+                for items_dict in items_by_collection.values()
+                for _, msg_id, _ in items_dict.values()
+            )
+        else:
+            batch_failures.extend(load_collections_to_db(collections_dict, dbs[0]))
 
-    for collection_id, items_dict in items_by_collection.items():
-        batch_failures.extend(
-            load_items_for_collection(collection_id, items_dict, pgstac_dsn)
-        )
+            if os.getenv("CREATE_COLLECTIONS_IF_MISSING") and items_by_collection:
+                try:
+                    lookup_collections(dbs[0], items_by_collection.keys())
+                except Exception as e:
+                    logger.warning(f"failed to look up batch collections: {str(e)}")
+
+            batch_failures.extend(
+                load_items_by_collection(items_by_collection, dbs, deadline)
+            )
 
     if batch_failures:
         logger.warning(
@@ -0,0 +1,50 @@
+"""Fast JSON encoding and decoding.
+
+orjson is used when it can be imported, with the standard library as a
+fallback. Set JSON_BACKEND=json to force the standard library. Both backends
+raise json.JSONDecodeError (orjson's error is a subclass of it) on bad input.
+
+orjson rejects the NaN and Infinity literals that the standard library reads
+and writes, and that raster metadata often contains (e.g. a NaN nodata value),
+so documents orjson cannot parse are parsed again with the standard library.
+orjson writes NaN and Infinity as null.
+
+This module is duplicated in lib/stac-loader and lib/stactools-item-generator:
+each Lambda image is built from its own runtime directory, and there is no
+shared Python package for them to depend on. Keep the two copies identical.
+"""
+
+import json
+import os
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+JSONDecodeError = json.JSONDecodeError
+
+BACKEND = (
+    "orjson"
+    if orjson is not None and os.environ.get("JSON_BACKEND", "orjson") == "orjson"
+    else "json"
+)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Deserialize a JSON document."""
+    if BACKEND == "orjson":
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # NaN or Infinity, or not JSON at all, which json raises for too
+            pass
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> str:
+    """Serialize an object to a compact JSON string."""
+    if BACKEND == "orjson":
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"))
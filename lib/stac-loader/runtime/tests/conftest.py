@@ -92,6 +92,11 @@ def cleanup_test_items(database_url):
     Fixture to clean up test items after each test.
     The autouse=True makes this run automatically for each test.
     """
+    from stac_loader.handler import close_pgstac_db
+
+    # Start every test without a warm connection left over from a previous test
+    close_pgstac_db()
+
     yield
 
     # After the test completes, clean up items that match our test pattern
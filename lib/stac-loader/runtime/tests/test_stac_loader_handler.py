@@ -1,5 +1,7 @@
 import json
 import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from unittest.mock import MagicMock, patch
 
@@ -14,8 +16,10 @@ from conftest import (
     get_collection,
     get_item,
 )
+from pydantic import ValidationError
 from pypgstac.db import PgstacDB
 from stac_loader.handler import get_pgstac_dsn, handler
+from stac_pydantic.item import Item
 
 
 def create_sqs_record(item_data, message_id="test-message-id", timestamp=None):
@@ -343,7 +347,9 @@ def test_handler_with_malformed_sqs_message(mock_aws_context, mock_pgstac_dsn):
     )
 
 
-@pytest.mark.parametrize("missing_field", ["id", "type", "geometry", "properties"])
+@pytest.mark.parametrize(
+    "missing_field", ["id", "type", "stac_version", "geometry", "properties"]
+)
 def test_handler_with_missing_required_fields(
     mock_aws_context, mock_pgstac_dsn, missing_field
 ):
@@ -1472,3 +1478,877 @@ def test_handler_collection_creation_failure(
     assert not check_item_exists(database_url, missing_collection_id, item_id), (
         "Item should not have been added to the database"
     )
+
+
+def test_handler_reuses_connection_across_collections_and_invocations(
+    mock_aws_context, mock_pgstac_dsn, database_url
+):
+    """Test that one warm connection serves every collection in every batch"""
+    event = {
+        "Records": [
+            create_sqs_record(
+                create_valid_stac_item(
+                    collection_id=collection_id, item_id=f"reuse-item-{i}"
+                ),
+                message_id=f"reuse-message-{i}",
+            )
+            for i, collection_id in enumerate(TEST_COLLECTION_IDS)
+        ]
+    }
+
+    with patch("stac_loader.handler.PgstacDB", wraps=PgstacDB) as mock_pgstac_db:
+        assert handler(event, mock_aws_context) is None
+        assert handler(event, mock_aws_context) is None
+
+    assert mock_pgstac_db.call_count == 1
+
+
+def test_handler_reconnects_after_stale_connection(
+    mock_aws_context, mock_pgstac_dsn, database_url
+):
+    """Test that a warm connection that has gone away is replaced"""
+    from stac_loader import handler as handler_module
+
+    collection_id = TEST_COLLECTION_IDS[0]
+    first_item = create_valid_stac_item(collection_id=collection_id, item_id="stale-1")
+    second_item = create_valid_stac_item(collection_id=collection_id, item_id="stale-2")
+
+    with patch("stac_loader.handler.PgstacDB", wraps=PgstacDB) as mock_pgstac_db:
+        assert (
+            handler({"Records": [create_sqs_record(first_item)]}, mock_aws_context)
+            is None
+        )
+
+        # Simulate the server dropping the connection between invocations
+        handler_module._pgstac_dbs[0].connection.close()
+
+        assert (
+            handler({"Records": [create_sqs_record(second_item)]}, mock_aws_context)
+            is None
+        )
+
+    assert mock_pgstac_db.call_count == 2
+    assert check_item_exists(database_url, collection_id, "stale-1")
+    assert check_item_exists(database_url, collection_id, "stale-2")
+
+
+def test_prefetch_s3_objects_shares_one_client():
+    """Test that S3 objects in a batch are fetched through a single client"""
+    from stac_loader.handler import prefetch_s3_objects
+
+    items = {
+        f"stac/items/prefetch-{i}.json": create_valid_stac_item(item_id=f"prefetch-{i}")
+        for i in range(20)
+    }
+    records = [
+        create_sqs_record_with_s3_event("test-bucket", key, message_id=f"s3-{i}")
+        for i, key in enumerate(items)
+    ]
+    # direct STAC messages are left alone
+    records.append(create_sqs_record(create_valid_stac_item(), message_id="direct"))
+
+    def get_object(Bucket, Key):
+        body = MagicMock()
+        body.read.return_value = json.dumps(items[Key]).encode("utf-8")
+        return {"Body": body}
+
+    with patch("stac_loader.handler.boto3.session.Session") as mock_session:
+        mock_s3_client = MagicMock()
+        mock_session.return_value.client.return_value = mock_s3_client
+        mock_s3_client.get_object.side_effect = get_object
+
+        futures = prefetch_s3_objects(records)
+
+        assert set(futures) == {f"s3-{i}" for i in range(20)}
+        for i, key in enumerate(items):
+            assert futures[f"s3-{i}"].result() == items[key]
+
+    mock_session.return_value.client.assert_called_once()
+    assert mock_s3_client.get_object.call_count == 20
+
+
+def test_handler_with_s3_events_partial_fetch_failure(
+    mock_aws_context, mock_pgstac_dsn, database_url
+):
+    """Test that a failed S3 fetch only fails its own record"""
+    collection_id = TEST_COLLECTION_IDS[0]
+    good_keys = [f"stac/items/good-{i}.json" for i in range(5)]
+    bad_key = "stac/items/missing.json"
+
+    records = [
+        create_sqs_record_with_s3_event("test-bucket", key, message_id=f"good-{i}")
+        for i, key in enumerate(good_keys)
+    ]
+    records.append(
+        create_sqs_record_with_s3_event("test-bucket", bad_key, message_id="bad")
+    )
+
+    def get_object(Bucket, Key):
+        if Key == bad_key:
+            raise Exception("S3 object not found")
+        body = MagicMock()
+        item_id = Key.split("/")[-1].removesuffix(".json")
+        body.read.return_value = json.dumps(
+            create_valid_stac_item(collection_id=collection_id, item_id=item_id)
+        ).encode("utf-8")
+        return {"Body": body}
+
+    with patch("stac_loader.handler.boto3.session.Session") as mock_session:
+        mock_s3_client = MagicMock()
+        mock_session.return_value.client.return_value = mock_s3_client
+        mock_s3_client.get_object.side_effect = get_object
+
+        result = handler({"Records": records}, mock_aws_context)
+
+    assert result == {"batchItemFailures": [{"itemIdentifier": "bad"}]}
+    for i in range(5):
+        assert check_item_exists(database_url, collection_id, f"good-{i}")
+
+
+@patch.dict(os.environ, {"FAST_VALIDATION": "true"})
+def test_process_record_fast_validation_skips_pydantic_model():
+    """Test that fast validation keeps the parsed item without building a model"""
+    from stac_loader.handler import process_record
+
+    collections_dict = defaultdict(tuple)
+    items_by_collection = defaultdict(dict)
+    item = create_valid_stac_item(item_id="fast-item")
+    record = create_sqs_record(item, message_id="fast-message")
+
+    with patch("stac_loader.handler.Item") as mock_item:
+        failure = process_record(record, collections_dict, items_by_collection)
+
+    assert failure is None
+    mock_item.assert_not_called()
+    stored_item, message_id, _ = items_by_collection[item["collection"]]["fast-item"]
+    assert stored_item == item
+    assert message_id == "fast-message"
+
+
+@patch.dict(os.environ, {"FAST_VALIDATION": "true"})
+@pytest.mark.parametrize(
+    "properties",
+    [
+        {"datetime": None},
+        {"datetime": "not-a-datetime"},
+    ],
+)
+def test_process_record_fast_validation_falls_back_to_full_validation(properties):
+    """Test that items failing the structural check are validated in full"""
+    from stac_loader.handler import process_record
+
+    items_by_collection = defaultdict(dict)
+    item = create_valid_stac_item(item_id="fallback-item")
+    item["properties"] = properties
+    record = create_sqs_record(item, message_id="fallback-message")
+
+    failure = process_record(record, defaultdict(tuple), items_by_collection)
+
+    assert failure == {"itemIdentifier": "fallback-message"}
+    assert not items_by_collection[item["collection"]]
+
+
+def set_item_field(item, path, value):
+    target = item
+    for key in path[:-1]:
+        target = target[key]
+    target[path[-1]] = value
+
+
+@patch.dict(os.environ, {"FAST_VALIDATION": "true"})
+@pytest.mark.parametrize(
+    "path,value",
+    [
+        (("properties", "datetime"), "2020-01-01"),
+        (("properties", "datetime"), "2020-01-01T00:00:00"),
+        (("bbox",), [0, 0, 1]),
+        (("bbox",), [0, 0, 1, 1, 2]),
+        (("geometry", "coordinates"), [1, 2]),
+        (("geometry", "coordinates"), [[[0, 0], [0, 1], [1, 1], [1, 0]]]),
+        (("geometry",), {"type": "Point", "coordinates": [[0, 0]]}),
+        (("geometry",), {"type": "LineString", "coordinates": [[0, 0]]}),
+        (("geometry",), {"type": "MultiPolygon", "coordinates": [[[0, 0]]]}),
+        (
+            ("geometry",),
+            {"type": "GeometryCollection", "geometries": [{"type": "Point"}]},
+        ),
+        (("properties",), {"datetime": None, "start_datetime": "2020-01-01T00:00:00Z"}),
+    ],
+)
+def test_process_record_fast_validation_rejects_invalid_item(path, value):
+    """Test that items full validation rejects also fail the structural check"""
+    from stac_loader.handler import has_valid_item_structure, process_record
+
+    items_by_collection = defaultdict(dict)
+    item = create_valid_stac_item(item_id="invalid-item")
+    set_item_field(item, path, value)
+    record = create_sqs_record(item, message_id="invalid-message")
+
+    assert not has_valid_item_structure(item)
+    with pytest.raises(ValidationError):
+        Item(**item)
+    failure = process_record(record, defaultdict(tuple), items_by_collection)
+
+    assert failure == {"itemIdentifier": "invalid-message"}
+    assert not items_by_collection[item["collection"]]
+
+
+@patch.dict(os.environ, {"FAST_VALIDATION": "true"})
+@pytest.mark.parametrize(
+    "path,value",
+    [
+        (("properties", "datetime"), 1577836800),
+        (("properties", "datetime"), "1577836800"),
+        (("bbox",), ["0", "0", "1", "1"]),
+        (("bbox",), [0, 0, 1, True]),
+    ],
+)
+def test_process_record_fast_validation_converts_coerced_item(path, value):
+    """Test that items stac-pydantic would coerce are stored as the full model"""
+    from stac_loader.handler import has_valid_item_structure, process_record
+
+    items_by_collection = defaultdict(dict)
+    item = create_valid_stac_item(item_id="coerced-item")
+    set_item_field(item, path, value)
+    record = create_sqs_record(item, message_id="coerced-message")
+
+    assert not has_valid_item_structure(item)
+    failure = process_record(record, defaultdict(tuple), items_by_collection)
+
+    assert failure is None
+    stored_item, _, _ = items_by_collection[item["collection"]]["coerced-item"]
+    assert stored_item == Item(**item).model_dump(mode="json")
+
+
+@patch.dict(os.environ, {"FAST_VALIDATION": "true"})
+@pytest.mark.parametrize(
+    "geometry",
+    [
+        {"type": "Point", "coordinates": [0, 0, 10]},
+        {"type": "MultiPoint", "coordinates": [[0, 0], [1.5, 1]]},
+        {"type": "LineString", "coordinates": [[0, 0], [1, 1]]},
+        {"type": "MultiLineString", "coordinates": [[[0, 0], [1, 1]]]},
+        {
+            "type": "MultiPolygon",
+            "coordinates": [[[[0, 0], [0, 1], [1, 1], [0, 0]]]],
+        },
+        {
+            "type": "GeometryCollection",
+            "geometries": [
+                {"type": "Point", "coordinates": [0, 0]},
+                {"type": "LineString", "coordinates": [[0, 0], [1, 1]]},
+            ],
+        },
+    ],
+)
+def test_has_valid_item_structure_geometry_types(geometry):
+    """Test that well-formed geometries of every type pass the structural check"""
+    from stac_loader.handler import has_valid_item_structure
+
+    item = create_valid_stac_item()
+    item["geometry"] = geometry
+    item["bbox"] = [0, 0, 0, 1, 1, 10]
+
+    assert has_valid_item_structure(item)
+    Item(**item)
+
+
+@pytest.mark.parametrize("fast_validation", ["true", ""])
+def test_process_record_item_with_nan(monkeypatch, fast_validation):
+    """Test that items with NaN values, which orjson rejects, are still parsed"""
+    from stac_loader.handler import process_record
+
+    monkeypatch.setenv("FAST_VALIDATION", fast_validation)
+
+    items_by_collection = defaultdict(dict)
+    item = create_valid_stac_item(item_id="nan-item")
+    item["assets"]["data"] = {
+        "href": "s3://bucket/data.tif",
+        "raster:bands": [{"nodata": float("nan")}],
+    }
+    record = create_sqs_record(item, message_id="nan-message")
+    assert "NaN" in record["body"]
+
+    failure = process_record(record, defaultdict(tuple), items_by_collection)
+
+    assert failure is None
+    assert "nan-item" in items_by_collection[item["collection"]]
+
+
+@pytest.mark.parametrize("fast_validation", ["true", ""])
+def test_process_record_rejects_item_without_stac_version(monkeypatch, fast_validation):
+    """Test that an item without stac_version fails on its own in either mode"""
+    from stac_loader.handler import has_valid_item_structure, process_record
+
+    monkeypatch.setenv("FAST_VALIDATION", fast_validation)
+
+    items_by_collection = defaultdict(dict)
+    item = create_valid_stac_item(item_id="versionless-item")
+    del item["stac_version"]
+    record = create_sqs_record(item, message_id="versionless-message")
+
+    assert not has_valid_item_structure(item)
+    failure = process_record(record, defaultdict(tuple), items_by_collection)
+
+    assert failure == {"itemIdentifier": "versionless-message"}
+    assert not items_by_collection[item["collection"]]
+
+
+def test_process_record_full_validation_by_default(monkeypatch):
+    """Test that items are validated with stac-pydantic unless fast mode is enabled"""
+    from stac_loader.handler import process_record
+
+    monkeypatch.delenv("FAST_VALIDATION", raising=False)
+
+    items_by_collection = defaultdict(dict)
+    item = create_valid_stac_item(item_id="full-item")
+    record = create_sqs_record(item, message_id="full-message")
+
+    with patch("stac_loader.handler.Item", wraps=Item) as mock_item:
+        failure = process_record(record, defaultdict(tuple), items_by_collection)
+
+    assert failure is None
+    mock_item.assert_called_once()
+    assert "full-item" in items_by_collection[item["collection"]]
+
+
+@patch.dict(os.environ, {"BULK_LOAD": "true"})
+def test_handler_bulk_load_items(mock_aws_context, mock_pgstac_dsn, database_url):
+    """Test that bulk mode streams items with COPY instead of the pypgstac loader"""
+    collection_id = TEST_COLLECTION_IDS[0]
+    item_ids = [f"bulk-item-{i}" for i in range(5)]
+    initial_count = count_collection_items(database_url, collection_id)
+
+    event = {
+        "Records": [
+            create_sqs_record(
+                create_valid_stac_item(collection_id=collection_id, item_id=item_id),
+                message_id=f"bulk-message-{i}",
+            )
+            for i, item_id in enumerate(item_ids)
+        ]
+    }
+    with patch("stac_loader.handler.BatchLoader.load_items") as mock_load_items:
+        result = handler(event, mock_aws_context)
+
+    assert result is None
+    mock_load_items.assert_not_called()
+    for item_id in item_ids:
+        assert check_item_exists(database_url, collection_id, item_id)
+    assert count_collection_items(database_url, collection_id) == initial_count + 5
+
+
+@patch.dict(os.environ, {"BULK_LOAD": "true"})
+def test_handler_bulk_load_upserts_existing_item(
+    mock_aws_context, mock_pgstac_dsn, database_url
+):
+    """Test that bulk mode replaces an existing item with the newer version"""
+    collection_id = TEST_COLLECTION_IDS[0]
+    item = create_valid_stac_item(collection_id=collection_id, item_id="bulk-upsert")
+
+    item["properties"]["version"] = "1.0"
+    event = {"Records": [create_sqs_record(item, message_id="bulk-initial")]}
+    assert handler(event, mock_aws_context) is None
+    count = count_collection_items(database_url, collection_id)
+
+    item["properties"]["version"] = "2.0"
+    event = {"Records": [create_sqs_record(item, message_id="bulk-update")]}
+    assert handler(event, mock_aws_context) is None
+
+    db_item = get_item(database_url, collection_id, "bulk-upsert")
+    assert db_item["content"]["properties"]["version"] == "2.0"
+    assert count_collection_items(database_url, collection_id) == count
+
+
+@pytest.mark.parametrize("backend", ["orjson", "json"])
+def test_copy_items_to_db_serializes_like_pypgstac(monkeypatch, backend):
+    """Test that COPY rows are serialized as pypgstac's loader does, NaN as null"""
+    from stac_loader import json_backend
+    from stac_loader.handler import copy_items_to_db
+
+    monkeypatch.setattr(json_backend, "BACKEND", backend)
+    item = create_valid_stac_item(item_id="bulk-nan")
+    item["assets"]["data"] = {
+        "href": "s3://bucket/data.tif",
+        "raster:bands": [{"nodata": float("nan")}],
+    }
+    db = MagicMock()
+    copy = db.connect.return_value.cursor.return_value.__enter__.return_value.copy
+    write_row = copy.return_value.__enter__.return_value.write_row
+
+    assert copy_items_to_db(iter([item]), db) == 1
+
+    (row,) = write_row.call_args.args
+    assert json.loads(row[0]) == json.loads(json.dumps(item).replace("NaN", "null"))
+
+
+@pytest.mark.parametrize("bulk_load", ["true", ""])
+def test_handler_item_with_nan_stored_alike_in_both_modes(
+    monkeypatch, mock_aws_context, mock_pgstac_dsn, database_url, bulk_load
+):
+    """Test that bulk and pypgstac loads store an item with NaN values the same way"""
+    monkeypatch.setenv("BULK_LOAD", bulk_load)
+    collection_id = TEST_COLLECTION_IDS[0]
+    item = create_valid_stac_item(collection_id=collection_id, item_id="nan-item")
+    item["properties"]["nodata"] = float("nan")
+
+    event = {"Records": [create_sqs_record(item, message_id="nan-message")]}
+    assert handler(event, mock_aws_context) is None
+
+    db_item = get_item(database_url, collection_id, "nan-item")
+    assert db_item["content"]["properties"].get("nodata") is None
+
+
+@patch.dict(os.environ, {"BULK_LOAD": "true"})
+def test_handler_bulk_load_error(mock_aws_context, mock_pgstac_dsn):
+    """Test that a failed COPY reports every message of the collection"""
+    items = [create_valid_stac_item(item_id=f"bulk-error-{i}") for i in range(3)]
+    event = {
+        "Records": [
+            create_sqs_record(item, message_id=f"bulk-error-message-{i}")
+            for i, item in enumerate(items)
+        ]
+    }
+
+    with patch(
+        "stac_loader.handler.copy_items_to_db", side_effect=Exception("COPY failed")
+    ):
+        result = handler(event, mock_aws_context)
+
+    assert result == {
+        "batchItemFailures": [
+            {"itemIdentifier": f"bulk-error-message-{i}"} for i in range(3)
+        ]
+    }
+
+
+def create_multi_collection_event(n_collections, items_per_collection=2):
+    """Create an event with items spread over several collections"""
+    return {
+        "Records": [
+            create_sqs_record(
+                create_valid_stac_item(
+                    collection_id=f"parallel-collection-{c}", item_id=f"item-{i}"
+                ),
+                message_id=f"message-{c}-{i}",
+            )
+            for c in range(n_collections)
+            for i in range(items_per_collection)
+        ]
+    }
+
+
+def run_handler_with_fake_loads(event, load_concurrency, load_items, context=None):
+    """Run the handler with per-collection loads replaced by ``load_items``"""
+    with (
+        patch("stac_loader.handler.get_pgstac_dsn", return_value="postgresql://"),
+        patch(
+            "stac_loader.handler.get_pgstac_dbs",
+            side_effect=lambda dsn, count: [MagicMock() for _ in range(count)],
+        ) as mock_get_pgstac_dbs,
+        patch("stac_loader.handler.load_collections_to_db", return_value=[]),
+        patch("stac_loader.handler.load_items_for_collection", side_effect=load_items),
+        patch("stac_loader.handler.LOAD_CONCURRENCY", load_concurrency),
+    ):
+        result = handler(event, context or MagicMock())
+    return result, mock_get_pgstac_dbs
+
+
+def test_handler_parallel_collection_loads_reduce_wall_time():
+    """Test that wall time per collection drops as collections are loaded in parallel"""
+    import threading
+    import time
+
+    lock = threading.Lock()
+    dbs_in_use = set()
+
+    def slow_load(collection_id, items_dict, db):
+        with lock:
+            assert id(db) not in dbs_in_use, "connection shared by two loads"
+            dbs_in_use.add(id(db))
+        time.sleep(0.1)
+        with lock:
+            dbs_in_use.remove(id(db))
+        return []
+
+    seconds_per_collection = {}
+    for n_collections in (1, 4, 8):
+        event = create_multi_collection_event(n_collections)
+        start = time.perf_counter()
+        result, mock_get_pgstac_dbs = run_handler_with_fake_loads(event, 4, slow_load)
+        seconds_per_collection[n_collections] = (
+            time.perf_counter() - start
+        ) / n_collections
+
+        assert result is None
+        mock_get_pgstac_dbs.assert_called_once_with(
+            "postgresql://", min(4, n_collections)
+        )
+
+    assert seconds_per_collection[4] < seconds_per_collection[1] * 0.6
+    assert seconds_per_collection[8] < seconds_per_collection[1] * 0.6
+
+
+def test_handler_parallel_collection_loads_attribute_failures_in_order():
+    """Test that failures are reported per message in collection order"""
+    import time
+
+    def load(collection_id, items_dict, db):
+        index = int(collection_id.rsplit("-", 1)[1])
+        # later collections finish first
+        time.sleep(0.02 * (4 - index))
+        if index == 1:
+            return [{"itemIdentifier": msg_id} for _, msg_id, _ in items_dict.values()]
+        if index == 3:
+            raise RuntimeError("unexpected failure")
+        return []
+
+    result, _ = run_handler_with_fake_loads(create_multi_collection_event(4), 4, load)
+
+    assert result == {
+        "batchItemFailures": [
+            {"itemIdentifier": "message-1-0"},
+            {"itemIdentifier": "message-1-1"},
+            {"itemIdentifier": "message-3-0"},
+            {"itemIdentifier": "message-3-1"},
+        ]
+    }
+
+
+@pytest.mark.parametrize(
+    "properties,partition_trunc,expected",
+    [
+        ({"datetime": "2025-03-15T10:00:00Z"}, None, None),
+        ({"datetime": "2025-03-15T10:00:00Z"}, "year", "2025"),
+        ({"datetime": "2025-03-15T10:00:00Z"}, "month", "202503"),
+        # pypgstac truncates the datetime as written, without converting to UTC
+        ({"datetime": "2025-01-31T22:00:00-05:00"}, "month", "202501"),
+        (
+            {
+                "datetime": "2025-02-15T00:00:00Z",
+                "start_datetime": "2024-12-01T00:00:00Z",
+                "end_datetime": "2025-02-01T00:00:00Z",
+            },
+            "month",
+            "202412",
+        ),
+        (
+            {"datetime": "2025-02-15T00:00:00Z", "start_datetime": "2024-12-01"},
+            "month",
+            "202502",
+        ),
+        (
+            {
+                "datetime": None,
+                "start_datetime": "2024-12-01T00:00:00Z",
+                "end_datetime": "2025-02-01T00:00:00Z",
+            },
+            "month",
+            "202412",
+        ),
+        ({"datetime": None}, "month", None),
+    ],
+)
+def test_get_partition_key(properties, partition_trunc, expected):
+    """Test the partition key derived from an item datetime"""
+    from stac_loader.handler import get_partition_key
+
+    item = create_valid_stac_item()
+    item["properties"] = properties
+
+    assert get_partition_key(item, partition_trunc) == expected
+
+
+def test_load_items_for_collection_loads_each_partition_separately():
+    """Test that items are loaded one partition at a time, in partition order"""
+    from stac_loader.handler import load_items_for_collection
+
+    now = datetime.now(timezone.utc)
+    items_dict = {}
+    for i, month in enumerate(["03", "01", "03", "02"]):
+        item = create_valid_stac_item(item_id=f"partition-item-{i}")
+        item["properties"]["datetime"] = f"2025-{month}-10T00:00:00Z"
+        items_dict[item["id"]] = (item, f"partition-message-{i}", now)
+
+    def load_items(file, insert_mode):
+        if any(item["properties"]["datetime"].startswith("2025-02") for item in file):
+            raise Exception("partition locked")
+
+    with (
+        patch("stac_loader.handler.ensure_collection_exists"),
+        patch(
+            "stac_loader.handler.BatchLoader.collection_json",
+            return_value=({}, 1, "month"),
+        ),
+        patch(
+            "stac_loader.handler.BatchLoader.load_items", side_effect=load_items
+        ) as mock_load_items,
+    ):
+        failures = load_items_for_collection(
+            TEST_COLLECTION_IDS[0], items_dict, MagicMock()
+        )
+
+    loaded_ids = [
+        [item["id"] for item in call.kwargs["file"]]
+        for call in mock_load_items.call_args_list
+    ]
+    assert loaded_ids == [
+        ["partition-item-1"],
+        ["partition-item-3"],
+        ["partition-item-0", "partition-item-2"],
+    ]
+    assert failures == [{"itemIdentifier": "partition-message-3"}]
+
+
+def test_lookup_collections_cache_miss_queries_uncached_ids_once():
+    """Test that uncached collections are looked up with one parameterized query"""
+    from stac_loader.handler import is_known_collection, lookup_collections
+
+    db = MagicMock()
+    db.query.return_value = iter([("known-collection",)])
+
+    lookup_collections(db, ["known-collection", "missing-collection"])
+
+    db.query.assert_called_once_with(
+        "SELECT id FROM collections WHERE id = ANY(%s)",
+        (["known-collection", "missing-collection"],),
+    )
+    assert is_known_collection("known-collection")
+    assert not is_known_collection("missing-collection")
+
+
+def test_lookup_collections_cache_hit_skips_query():
+    """Test that a warm process does not look up cached collections again"""
+    from stac_loader.handler import lookup_collections, remember_collections
+
+    remember_collections(["cached-1", "cached-2"])
+    db = MagicMock()
+    db.query.return_value = iter([])
+
+    lookup_collections(db, ["cached-1", "cached-2"])
+    db.query.assert_not_called()
+
+    lookup_collections(db, ["cached-1", "uncached"])
+    db.query.assert_called_once_with(
+        "SELECT id FROM collections WHERE id = ANY(%s)", (["uncached"],)
+    )
+
+
+def test_collection_cache_entries_expire():
+    """Test that cached collections are looked up again after the TTL"""
+    from stac_loader.handler import is_known_collection, remember_collections
+
+    with patch("stac_loader.handler.COLLECTION_CACHE_TTL_SECONDS", 0):
+        remember_collections(["expiring-collection"])
+
+    assert not is_known_collection("expiring-collection")
+
+
+@patch.dict(os.environ, {"CREATE_COLLECTIONS_IF_MISSING": "true"})
+def test_ensure_collection_exists_cache_hit_and_miss():
+    """Test that only collections missing from the cache are checked and created"""
+    from stac_loader.handler import (
+        ensure_collection_exists,
+        is_known_collection,
+        remember_collections,
+    )
+
+    items = [create_valid_stac_item()]
+    db = MagicMock()
+    loader = MagicMock()
+
+    remember_collections(["cached-collection"])
+    ensure_collection_exists(db, loader, "cached-collection", items)
+    db.query.assert_not_called()
+    loader.load_collections.assert_not_called()
+
+    db.query.return_value = iter([])
+    ensure_collection_exists(db, loader, "new-collection", items)
+    db.query.assert_called_once_with(
+        "SELECT id FROM collections WHERE id = ANY(%s)", (["new-collection"],)
+    )
+    loader.load_collections.assert_called_once()
+    assert is_known_collection("new-collection")
+
+
+@patch.dict(os.environ, {"CREATE_COLLECTIONS_IF_MISSING": "true"})
+def test_handler_warm_collection_cache_skips_lookup(
+    mock_aws_context, mock_pgstac_dsn, database_url
+):
+    """Test that a second batch for the same collection runs no existence query"""
+    collection_id = TEST_COLLECTION_IDS[0]
+    original_query = PgstacDB.query
+    lookups = []
+
+    def tracking_query(self, query, *args, **kwargs):
+        if "FROM collections WHERE id = ANY" in str(query):
+            lookups.append(args)
+        return original_query(self, query, *args, **kwargs)
+
+    def event(item_id):
+        item = create_valid_stac_item(collection_id=collection_id, item_id=item_id)
+        return {"Records": [create_sqs_record(item)]}
+
+    with patch.object(PgstacDB, "query", tracking_query):
+        assert handler(event("cache-item-1"), mock_aws_context) is None
+        assert len(lookups) == 1
+
+        assert handler(event("cache-item-2"), mock_aws_context) is None
+        assert len(lookups) == 1
+
+    assert check_item_exists(database_url, collection_id, "cache-item-1")
+    assert check_item_exists(database_url, collection_id, "cache-item-2")
+
+
+class SimulatedClock:
+    """Stand-in for the handler's time module where time only moves when told to"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    perf_counter = monotonic
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class SimulatedContext:
+    """Lambda context whose remaining time follows a simulated clock"""
+
+    aws_request_id = "simulated-request-id"
+
+    def __init__(self, clock, timeout_seconds):
+        self.clock = clock
+        self.end = clock.now + timeout_seconds
+
+    def get_remaining_time_in_millis(self):
+        return int((self.end - self.clock.now) * 1000)
+
+
+def run_handler_on_simulated_clock(event, timeout_seconds, seconds_per_item):
+    """Run the handler with fake loads that take ``seconds_per_item[collection]``"""
+    clock = SimulatedClock()
+    loaded = []
+
+    def load(collection_id, items_dict, db):
+        clock.advance(seconds_per_item[collection_id] * len(items_dict))
+        loaded.append(collection_id)
+        return []
+
+    with (
+        patch("stac_loader.handler.time", clock),
+        patch("stac_loader.handler.TIME_BUDGET_MARGIN_SECONDS", 10),
+    ):
+        result, _ = run_handler_with_fake_loads(
+            event, 1, load, SimulatedContext(clock, timeout_seconds)
+        )
+
+    return result, loaded
+
+
+def test_handler_stops_starting_loads_when_time_budget_runs_out():
+    """Test that collections that would overrun the deadline are left for a retry"""
+    event = create_multi_collection_event(5)
+    seconds_per_item = {f"parallel-collection-{c}": 1 for c in range(5)}
+
+    # 20s timeout - 10s margin = 10s budget; each collection takes 2s and the
+    # estimate comes from the loads already done in this batch
+    result, loaded = run_handler_on_simulated_clock(event, 20, seconds_per_item)
+
+    assert loaded == [f"parallel-collection-{c}" for c in range(4)]
+    assert result == {
+        "batchItemFailures": [
+            {"itemIdentifier": "message-4-0"},
+            {"itemIdentifier": "message-4-1"},
+        ]
+    }
+
+
+def test_handler_time_budget_uses_per_collection_history():
+    """Test that a collection known to be slow is skipped while fast ones still load"""
+    from stac_loader.handler import record_load_time
+
+    record_load_time("parallel-collection-0", 2, 60)
+    record_load_time("parallel-collection-1", 2, 1)
+    seconds_per_item = {"parallel-collection-0": 30, "parallel-collection-1": 0.5}
+
+    result, loaded = run_handler_on_simulated_clock(
+        create_multi_collection_event(2), 30, seconds_per_item
+    )
+
+    assert loaded == ["parallel-collection-1"]
+    assert result == {
+        "batchItemFailures": [
+            {"itemIdentifier": "message-0-0"},
+            {"itemIdentifier": "message-0-1"},
+        ]
+    }
+
+
+def test_handler_time_budget_ignores_failed_loads():
+    """Test that loads which failed are not used to estimate later loads"""
+    from stac_loader.handler import _load_history, estimate_load_time
+
+    clock = SimulatedClock()
+
+    def load(collection_id, items_dict, db):
+        clock.advance(1 if collection_id == "parallel-collection-0" else 10)
+        if collection_id == "parallel-collection-0":
+            return [{"itemIdentifier": msg_id} for _, msg_id, _ in items_dict.values()]
+        return []
+
+    with (
+        patch("stac_loader.handler.time", clock),
+        patch("stac_loader.handler.TIME_BUDGET_MARGIN_SECONDS", 10),
+    ):
+        run_handler_with_fake_loads(
+            create_multi_collection_event(2), 1, load, SimulatedContext(clock, 300)
+        )
+
+    assert "parallel-collection-0" not in _load_history
+    assert estimate_load_time("parallel-collection-0", 2) == 10
+
+
+def test_load_history_shared_between_threads():
+    """Test that load times can be recorded while other threads estimate"""
+    import sys
+
+    from stac_loader.handler import estimate_load_time, record_load_time
+
+    # switch threads often, so that records land in the middle of estimates
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    for i in range(5000):
+        record_load_time(f"collection-{i}", 1, 1)
+
+    def record(thread):
+        for i in range(5000):
+            record_load_time(f"collection-{thread}-{i}", 1, 1)
+
+    def estimate():
+        for _ in range(50):
+            estimate_load_time("unknown-collection", 1)
+
+    try:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(record, thread) for thread in range(2)]
+            futures += [executor.submit(estimate) for _ in range(2)]
+            for future in futures:
+                future.result()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+
+def test_handler_within_time_budget_loads_everything():
+    """Test that every collection is loaded when the budget allows it"""
+    event = create_multi_collection_event(3)
+    seconds_per_item = {f"parallel-collection-{c}": 1 for c in range(3)}
+
+    result, loaded = run_handler_on_simulated_clock(event, 300, seconds_per_item)
+
+    assert result is None
+    assert loaded == [f"parallel-collection-{c}" for c in range(3)]
@@ -5,6 +5,7 @@ import {
   aws_lambda as lambda,
   aws_lambda_event_sources as lambdaEventSources,
   aws_logs as logs,
+  aws_s3 as s3,
   aws_sns as sns,
   aws_sns_subscriptions as snsSubscriptions,
   aws_sqs as sqs,
@@ -31,6 +32,21 @@ import { CustomLambdaFunctionProps } from "../utils";
  *   batchSize: 10
  * });
  */
+/**
+ * A stactools package and the CLI group it registers.
+ */
+export interface StactoolsPackage {
+  /**
+   * Package requirement, e.g. `stactools-glad-glclu2020==0.1.0`.
+   */
+  readonly packageName: string;
+
+  /**
+   * Name of the package's CLI group, e.g. `gladglclu2020`.
+   */
+  readonly groupName: string;
+}
+
 export interface StactoolsItemGeneratorProps {
   /**
    * The lambda runtime to use for the item generation function.
@@ -57,7 +73,7 @@ export interface StactoolsItemGeneratorProps {
    * The timeout for the item generation lambda in seconds.
    *
    * This should accommodate the time needed to:
-   * - Install stactools packages using uvx
+   * - Install stactools packages with uv (once per package and container)
    * - Download and process source data
    * - Generate STAC metadata
    * - Publish results to SNS
@@ -106,7 +122,17 @@ export interface StactoolsItemGeneratorProps {
    *
    * These will be merged with default environment variables including
    * ITEM_LOAD_TOPIC_ARN and LOG_LEVEL. Use this for custom configuration
-   * or to pass credentials for external data sources.
+   * or to pass credentials for external data sources. Set `JSON_BACKEND` to
+   * `json` to decode messages with the standard library instead of orjson.
+   * `STACTOOLS_ENV_DIR` sets where the per-package stactools environments are
+   * cached (default `/tmp/stactools-envs`). Items are created by a persistent
+   * stactools worker process per package and group; set `STACTOOLS_WORKER` to
+   * `false` to start a new stactools process for every item instead.
+   * `ITEM_CONCURRENCY` sets how many records of a batch are processed at the
+   * same time; by default it is two per vCPU of the configured `memorySize`,
+   * with at least 256 MB per record. `MANIFEST_TIMEOUT_SECONDS` (default 30)
+   * bounds each connect and read of a batch request's manifest, which fails
+   * that request when its host stalls.
    */
   readonly environment?: { [key: string]: string };
 
@@ -119,6 +145,53 @@ export interface StactoolsItemGeneratorProps {
    */
   readonly itemLoadTopicArn: string;
 
+  /**
+   * Bucket for generated items that are too large to publish to SNS (256 KiB).
+   *
+   * Such items are written to this bucket under `ITEM_OFFLOAD_PREFIX`
+   * (default `offloaded-items/`) and an S3 event notification pointing at the
+   * object is published to the item load topic instead, which the StacLoader
+   * fetches and loads like any other S3 event. The StacLoader function needs
+   * read access to the bucket. Do not also configure event notifications for
+   * this prefix to the item load topic, or the items will be loaded twice.
+   *
+   * @default - oversized items are reported as failures
+   */
+  readonly itemOffloadBucket?: s3.IBucket;
+
+  /**
+   * Bucket for the cache of generated items.
+   *
+   * Items are stored under the `item-cache/` prefix, keyed by a hash of the
+   * package, group, create-item arguments and options, the installed versions
+   * of stactools and the package, and the ETag or Last-Modified of their
+   * http(s) and s3 sources. A replayed request
+   * publishes the cached item without running stactools. Add a lifecycle rule
+   * to expire the prefix, since the cache does not evict from S3. To cache in
+   * the function's ephemeral storage instead, set `ITEM_CACHE_URL` to a local
+   * directory with `environment`; it is kept under `ITEM_CACHE_MAX_BYTES`
+   * (default 512 MiB) by evicting the least recently used items.
+   *
+   * @default - items are not cached
+   */
+  readonly itemCacheBucket?: s3.IBucket;
+
+  /**
+   * Stactools packages to pre-warm.
+   *
+   * Their environments are built into the container image, and a stactools
+   * worker that has imported each of them is started in the Lambda init phase,
+   * so the first records for these packages do not pay for installing and
+   * importing them. Pin package versions so that image builds are repeatable.
+   * Invoke the function directly with `{"action": "readiness"}` to get the
+   * readiness of each package in a container. A package whose environment is
+   * missing from the image is not built during init, which is limited to 10
+   * seconds, but on its first request.
+   *
+   * @default - packages are installed and imported on their first request
+   */
+  readonly prewarmPackages?: StactoolsPackage[];
+
   /**
    * Can be used to override the default lambda function properties.
    *
@@ -148,8 +221,10 @@ export interface StactoolsItemGeneratorProps {
  * 1. External systems publish ItemRequest messages to the SNS topic with metadata about assets
  * 2. The SQS queue buffers these messages and triggers the Lambda function
  * 3. The Lambda function:
- *    - Uses `uvx` to install the required stactools package
- *    - Executes the `create-item` CLI command with provided arguments
+ *    - Installs the required stactools package into an environment with uv, once
+ *      per package version and container, and reuses it for later items
+ *    - Runs the `create-item` CLI command with provided arguments in a stactools
+ *      worker process that is kept alive across records and invocations
  *    - Publishes generated STAC items to the ItemLoad topic
  * 4. Failed processing attempts are sent to the dead letter queue
  *
@@ -211,9 +286,30 @@ export interface StactoolsItemGeneratorProps {
  * }'
  * ```
  *
+ * ## Batch Requests
+ *
+ * A BatchItemRequest creates many items with one warm stactools process. Give
+ * either `create_item_args_list`, one list of create-item arguments per item,
+ * or `manifest_url`, an `s3://` or `https://` text file with one item per line
+ * and its arguments separated by whitespace:
+ *
+ * ```json
+ * {
+ *   "package_name": "stactools-glad-glclu2020",
+ *   "group_name": "gladglclu2020",
+ *   "manifest_url": "s3://my-bucket/glclu2020/2000.txt",
+ *   "collection_id": "glad-glclu2020"
+ * }
+ * ```
+ *
+ * Items are published as they are created. An input that fails is logged
+ * with its position and arguments and does not fail the rest of the request.
+ * Grant the function read access to manifests on S3, and size
+ * `lambdaTimeoutSeconds` for the whole batch.
+ *
  * ## Batch Processing Example
  *
- * For processing many assets, you can loop through URLs:
+ * For processing many assets, you can also loop through URLs:
  *
  * ```bash
  * while IFS= read -r url; do
@@ -275,7 +371,7 @@ export class StactoolsItemGenerator extends Construct {
    * The containerized Lambda function that generates STAC items.
    *
    * This Docker-based function dynamically installs stactools packages
-   * using uvx, processes source data, and publishes generated STAC items
+   * with uv, processes source data, and publishes generated STAC items
    * to the configured ItemLoad SNS topic.
    */
   public readonly lambdaFunction: lambda.DockerImageFunction;
@@ -289,6 +385,12 @@ export class StactoolsItemGenerator extends Construct {
 
     const timeoutSeconds = props.lambdaTimeoutSeconds ?? 120;
     const lambdaRuntime = props.lambdaRuntime ?? lambda.Runtime.PYTHON_3_12;
+    const prewarm = JSON.stringify(
+      (props.prewarmPackages ?? []).map((p) => ({
+        package_name: p.packageName,
+        group_name: p.groupName,
+      }))
+    );
 
     // Create dead letter queue
     this.deadLetterQueue = new sqs.Queue(this, "DeadLetterQueue", {
@@ -322,6 +424,7 @@ export class StactoolsItemGenerator extends Construct {
         platform: Platform.LINUX_AMD64,
         buildArgs: {
           PYTHON_VERSION: lambdaRuntime.toString().replace("python", ""),
+          STACTOOLS_PREWARM: prewarm,
         },
       }),
       memorySize: props.memorySize ?? 1024,
@@ -332,6 +435,17 @@ export class StactoolsItemGenerator extends Construct {
       environment: {
         ITEM_LOAD_TOPIC_ARN: props.itemLoadTopicArn,
         LOG_LEVEL: "INFO",
+        ...(props.prewarmPackages?.length
+          ? { STACTOOLS_PREWARM: prewarm }
+          : {}),
+        ...(props.itemOffloadBucket
+          ? { ITEM_OFFLOAD_BUCKET: props.itemOffloadBucket.bucketName }
+          : {}),
+        ...(props.itemCacheBucket
+          ? {
+              ITEM_CACHE_URL: `s3://${props.itemCacheBucket.bucketName}/item-cache/`,
+            }
+          : {}),
         ...props.environment,
       },
       // overwrites defaults with user-provided configurable properties
@@ -347,6 +461,9 @@ export class StactoolsItemGenerator extends Construct {
       })
     );
 
+    props.itemOffloadBucket?.grantPut(this.lambdaFunction);
+    props.itemCacheBucket?.grantReadWrite(this.lambdaFunction, "item-cache/*");
+
     // Grant permissions to publish to the item load topic
     // Note: This will be granted externally since we only have the ARN
     // The consuming construct should handle this permission
@@ -0,0 +1,82 @@
+"""Benchmark processing an SQS batch with different ITEM_CONCURRENCY values.
+
+Runs the handler on a batch of requests for the fake stactools package in
+``stactools-fake/``, whose create-item sleeps for ``--delay`` seconds to stand
+in for remote reads, and reports the batch time for each concurrency. Publishing
+is replaced by a no-op so only item generation is measured. The environment and
+the workers are started before timing.
+
+Requires uv on the PATH and access to PyPI for stactools::
+
+    uv run python lib/stactools-item-generator/runtime/benchmarks/bench_concurrency.py
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from stactools_item_generator import environment, handler
+
+FAKE_PACKAGE = f"stactools-fake @ {(Path(__file__).parent / 'stactools-fake').as_uri()}"
+
+
+def make_event(records: int, delay: float) -> dict:
+    return {
+        "Records": [
+            {
+                "messageId": f"message-{i}",
+                "body": json.dumps(
+                    {
+                        "Message": json.dumps(
+                            {
+                                "package_name": FAKE_PACKAGE,
+                                "group_name": "fake",
+                                "create_item_args": [f"s3://bench-bucket/item-{i}.tif"],
+                                "create_item_options": {"delay": str(delay)},
+                            }
+                        )
+                    }
+                ),
+            }
+            for i in range(records)
+        ]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--records", type=int, default=10)
+    parser.add_argument("--delay", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    event = make_event(args.records, args.delay)
+
+    with tempfile.TemporaryDirectory() as env_dir:
+        environment.STACTOOLS_ENV_DIR = Path(env_dir)
+        environment.get_environment(FAKE_PACKAGE)
+
+        with mock.patch.object(handler, "publish_items", return_value=[]):
+            # start a worker for every record that can run at once
+            handler.ITEM_CONCURRENCY = max(args.concurrency)
+            handler.handler(make_event(max(args.concurrency), 0), None)
+
+            for concurrency in args.concurrency:
+                handler.ITEM_CONCURRENCY = concurrency
+                start = time.perf_counter()
+                result = handler.handler(event, None)
+                elapsed = time.perf_counter() - start
+                assert result is None, result
+                print(
+                    f"concurrency {concurrency:2d}: {elapsed:6.2f} s for "
+                    f"{args.records} records"
+                )
+
+
+if __name__ == "__main__":
+    main()
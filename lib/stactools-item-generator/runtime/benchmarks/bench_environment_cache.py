@@ -0,0 +1,84 @@
+"""Benchmark uvx per item against cached stactools environments.
+
+Generates items with the fake stactools package in ``stactools-fake/`` three
+ways and reports the seconds per item:
+
+* ``uvx``: the previous behaviour, ``uvx --with ... --from stactools stac`` per item
+* ``cold``: the first item in a fresh container, including the environment build
+* ``warm``: later items, reusing the cached environment
+
+Requires uv on the PATH and access to PyPI for stactools::
+
+    uv run python lib/stactools-item-generator/runtime/benchmarks/bench_environment_cache.py
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from stactools_item_generator import environment
+from stactools_item_generator.item import ItemRequest, create_stac_item
+
+FAKE_PACKAGE = f"stactools-fake @ {(Path(__file__).parent / 'stactools-fake').as_uri()}"
+
+
+def create_item_with_uvx(request: ItemRequest) -> None:
+    with tempfile.NamedTemporaryFile(suffix=".json") as output:
+        subprocess.run(
+            [
+                "uvx",
+                "--python",
+                sys.executable,
+                "--with",
+                f"requests,numpy<2.3.0,{request.package_name}",
+                "--from",
+                "stactools",
+                "stac",
+                request.group_name,
+                "create-item",
+                *request.create_item_args,
+                output.name,
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--items", type=int, default=5)
+    args = parser.parse_args()
+
+    requests = [
+        ItemRequest(
+            package_name=FAKE_PACKAGE,
+            group_name="fake",
+            create_item_args=[f"s3://bench-bucket/item-{i}.tif"],
+        )
+        for i in range(args.items)
+    ]
+
+    start = time.perf_counter()
+    for request in requests:
+        create_item_with_uvx(request)
+    print(f"uvx : {(time.perf_counter() - start) / len(requests):6.2f} s/item")
+
+    with tempfile.TemporaryDirectory() as env_dir:
+        environment.STACTOOLS_ENV_DIR = Path(env_dir)
+
+        start = time.perf_counter()
+        create_stac_item(requests[0])
+        print(f"cold: {time.perf_counter() - start:6.2f} s/item")
+
+        start = time.perf_counter()
+        for request in requests[1:]:
+            create_stac_item(request)
+        print(f"warm: {(time.perf_counter() - start) / (len(requests) - 1):6.2f} s/item")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark the cold start of the item generator with and without pre-warming.
+
+Each scenario starts a fresh interpreter, like a new Lambda container, and
+reports the time to import the handler (the init phase) and to create the first
+item with the fake stactools package in ``stactools-fake/``:
+
+* ``lazy``: nothing prepared, the first item builds the environment and starts
+  a worker
+* ``prebuilt``: the environment was built into STACTOOLS_PREBUILT_ENV_DIR, as
+  ``prewarm --build`` does in the image
+* ``prewarmed``: prebuilt, and STACTOOLS_PREWARM starts the worker during init
+
+Requires uv on the PATH and access to PyPI for stactools::
+
+    uv run python lib/stactools-item-generator/runtime/benchmarks/bench_prewarm.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+FAKE_PACKAGE = f"stactools-fake @ {(Path(__file__).parent / 'stactools-fake').as_uri()}"
+PREWARM = json.dumps([{"package_name": FAKE_PACKAGE, "group_name": "fake"}])
+
+COLD_START = f"""
+import json, time
+start = time.perf_counter()
+from stactools_item_generator import handler
+from stactools_item_generator.item import ItemRequest, create_stac_item
+init = time.perf_counter() - start
+start = time.perf_counter()
+create_stac_item(ItemRequest(
+    package_name={FAKE_PACKAGE!r},
+    group_name="fake",
+    create_item_args=["s3://bench-bucket/item.tif"],
+))
+print(json.dumps({{"init": init, "first_item": time.perf_counter() - start}}))
+"""
+
+
+def cold_start(env: dict) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", COLD_START],
+        env={**os.environ, "LOG_LEVEL": "WARNING", **env},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        prebuilt_dir = Path(tmp) / "prebuilt"
+        subprocess.run(
+            [sys.executable, "-m", "stactools_item_generator.prewarm", "--build"],
+            env={
+                **os.environ,
+                "STACTOOLS_PREWARM": PREWARM,
+                "STACTOOLS_PREBUILT_ENV_DIR": str(prebuilt_dir),
+            },
+            check=True,
+            capture_output=True,
+        )
+
+        scenarios = {
+            "lazy": {"STACTOOLS_PREBUILT_ENV_DIR": str(Path(tmp) / "empty")},
+            "prebuilt": {"STACTOOLS_PREBUILT_ENV_DIR": str(prebuilt_dir)},
+            "prewarmed": {
+                "STACTOOLS_PREBUILT_ENV_DIR": str(prebuilt_dir),
+                "STACTOOLS_PREWARM": PREWARM,
+            },
+        }
+        for name, env in scenarios.items():
+            # a new container starts with an empty /tmp
+            env["STACTOOLS_ENV_DIR"] = tempfile.mkdtemp(dir=tmp)
+            timings = cold_start(env)
+            print(
+                f"{name:9s}: init {timings['init']:6.2f} s, "
+                f"first item {timings['first_item']:6.2f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark a new stactools process per item against a persistent worker.
+
+Generates items with the fake stactools package in ``stactools-fake/`` from the
+same cached environment two ways and reports the seconds per item:
+
+* ``process``: ``python -m stactools.cli ... create-item`` per item
+* ``worker``: create-item requests sent to one long-lived worker process
+
+The environment is built once before timing. Requires uv on the PATH and access
+to PyPI for stactools::
+
+    uv run python lib/stactools-item-generator/runtime/benchmarks/bench_worker.py
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from stactools_item_generator import environment
+from stactools_item_generator.item import ItemRequest, run_create_item_command
+from stactools_item_generator.worker import StactoolsWorker
+
+FAKE_PACKAGE = f"stactools-fake @ {(Path(__file__).parent / 'stactools-fake').as_uri()}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--items", type=int, default=20)
+    args = parser.parse_args()
+
+    requests = [
+        ItemRequest(
+            package_name=FAKE_PACKAGE,
+            group_name="fake",
+            create_item_args=[f"s3://bench-bucket/item-{i}.tif"],
+        )
+        for i in range(args.items)
+    ]
+
+    with tempfile.TemporaryDirectory() as env_dir:
+        environment.STACTOOLS_ENV_DIR = Path(env_dir)
+        environment.get_environment(FAKE_PACKAGE)
+
+        start = time.perf_counter()
+        for request in requests:
+            run_create_item_command(request)
+        print(f"process: {(time.perf_counter() - start) / len(requests):6.3f} s/item")
+
+        worker = StactoolsWorker(FAKE_PACKAGE, "fake")
+        try:
+            start = time.perf_counter()
+            for request in requests:
+                worker.create_item(request.create_item_args, request.create_item_options)
+            print(
+                f"worker : {(time.perf_counter() - start) / len(requests):6.3f} s/item "
+                "(including worker startup)"
+            )
+        finally:
+            worker.stop()
+
+
+if __name__ == "__main__":
+    main()
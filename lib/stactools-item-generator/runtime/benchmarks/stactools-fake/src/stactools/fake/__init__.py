@@ -0,0 +1,46 @@
+"""Fake stactools package for the item generator benchmarks.
+
+``stac fake create-item SOURCE DESTINATION`` writes a small item for SOURCE
+after sleeping for ``--delay`` seconds, standing in for the remote reads a real
+package does.
+"""
+
+import time
+
+import click
+import pystac
+from stactools.cli.registry import Registry
+
+
+def create_fake_command(cli: click.Group) -> click.Command:
+    @cli.group("fake", short_help="Commands for the fake benchmark package")
+    def fake() -> None:
+        pass
+
+    @fake.command("create-item", short_help="Create a fake STAC item")
+    @click.argument("source")
+    @click.argument("destination")
+    @click.option("--delay", default="0", help="Seconds to sleep before writing")
+    def create_item_command(source: str, destination: str, delay: str) -> None:
+        time.sleep(float(delay))
+        item_id = source.rsplit("/", 1)[-1].split(".")[0]
+        item = {
+            "type": "Feature",
+            "stac_version": "1.1.0",
+            "id": item_id,
+            "properties": {"datetime": "2025-01-01T00:00:00Z"},
+            "geometry": {"type": "Point", "coordinates": [0, 0]},
+            "bbox": [0, 0, 0, 0],
+            "links": [],
+            "assets": {"data": {"href": source, "roles": ["data"]}},
+            "stac_extensions": [],
+        }
+        pystac.Item.from_dict(item).save_object(
+            include_self_link=False, dest_href=destination
+        )
+
+    return fake
+
+
+def register_plugin(registry: Registry) -> None:
+    registry.register_subcommand(create_fake_command)
@@ -0,0 +1,160 @@
+"""Cached Python environments for stactools packages.
+
+The first time a stactools package is requested in a container, a virtual
+environment with stactools and the package is built with uv under
+STACTOOLS_ENV_DIR. Later items and warm invocations reuse it instead of having
+uvx resolve and materialize an environment for every item. Environments are
+keyed by package name and requested version; an unpinned package is resolved
+once per container. Environments built into the image under
+STACTOOLS_PREBUILT_ENV_DIR (see prewarm.py) are used as they are.
+"""
+
+import importlib.metadata
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger()
+
+STACTOOLS_ENV_DIR = Path(os.environ.get("STACTOOLS_ENV_DIR", "/tmp/stactools-envs"))
+STACTOOLS_PREBUILT_ENV_DIR = Path(
+    os.environ.get("STACTOOLS_PREBUILT_ENV_DIR", "/opt/stactools-envs")
+)
+BASE_REQUIREMENTS = ["stactools", "requests", "numpy<2.3.0"]
+READY_MARKER = ".ready"
+
+_environments: Dict[str, Path] = {}
+_installed_versions: Dict[Path, Dict[str, str]] = {}
+_build_locks: Dict[str, threading.Lock] = {}
+_build_locks_lock = threading.Lock()
+
+
+def environment_key(package_name: str) -> str:
+    """Return the cache key of a package requirement: its name and pinned version."""
+    name, _, version = package_name.partition("==")
+    key = f"{name.strip()}-{version.strip() or 'latest'}"
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", key)
+
+
+def distribution_name(requirement: str) -> str:
+    """Return the normalized distribution name of a requirement like name[extra]==1.0."""
+    match = re.match(r"\s*([A-Za-z0-9][A-Za-z0-9._-]*)", requirement)
+    name = match.group(1) if match else requirement
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def environment_python(environment: Path) -> Path:
+    """Return the interpreter of an environment."""
+    return environment / "bin" / "python"
+
+
+def build_environment(package_name: str, environment: Path) -> None:
+    """Build an environment with stactools and a stactools package installed.
+
+    The environment is built next to its final location and only moved there
+    once it is complete, so a failed or interrupted build is never reused.
+    """
+    start = time.perf_counter()
+    staging = environment.with_name(
+        f"{environment.name}.building-{os.getpid()}-{threading.get_ident()}"
+    )
+    shutil.rmtree(staging, ignore_errors=True)
+
+    try:
+        subprocess.run(
+            ["uv", "venv", "--quiet", "--python", sys.executable, str(staging)],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        subprocess.run(
+            [
+                "uv",
+                "pip",
+                "install",
+                "--quiet",
+                "--python",
+                str(environment_python(staging)),
+                *BASE_REQUIREMENTS,
+                package_name,
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        (staging / READY_MARKER).touch()
+        shutil.rmtree(environment, ignore_errors=True)
+        staging.rename(environment)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    logger.info(
+        f"Built stactools environment for {package_name} in "
+        f"{time.perf_counter() - start:.2f}s: {environment}"
+    )
+
+
+def prebuilt_environment(package_name: str) -> Optional[Path]:
+    """Return the environment of a stactools package built into the image, if any."""
+    prebuilt = STACTOOLS_PREBUILT_ENV_DIR / environment_key(package_name)
+    if (prebuilt / READY_MARKER).exists():
+        return prebuilt
+    return None
+
+
+def get_environment(package_name: str) -> Path:
+    """Return the environment for a stactools package, building it if needed."""
+    key = environment_key(package_name)
+    if key in _environments:
+        return _environments[key]
+
+    with _build_locks_lock:
+        build_lock = _build_locks.setdefault(key, threading.Lock())
+
+    with build_lock:
+        if key not in _environments:
+            environment = STACTOOLS_ENV_DIR / key
+            prebuilt = prebuilt_environment(package_name)
+            if prebuilt is not None:
+                logger.info(f"Using prebuilt stactools environment {prebuilt}")
+                environment = prebuilt
+            elif (environment / READY_MARKER).exists():
+                logger.info(f"Reusing stactools environment {environment}")
+            else:
+                environment.parent.mkdir(parents=True, exist_ok=True)
+                build_environment(package_name, environment)
+            _environments[key] = environment
+
+    return _environments[key]
+
+
+def installed_versions(environment: Path) -> Dict[str, str]:
+    """Return the versions of the distributions installed in an environment.
+
+    Read from the package metadata of its site-packages, without starting its
+    interpreter, once per environment and process.
+    """
+    if environment not in _installed_versions:
+        paths = [str(path) for path in environment.glob("lib/python*/site-packages")]
+        _installed_versions[environment] = {
+            distribution_name(dist.metadata["Name"]): dist.version
+            for dist in importlib.metadata.distributions(path=paths)
+        }
+    return _installed_versions[environment]
+
+
+def package_versions(package_name: str) -> Dict[str, str]:
+    """Return the installed versions of stactools and a package in its environment."""
+    versions = installed_versions(get_environment(package_name))
+    return {
+        name: versions.get(name, "")
+        for name in ("stactools", distribution_name(package_name))
+    }
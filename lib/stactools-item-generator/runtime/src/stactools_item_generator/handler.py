@@ -1,11 +1,23 @@
 """AWS Lambda handler for STAC Item Generation."""
 
-import json
 import logging
 import os
 import subprocess
 import traceback
-from typing import TYPE_CHECKING, Annotated, Any, Dict, List, Optional, TypedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing
+from typing import (
+    TYPE_CHECKING,
+    Annotated,
+    Any,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypedDict,
+    Union,
+)
 
 import boto3
 from pydantic import ValidationError
@@ -15,7 +27,14 @@ if TYPE_CHECKING:
 else:
     Context = Annotated[object, "Context object"]
 
-from stactools_item_generator.item import ItemRequest, create_stac_item
+from stactools_item_generator import json_backend
+from stactools_item_generator.item import (
+    BatchItemRequest,
+    ItemRequest,
+    create_stac_item,
+    create_stac_items,
+)
+from stactools_item_generator.prewarm import PackageReadiness, prewarm_all, readiness
 
 logger = logging.getLogger()
 if logger.hasHandlers():
@@ -31,6 +50,34 @@ formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(messag
 log_handler.setFormatter(formatter)
 logger.addHandler(log_handler)
 
+# SNS limits for a single message and for all messages of a PublishBatch call
+SNS_MAX_PAYLOAD_BYTES = 262144
+SNS_MAX_BATCH_SIZE = 10
+
+ITEM_OFFLOAD_PREFIX = os.environ.get("ITEM_OFFLOAD_PREFIX", "offloaded-items/")
+
+# Lambda allocates CPU in proportion to memory, one vCPU per 1769 MB. Item
+# generation mostly waits on stactools processes reading remote data, so two
+# records are processed per vCPU, as long as each gets WORKER_MEMORY_MB.
+LAMBDA_MB_PER_VCPU = 1769
+WORKER_MEMORY_MB = 256
+
+
+def default_item_concurrency() -> int:
+    memory_mb = int(os.environ.get("AWS_LAMBDA_FUNCTION_MEMORY_SIZE", "1024"))
+    vcpus = max(1, -(-memory_mb // LAMBDA_MB_PER_VCPU))
+    return max(1, min(2 * vcpus, memory_mb // WORKER_MEMORY_MB))
+
+
+ITEM_CONCURRENCY = max(
+    1, int(os.environ.get("ITEM_CONCURRENCY") or default_item_concurrency())
+)
+
+
+# runs in the Lambda init phase, before the first invocation; environments
+# missing from the image are built on first use rather than within its 10 s
+prewarm_all(prebuilt_only=True)
+
 
 def get_topic_arn() -> str:
     item_load_topic_arn = os.environ.get("ITEM_LOAD_TOPIC_ARN")
@@ -41,10 +88,80 @@ def get_topic_arn() -> str:
     return item_load_topic_arn
 
 
-def process_record(record: Dict[str, Any], sns_client) -> None:
+class GeneratedItem(TypedDict):
+    message_id: str
+    item_id: str
+    collection_id: Optional[str]
+    item_json: str
+
+
+def log_subprocess_error(prefix: str, e: subprocess.CalledProcessError) -> None:
+    logger.error(f"{prefix} Subprocess command failed:")
+    logger.error(f"{prefix} Command: {' '.join(e.cmd)}")
+    logger.error(f"{prefix} Return code: {e.returncode}")
+    logger.error(f"{prefix} Stdout: {e.stdout}")
+    logger.error(f"{prefix} Stderr: {e.stderr}")
+
+
+def process_batch_request(
+    message_id: str, batch_request: BatchItemRequest, sns_client
+) -> None:
+    """
+    Creates the items of a BatchItemRequest and publishes them while the rest
+    are still being created, SNS_MAX_BATCH_SIZE at a time.
+    An input that fails is logged on its own and does not fail the request;
+    raises an exception if any created item could not be published.
+    """
+    pending: List[GeneratedItem] = []
+    created = 0
+    failed_inputs = 0
+    failed_publishes = 0
+
+    # closed explicitly, so that the worker goes back to the pool even if
+    # publishing fails part way through
+    with closing(create_stac_items(batch_request)) as results:
+        for index, (create_item_args, result) in enumerate(results):
+            prefix = f"[{message_id}] [input {index}]"
+            if isinstance(result, Exception):
+                failed_inputs += 1
+                logger.error(f"{prefix} Failed to create item from {create_item_args}")
+                if isinstance(result, subprocess.CalledProcessError):
+                    log_subprocess_error(prefix, result)
+                else:
+                    logger.error(f"{prefix} {type(result).__name__}: {result}")
+                continue
+
+            created += 1
+            pending.append(
+                {
+                    "message_id": message_id,
+                    "item_id": result.id,
+                    "collection_id": result.collection,
+                    "item_json": result.model_dump_json(),
+                }
+            )
+            if len(pending) == SNS_MAX_BATCH_SIZE:
+                failed_publishes += len(publish_items(sns_client, pending))
+                pending = []
+
+    if pending:
+        failed_publishes += len(publish_items(sns_client, pending))
+
+    logger.info(
+        f"[{message_id}] Batch request created {created} item(s), "
+        f"{failed_inputs} input(s) failed."
+    )
+    if failed_publishes:
+        raise RuntimeError(f"{failed_publishes} item(s) could not be published")
+
+
+def process_record(record: Dict[str, Any], sns_client=None) -> Optional[GeneratedItem]:
     """
     Processes a single SQS record (within a batch).
-    Extracts the request, calls create_stac_item, and publishes the result.
+    Extracts the request and calls create_stac_item; the result is returned so
+    that it can be published together with the rest of the batch.
+    A BatchItemRequest is published by process_batch_request as its items are
+    created instead, and None is returned.
     Raises exceptions on failure.
     """
     message_id = record.get("messageId", "UNKNOWN_ID")
@@ -53,40 +170,46 @@ def process_record(record: Dict[str, Any], sns_client) -> None:
     try:
         sqs_body_str = record["body"]
         logger.debug(f"[{message_id}] SQS message body: {sqs_body_str}")
-        sns_notification = json.loads(sqs_body_str)
+        sns_notification = json_backend.loads(sqs_body_str)
 
         message_str = sns_notification["Message"]
         logger.debug(f"[{message_id}] SNS Message content: {message_str}")
 
-        message_data = json.loads(message_str)
+        message_data = json_backend.loads(message_str)
+        if BatchItemRequest.is_batch(message_data):
+            batch_request = BatchItemRequest(**message_data)
+            logger.info(
+                f"[{message_id}] Parsed BatchItemRequest for package: "
+                f"{batch_request.package_name}"
+            )
+            process_batch_request(message_id, batch_request, sns_client)
+            return None
+
         item_request = ItemRequest(**message_data)
         logger.info(
             f"[{message_id}] Parsed ItemRequest for package: {item_request.package_name}"
         )
-        logger.debug(f"[{message_id}] Full ItemRequest: {item_request.model_dump_json()}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"[{message_id}] Full ItemRequest: {item_request.model_dump_json()}"
+            )
 
         stac_item = create_stac_item(item_request)
         logger.info(f"[{message_id}] Successfully created STAC item: {stac_item.id}")
-        logger.debug(
-            f"[{message_id}] Generated STAC Item JSON (sample): "
-            f"{ {k: v for k, v in stac_item.model_dump().items() if k in ['id', 'collection', 'properties']} }"
-        )
-
-        stac_item_json = stac_item.model_dump_json()
-
-        item_load_topic_arn = get_topic_arn()
-        logger.info(
-            f"[{message_id}] Publishing STAC item {stac_item.id} to {item_load_topic_arn}"
-        )
-        response = sns_client.publish(
-            TopicArn=item_load_topic_arn,
-            Message=stac_item_json,
-        )
-        logger.info(
-            f"[{message_id}] SNS publish response MessageId: {response.get('MessageId')}"
-        )
-
-    except json.JSONDecodeError as e:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"[{message_id}] Generated STAC Item JSON (sample): "
+                f"{ {k: v for k, v in stac_item.model_dump().items() if k in ['id', 'collection', 'properties']} }"
+            )
+
+        return {
+            "message_id": message_id,
+            "item_id": stac_item.id,
+            "collection_id": stac_item.collection,
+            "item_json": stac_item.model_dump_json(),
+        }
+
+    except json_backend.JSONDecodeError as e:
         logger.error(f"[{message_id}] Failed to decode JSON: {e}")
         logger.error(f"[{message_id}] Problematic data (SQS Body): {record.get('body')}")
         raise
@@ -101,11 +224,7 @@ def process_record(record: Dict[str, Any], sns_client) -> None:
     except (
         subprocess.CalledProcessError
     ) as e:  # <--- Catching the imported exception type
-        logger.error(f"[{message_id}] Subprocess command failed:")
-        logger.error(f"[{message_id}] Command: {' '.join(e.cmd)}")
-        logger.error(f"[{message_id}] Return code: {e.returncode}")
-        logger.error(f"[{message_id}] Stdout: {e.stdout}")
-        logger.error(f"[{message_id}] Stderr: {e.stderr}")
+        log_subprocess_error(f"[{message_id}]", e)
         raise
     except Exception as e:
         logger.error(
@@ -123,15 +242,154 @@ class PartialBatchFailureResponse(TypedDict):
     batchItemFailures: List[BatchItemFailure]
 
 
+def offload_item_to_s3(s3_client, bucket: str, item: GeneratedItem) -> str:
+    """
+    Writes an item that is too large for SNS to S3 and returns the message to
+    publish instead: an S3 event notification pointing at the object, which the
+    stac-loader fetches and loads like any other S3 event.
+    """
+    key = (
+        f"{ITEM_OFFLOAD_PREFIX}{item['collection_id'] or 'no-collection'}/"
+        f"{item['item_id']}.json"
+    )
+    s3_client.put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=item["item_json"].encode("utf-8"),
+        ContentType="application/json",
+    )
+    logger.info(
+        f"[{item['message_id']}] STAC item {item['item_id']} is too large for SNS, "
+        f"offloaded to s3://{bucket}/{key}"
+    )
+
+    return json_backend.dumps(
+        {
+            "Records": [
+                {
+                    "eventSource": "aws:s3",
+                    "eventName": "ObjectCreated:Put",
+                    "s3": {"bucket": {"name": bucket}, "object": {"key": key}},
+                }
+            ]
+        }
+    )
+
+
+def publish_batch(
+    sns_client, topic_arn: str, batch: List[Tuple[GeneratedItem, str]]
+) -> List[str]:
+    """
+    Publishes up to SNS_MAX_BATCH_SIZE messages with one PublishBatch call.
+    Returns the message ids of the items that could not be published.
+    """
+    for item, _ in batch:
+        logger.info(
+            f"[{item['message_id']}] Publishing STAC item {item['item_id']} to {topic_arn}"
+        )
+
+    try:
+        response = sns_client.publish_batch(
+            TopicArn=topic_arn,
+            PublishBatchRequestEntries=[
+                {"Id": str(i), "Message": message} for i, (_, message) in enumerate(batch)
+            ],
+        )
+    except Exception as e:
+        logger.error(f"Failed to publish batch of {len(batch)} item(s) to SNS: {e}")
+        return [item["message_id"] for item, _ in batch]
+
+    for entry in response.get("Successful", []):
+        message_id = batch[int(entry["Id"])][0]["message_id"]
+        logger.info(
+            f"[{message_id}] SNS publish response MessageId: {entry.get('MessageId')}"
+        )
+
+    failed = []
+    for entry in response.get("Failed", []):
+        message_id = batch[int(entry["Id"])][0]["message_id"]
+        logger.error(
+            f"[{message_id}] SNS publish failed: {entry.get('Code')}: {entry.get('Message')}"
+        )
+        failed.append(message_id)
+
+    return failed
+
+
+def publish_items(sns_client, items: List[GeneratedItem]) -> List[str]:
+    """
+    Publishes generated items to the item load topic in PublishBatch calls of up
+    to SNS_MAX_BATCH_SIZE messages and SNS_MAX_PAYLOAD_BYTES in total. Items
+    larger than that are offloaded to ITEM_OFFLOAD_BUCKET when it is set.
+    Returns the message ids of the items that could not be published.
+    """
+    topic_arn = get_topic_arn()
+    offload_bucket = os.environ.get("ITEM_OFFLOAD_BUCKET")
+    s3_client = None
+
+    failed: List[str] = []
+    batch: List[Tuple[GeneratedItem, str]] = []
+    batch_bytes = 0
+
+    for item in items:
+        message = item["item_json"]
+        message_bytes = len(message.encode("utf-8"))
+
+        if message_bytes > SNS_MAX_PAYLOAD_BYTES:
+            if not offload_bucket:
+                logger.error(
+                    f"[{item['message_id']}] STAC item {item['item_id']} is "
+                    f"{message_bytes} bytes, over the SNS limit of "
+                    f"{SNS_MAX_PAYLOAD_BYTES}, and ITEM_OFFLOAD_BUCKET is not set."
+                )
+                failed.append(item["message_id"])
+                continue
+            try:
+                if s3_client is None:
+                    s3_client = boto3.client(
+                        "s3", region_name=os.getenv("AWS_DEFAULT_REGION")
+                    )
+                message = offload_item_to_s3(s3_client, offload_bucket, item)
+            except Exception as e:
+                logger.error(f"[{item['message_id']}] Failed to offload item to S3: {e}")
+                failed.append(item["message_id"])
+                continue
+            message_bytes = len(message.encode("utf-8"))
+
+        if batch and (
+            len(batch) == SNS_MAX_BATCH_SIZE
+            or batch_bytes + message_bytes > SNS_MAX_PAYLOAD_BYTES
+        ):
+            failed.extend(publish_batch(sns_client, topic_arn, batch))
+            batch, batch_bytes = [], 0
+
+        batch.append((item, message))
+        batch_bytes += message_bytes
+
+    if batch:
+        failed.extend(publish_batch(sns_client, topic_arn, batch))
+
+    return failed
+
+
+class ReadinessResponse(TypedDict):
+    packages: List[PackageReadiness]
+
+
 def handler(
     event: Dict[str, Any], context: Context
-) -> Optional[PartialBatchFailureResponse]:
+) -> Optional[Union[PartialBatchFailureResponse, ReadinessResponse]]:
     """
     AWS Lambda handler function triggered by SQS with batching enabled.
 
     Processes messages in batches, attempts to generate STAC items, publishes
     successful results to SNS, and reports partial batch failures to SQS.
+    A direct invocation with {"action": "readiness"} returns the readiness of
+    the pre-warmed stactools packages instead.
     """
+    if event.get("action") == "readiness":
+        return {"packages": readiness()}
+
     try:
         sns_client = boto3.client("sns", region_name=os.getenv("AWS_DEFAULT_REGION"))
     except Exception as e:
@@ -147,21 +405,43 @@ def handler(
         f"Lambda Context: RequestId={aws_request_id}, RemainingTime={remaining_time}ms"
     )
 
-    batch_item_failures: List[BatchItemFailure] = []
+    failed_message_ids: Set[str] = set()
+    generated_items: List[GeneratedItem] = []
+
+    futures: List[Tuple[str, "Future[Optional[GeneratedItem]]"]] = []
+    max_workers = max(1, min(ITEM_CONCURRENCY, len(records)))
+    logger.debug(f"Processing up to {max_workers} records at a time.")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for record in records:
+            message_id = record.get("messageId")
+            if not message_id:
+                logger.warning("Record missing messageId, cannot report failure for it.")
+                continue
+            futures.append(
+                (message_id, executor.submit(process_record, record, sns_client))
+            )
+
+    for message_id, future in futures:
+        try:
+            generated_item = future.result()
+            if generated_item is not None:
+                generated_items.append(generated_item)
+        except Exception:
+            failed_message_ids.add(message_id)
 
+    if generated_items:
+        failed_message_ids.update(publish_items(sns_client, generated_items))
+
+    batch_item_failures: List[BatchItemFailure] = []
     for record in records:
         message_id = record.get("messageId")
         if not message_id:
-            logger.warning("Record missing messageId, cannot report failure for it.")
             continue
-
-        try:
-            process_record(record, sns_client)
-            logger.info(f"[{message_id}] Successfully processed.")
-
-        except Exception:
+        if message_id in failed_message_ids:
             logger.error(f"[{message_id}] Marked as failed.")
             batch_item_failures.append({"itemIdentifier": message_id})
+        else:
+            logger.info(f"[{message_id}] Successfully processed.")
 
     if batch_item_failures:
         logger.warning(
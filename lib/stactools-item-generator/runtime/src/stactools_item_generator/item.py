@@ -1,15 +1,41 @@
-import json
 import logging
+import os
 import subprocess
+import time
+from contextlib import nullcontext
 from tempfile import NamedTemporaryFile
-from typing import Dict, List, Optional
+from typing import (
+    Any,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from urllib.parse import urlparse
+from urllib.request import urlopen
 
-from pydantic import BaseModel, ConfigDict, Field
+import boto3
+from botocore.config import Config
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from stac_pydantic.item import Item
 
+from stactools_item_generator import json_backend
+from stactools_item_generator.environment import environment_python, get_environment
+from stactools_item_generator.item_cache import get_item_cache, item_cache_key
+from stactools_item_generator.worker import StactoolsWorker, acquire_worker
+
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+USE_STACTOOLS_WORKER = os.environ.get("STACTOOLS_WORKER", "true").lower() != "false"
+
+# seconds to wait on a manifest host, so that a stalled one fails the batch
+# request instead of hanging the invocation until the Lambda times out
+MANIFEST_TIMEOUT_SECONDS = float(os.environ.get("MANIFEST_TIMEOUT_SECONDS", "30"))
+
 
 class ItemRequest(BaseModel):
     package_name: str = Field(..., description="Name of the stactools package")
@@ -37,22 +63,100 @@ class ItemRequest(BaseModel):
     )
 
 
-def create_stac_item(request: ItemRequest) -> Item:
+class BatchItemRequest(BaseModel):
+    package_name: str = Field(..., description="Name of the stactools package")
+    group_name: str = Field(..., description="Group name for the STAC items")
+    create_item_args_list: List[List[str]] = Field(
+        default_factory=list,
+        description="Arguments for one create-item command per item",
+    )
+    manifest_url: Optional[str] = Field(
+        None,
+        description=(
+            "s3:// or http(s) URL of a text file with one item per line, "
+            "its create-item arguments separated by whitespace"
+        ),
+    )
+    create_item_options: Dict[str, str] = Field(
+        default_factory=dict, description="Options for every create-item command"
+    )
+    collection_id: Optional[str] = Field(
+        None, description="value for the collection field of the items json"
+    )
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "package_name": "stactools-glad-glclu2020",
+                "group_name": "gladglclu2020",
+                "create_item_args_list": [
+                    [
+                        "https://storage.googleapis.com/earthenginepartners-hansen/GLCLU2000-2020/v2/2000/50N_090W.tif"
+                    ],
+                    [
+                        "https://storage.googleapis.com/earthenginepartners-hansen/GLCLU2000-2020/v2/2000/50N_100W.tif"
+                    ],
+                ],
+            }
+        }
+    )
+
+    @model_validator(mode="after")
+    def check_inputs(self) -> "BatchItemRequest":
+        if bool(self.create_item_args_list) == bool(self.manifest_url):
+            raise ValueError(
+                "Exactly one of create_item_args_list or manifest_url is required"
+            )
+        return self
+
+    @staticmethod
+    def is_batch(message_data: Dict[str, Any]) -> bool:
+        return "create_item_args_list" in message_data or "manifest_url" in message_data
+
+    def item_request(self, create_item_args: List[str]) -> ItemRequest:
+        return ItemRequest(
+            package_name=self.package_name,
+            group_name=self.group_name,
+            create_item_args=create_item_args,
+            create_item_options=self.create_item_options,
+            collection_id=self.collection_id,
+        )
+
+
+def read_manifest(url: str) -> List[List[str]]:
     """
-    Create a STAC item using a stactools package
+    Read the create-item arguments of a batch from a manifest on S3 or HTTP
     """
-    logger.info(f"Received request: {json.dumps(request.model_dump())}")
+    parsed = urlparse(url)
+    if parsed.scheme == "s3":
+        s3_client = boto3.client(
+            "s3",
+            region_name=os.getenv("AWS_DEFAULT_REGION"),
+            config=Config(
+                connect_timeout=MANIFEST_TIMEOUT_SECONDS,
+                read_timeout=MANIFEST_TIMEOUT_SECONDS,
+            ),
+        )
+        response = s3_client.get_object(Bucket=parsed.netloc, Key=parsed.path.lstrip("/"))
+        text = response["Body"].read().decode("utf-8")
+    elif parsed.scheme in ("http", "https"):
+        with urlopen(url, timeout=MANIFEST_TIMEOUT_SECONDS) as response:
+            text = response.read().decode("utf-8")
+    else:
+        raise ValueError(f"Unsupported manifest URL: {url}")
+
+    return [line.split() for line in text.splitlines() if line.strip()]
 
-    if not request.package_name:
-        raise ValueError("Missing required parameter: package_name")
 
+def run_create_item_command(request: ItemRequest) -> Dict[str, Any]:
+    """
+    Create an item dictionary with a new stactools process
+    """
+    environment = get_environment(request.package_name)
     command = [
-        "uvx",
-        "--with",
-        f"requests,numpy<2.3.0,{request.package_name}",
-        "--from",
-        "stactools",
-        "stac",
+        str(environment_python(environment)),
+        "-m",
+        "stactools.cli",
         request.group_name,
         "create-item",
         *request.create_item_args,
@@ -66,12 +170,116 @@ def create_stac_item(request: ItemRequest) -> Item:
     with NamedTemporaryFile(suffix=".json") as output:
         command.append(output.name)
         result = subprocess.run(command, capture_output=True, text=True, check=True)
-
         logger.info(f"Command output: {result.stdout}")
-        with open(output.name) as f:
-            item_dict = json.load(f)
+        with open(output.name, "rb") as f:
+            return json_backend.loads(f.read())
+
+
+def generate_item_dict(
+    request: ItemRequest, worker: Optional[StactoolsWorker] = None
+) -> Dict[str, Any]:
+    """
+    Create an item dictionary with a stactools worker, or a new stactools
+    process without one, unless the item cache already has it
+    """
+    cache = get_item_cache()
+    cache_key = None
+    if cache is not None:
+        cache_key = item_cache_key(request)
+        try:
+            cached_item = cache.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Failed to read item {cache_key} from the item cache: {e}")
+            cached_item = None
+        if cached_item is not None:
+            logger.info(f"Using cached item {cached_item.get('id')} ({cache_key})")
+            return cached_item
+
+    if worker is not None:
+        item_dict = worker.create_item(
+            request.create_item_args, request.create_item_options
+        )
+    else:
+        item_dict = run_create_item_command(request)
+
+    if cache is not None and cache_key is not None:
+        try:
+            cache.put(cache_key, item_dict)
+        except Exception as e:
+            logger.warning(f"Failed to write item {cache_key} to the item cache: {e}")
+
+    return item_dict
+
+
+def create_stac_item(request: ItemRequest) -> Item:
+    """
+    Create a STAC item using a stactools package
+    """
+    logger.info(f"Received request: {request.model_dump_json()}")
+
+    if not request.package_name:
+        raise ValueError("Missing required parameter: package_name")
+
+    start = time.perf_counter()
+    if USE_STACTOOLS_WORKER:
+        with acquire_worker(request.package_name, request.group_name) as worker:
+            item_dict = generate_item_dict(request, worker)
+    else:
+        item_dict = generate_item_dict(request)
+    logger.info(
+        f"Created item with {request.package_name} in {time.perf_counter() - start:.2f}s"
+    )
+
+    return to_item(item_dict, request.collection_id)
+
+
+def create_stac_items(
+    request: BatchItemRequest,
+) -> Iterator[Tuple[List[str], Union[Item, Exception]]]:
+    """
+    Create the STAC items of a batch with one stactools worker, yielding each
+    input's arguments with its item, or the exception it failed with, as soon
+    as it is ready
+
+    The worker is only returned to the pool once the generator finishes, so
+    callers that may stop early have to close it, e.g. with contextlib.closing.
+    """
+    logger.info(f"Received batch request: {request.model_dump_json()}")
+
+    if request.manifest_url:
+        create_item_args_list = read_manifest(request.manifest_url)
+    else:
+        create_item_args_list = request.create_item_args_list
+    logger.info(
+        f"Creating {len(create_item_args_list)} items with {request.package_name}"
+    )
+
+    worker_context: ContextManager[Optional[StactoolsWorker]] = (
+        acquire_worker(request.package_name, request.group_name)
+        if USE_STACTOOLS_WORKER
+        else nullcontext()
+    )
+    with worker_context as worker:
+        for create_item_args in create_item_args_list:
+            start = time.perf_counter()
+            try:
+                item_dict = generate_item_dict(
+                    request.item_request(create_item_args), worker
+                )
+                item = to_item(item_dict, request.collection_id)
+            except Exception as e:
+                yield create_item_args, e
+                continue
+
+            logger.debug(
+                f"Created item {item.id} with {request.package_name} in "
+                f"{time.perf_counter() - start:.2f}s"
+            )
+            yield create_item_args, item
+
 
-    if request.collection_id:
-        item_dict["collection"] = request.collection_id
+def to_item(item_dict: Dict[str, Any], collection_id: Optional[str]) -> Item:
+    if collection_id:
+        item_dict["collection"] = collection_id
 
     return Item(**item_dict)
@@ -0,0 +1,208 @@
+"""Content-addressed cache of generated STAC items.
+
+Replaying a request with the same package, group, create-item arguments and
+options would regenerate the same item, re-reading the source data. When
+ITEM_CACHE_URL is set, generated items are stored under a hash of the
+normalized request and reused instead of running stactools again.
+
+The ETag or Last-Modified header of every http(s):// and s3:// argument is part
+of the hash, so an item is regenerated when its source data changes; set
+ITEM_CACHE_VALIDATE_SOURCES to false to skip those HEAD requests. The
+collection_id of a request is applied after the cache, so it is not part of the
+hash.
+
+The installed versions of stactools and the package are part of the hash too,
+so that an environment rebuilt with newer versions of an unpinned package does
+not serve the items of the older ones.
+
+ITEM_CACHE_URL is either an s3://bucket/prefix, whose objects should be expired
+with a bucket lifecycle rule, or a local directory, which is kept under
+ITEM_CACHE_MAX_BYTES by evicting the least recently used items.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+from urllib.parse import urlparse
+from urllib.request import Request, urlopen
+
+import boto3
+from botocore.exceptions import ClientError
+
+from stactools_item_generator import json_backend
+from stactools_item_generator.environment import package_versions
+
+if TYPE_CHECKING:
+    from stactools_item_generator.item import ItemRequest
+
+logger = logging.getLogger()
+
+ITEM_CACHE_URL = os.environ.get("ITEM_CACHE_URL")
+ITEM_CACHE_MAX_BYTES = int(os.environ.get("ITEM_CACHE_MAX_BYTES", str(512 * 1024**2)))
+ITEM_CACHE_VALIDATE_SOURCES = (
+    os.environ.get("ITEM_CACHE_VALIDATE_SOURCES", "true").lower() != "false"
+)
+SOURCE_HEAD_TIMEOUT_SECONDS = 5
+
+_cache: Optional[Union["LocalItemCache", "S3ItemCache"]] = None
+_cache_lock = threading.Lock()
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
+
+def get_s3_client():
+    """Return the S3 client shared by the source lookups and the S3 item cache."""
+    global _s3_client
+    # creating boto3 clients is not thread-safe
+    with _s3_client_lock:
+        if _s3_client is None:
+            _s3_client = boto3.client("s3", region_name=os.getenv("AWS_DEFAULT_REGION"))
+        return _s3_client
+
+
+def source_version(arg: str) -> Optional[str]:
+    """Return the ETag or Last-Modified of a remote source, if it is cheap to get."""
+    parsed = urlparse(arg)
+    try:
+        if parsed.scheme in ("http", "https"):
+            with urlopen(
+                Request(arg, method="HEAD"), timeout=SOURCE_HEAD_TIMEOUT_SECONDS
+            ) as response:
+                return response.headers.get("ETag") or response.headers.get(
+                    "Last-Modified"
+                )
+        if parsed.scheme == "s3":
+            response = get_s3_client().head_object(
+                Bucket=parsed.netloc, Key=parsed.path.lstrip("/")
+            )
+            return response.get("ETag") or str(response.get("LastModified"))
+    except Exception as e:
+        logger.warning(f"Could not get the version of {arg} for the item cache: {e}")
+    return None
+
+
+def item_cache_key(request: "ItemRequest") -> str:
+    """
+    Return the hash of a normalized ItemRequest, the versions of its sources and
+    of the stactools packages that generate it
+    """
+    sources: List[Optional[str]] = []
+    if ITEM_CACHE_VALIDATE_SOURCES:
+        sources = [source_version(arg) for arg in request.create_item_args]
+
+    normalized = {
+        "package_name": request.package_name.strip(),
+        "group_name": request.group_name,
+        "create_item_args": request.create_item_args,
+        "create_item_options": sorted(request.create_item_options.items()),
+        "sources": sources,
+        "packages": sorted(package_versions(request.package_name).items()),
+    }
+    return hashlib.sha256(json_backend.dumps(normalized).encode("utf-8")).hexdigest()
+
+
+class LocalItemCache:
+    """Items in a local directory, evicting the least recently used over max_bytes."""
+
+    def __init__(self, directory: Path, max_bytes: int = ITEM_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.total_bytes = sum(path.stat().st_size for path in self.entries())
+
+    def entries(self) -> List[Path]:
+        return list(self.directory.glob("*/*.json"))
+
+    def path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self.path(key)
+        try:
+            data = path.read_bytes()
+            # the modification time orders entries for eviction
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return json_backend.loads(data)
+
+    def put(self, key: str, item: Dict[str, Any]) -> None:
+        path = self.path(key)
+        data = json_backend.dumps(item).encode("utf-8")
+        path.parent.mkdir(exist_ok=True)
+        staging = path.with_suffix(f".{threading.get_ident()}.tmp")
+        staging.write_bytes(data)
+
+        with self.lock:
+            if path.exists():
+                self.total_bytes -= path.stat().st_size
+            staging.replace(path)
+            self.total_bytes += len(data)
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+
+    def evict(self) -> None:
+        entries = sorted(
+            ((path.stat(), path) for path in self.entries()),
+            key=lambda entry: entry[0].st_mtime,
+        )
+        self.total_bytes = sum(stat.st_size for stat, _ in entries)
+        for stat, path in entries:
+            if self.total_bytes <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            self.total_bytes -= stat.st_size
+
+
+class S3ItemCache:
+    """Items under a prefix of an S3 bucket."""
+
+    def __init__(self, bucket: str, prefix: str):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.s3_client = get_s3_client()
+
+    def object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            response = self.s3_client.get_object(
+                Bucket=self.bucket, Key=self.object_key(key)
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                return None
+            raise
+        return json_backend.loads(response["Body"].read())
+
+    def put(self, key: str, item: Dict[str, Any]) -> None:
+        self.s3_client.put_object(
+            Bucket=self.bucket,
+            Key=self.object_key(key),
+            Body=json_backend.dumps(item).encode("utf-8"),
+            ContentType="application/json",
+        )
+
+
+def get_item_cache() -> Optional[Union[LocalItemCache, S3ItemCache]]:
+    """Return the item cache configured by ITEM_CACHE_URL, or None if it is unset."""
+    global _cache
+    if not ITEM_CACHE_URL:
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            parsed = urlparse(ITEM_CACHE_URL)
+            if parsed.scheme == "s3":
+                prefix = parsed.path.lstrip("/")
+                if prefix and not prefix.endswith("/"):
+                    prefix += "/"
+                _cache = S3ItemCache(parsed.netloc, prefix)
+            else:
+                _cache = LocalItemCache(Path(parsed.path or ITEM_CACHE_URL))
+        return _cache
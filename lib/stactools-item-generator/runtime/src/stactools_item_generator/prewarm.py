@@ -0,0 +1,158 @@
+"""Pre-warming of stactools packages.
+
+STACTOOLS_PREWARM lists the packages to warm up as JSON::
+
+    [{"package_name": "stactools-glad-glclu2020", "group_name": "gladglclu2020"}]
+
+At image build time, ``python -m stactools_item_generator.prewarm --build``
+builds their environments into STACTOOLS_PREBUILT_ENV_DIR, so that no container
+has to install them. When the handler is loaded in the Lambda init phase,
+prewarm_all starts a stactools worker that has imported each prebuilt package,
+so the first record only has to create its item. Packages that were not built
+into the image are skipped there, as building them could overrun the 10 s
+init phase, and are built on their first request instead.
+
+The readiness of every package is kept for readiness(), which the handler
+returns for a direct ``{"action": "readiness"}`` invocation.
+"""
+
+import argparse
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple, TypedDict
+
+from stactools_item_generator import environment, json_backend
+from stactools_item_generator.worker import acquire_worker
+
+logger = logging.getLogger()
+
+STACTOOLS_PREWARM = os.environ.get("STACTOOLS_PREWARM", "")
+
+
+class PackageReadiness(TypedDict):
+    package_name: str
+    group_name: str
+    environment_ready: bool
+    worker_ready: bool
+    seconds: float
+    error: Optional[str]
+
+
+_readiness: Dict[Tuple[str, str], PackageReadiness] = {}
+
+
+def prewarm_packages(config: Optional[str] = None) -> List[Tuple[str, str]]:
+    """Return the (package_name, group_name) pairs configured to be pre-warmed."""
+    if config is None:
+        config = STACTOOLS_PREWARM
+    if not config.strip():
+        return []
+    return [
+        (entry["package_name"], entry["group_name"])
+        for entry in json_backend.loads(config)
+    ]
+
+
+def prewarm(
+    package_name: str,
+    group_name: str,
+    start_worker: bool = True,
+    prebuilt_only: bool = False,
+) -> PackageReadiness:
+    """Resolve the environment of a package and start a worker for it.
+
+    With prebuilt_only, packages without an environment in the image are left
+    to be built on their first request.
+    """
+    start = time.perf_counter()
+    status: PackageReadiness = {
+        "package_name": package_name,
+        "group_name": group_name,
+        "environment_ready": False,
+        "worker_ready": False,
+        "seconds": 0.0,
+        "error": None,
+    }
+
+    if prebuilt_only and environment.prebuilt_environment(package_name) is None:
+        logger.warning(
+            f"Not pre-warming {package_name} {group_name}: its environment is not "
+            "built into the image"
+        )
+        return status
+
+    try:
+        environment.get_environment(package_name)
+        status["environment_ready"] = True
+        if start_worker:
+            with acquire_worker(package_name, group_name) as worker:
+                worker.ping()
+            status["worker_ready"] = True
+    except Exception as e:
+        logger.error(f"Failed to pre-warm {package_name} {group_name}: {e}")
+        status["error"] = str(e)
+
+    status["seconds"] = round(time.perf_counter() - start, 3)
+    _readiness[(package_name, group_name)] = status
+    logger.info(
+        f"Pre-warmed {package_name} {group_name} in {status['seconds']}s: "
+        f"environment_ready={status['environment_ready']}, "
+        f"worker_ready={status['worker_ready']}"
+    )
+    return status
+
+
+def prewarm_all(
+    start_worker: bool = True, prebuilt_only: bool = False
+) -> List[PackageReadiness]:
+    """Pre-warm every package in STACTOOLS_PREWARM."""
+    return [
+        prewarm(
+            package_name,
+            group_name,
+            start_worker=start_worker,
+            prebuilt_only=prebuilt_only,
+        )
+        for package_name, group_name in prewarm_packages()
+    ]
+
+
+def readiness() -> List[PackageReadiness]:
+    """Return the readiness of the configured packages, pre-warmed or not."""
+    return [
+        _readiness.get(
+            (package_name, group_name),
+            {
+                "package_name": package_name,
+                "group_name": group_name,
+                "environment_ready": False,
+                "worker_ready": False,
+                "seconds": 0.0,
+                "error": None,
+            },
+        )
+        for package_name, group_name in prewarm_packages()
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-warm stactools packages")
+    parser.add_argument(
+        "--build",
+        action="store_true",
+        help="only build the environments into STACTOOLS_PREBUILT_ENV_DIR",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.build:
+        environment.STACTOOLS_ENV_DIR = environment.STACTOOLS_PREBUILT_ENV_DIR
+
+    results = prewarm_all(start_worker=not args.build)
+    if any(result["error"] for result in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
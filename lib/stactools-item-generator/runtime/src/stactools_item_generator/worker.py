@@ -0,0 +1,170 @@
+"""Persistent stactools worker processes.
+
+worker_process.py is kept running per (package_name, group_name) in the
+package's cached environment, one process for each record of that package being
+processed at the same time. Requests and responses are exchanged as NDJSON over
+its stdin and stdout, so interpreter startup, the stactools imports and the item
+file round trip are paid once per worker instead of once per item. A worker
+that exits is restarted on the next request.
+
+The protocol is encoded with the standard library json module at both ends,
+since the worker only has the standard library and stactools. Its responses can
+contain NaN and Infinity, which json writes and reads but orjson rejects.
+"""
+
+import atexit
+import json
+import logging
+import subprocess
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from stactools_item_generator.environment import environment_python, get_environment
+
+logger = logging.getLogger()
+
+WORKER_SCRIPT = Path(__file__).with_name("worker_process.py")
+
+_idle_workers: Dict[Tuple[str, str], List["StactoolsWorker"]] = {}
+_all_workers: List["StactoolsWorker"] = []
+_workers_lock = threading.Lock()
+
+
+class StactoolsWorker:
+    """A long-lived stactools process for one package and group."""
+
+    def __init__(self, package_name: str, group_name: str):
+        self.package_name = package_name
+        self.group_name = group_name
+        self.process: Optional[subprocess.Popen] = None
+        self.lock = threading.Lock()
+
+    def command(self) -> List[str]:
+        python = environment_python(get_environment(self.package_name))
+        return [str(python), str(WORKER_SCRIPT), self.group_name]
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self) -> None:
+        command = self.command()
+        logger.info(f"Starting stactools worker: {' '.join(command)}")
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+        )
+
+    def stop(self) -> None:
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            self.process.stdin.close()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+
+    def _exchange(self, request_line: str) -> str:
+        assert self.process is not None
+        try:
+            self.process.stdin.write(request_line)
+            self.process.stdin.flush()
+            return self.process.stdout.readline()
+        except (BrokenPipeError, OSError):
+            return ""
+
+    def ping(self) -> None:
+        """Start the worker if needed and wait until it has imported stactools."""
+        with self.lock:
+            if not self.is_alive():
+                self.start()
+            response_line = self._exchange(json.dumps({"ping": True}) + "\n")
+            if not response_line:
+                self.stop()
+        if not response_line:
+            raise RuntimeError(
+                f"stactools worker for {self.package_name} {self.group_name} "
+                "exited while starting"
+            )
+
+    def create_item(self, args: List[str], options: Dict[str, str]) -> Dict[str, Any]:
+        """Create an item, restarting the worker once if it has died.
+
+        Raises subprocess.CalledProcessError with the equivalent stac command and
+        the worker's traceback if the create-item command fails.
+        """
+        request_line = json.dumps({"args": args, "options": options}) + "\n"
+
+        with self.lock:
+            for attempt in range(2):
+                if not self.is_alive():
+                    if attempt:
+                        logger.warning(
+                            f"stactools worker for {self.package_name} "
+                            f"{self.group_name} exited, restarting"
+                        )
+                    self.start()
+
+                response_line = self._exchange(request_line)
+                if response_line:
+                    break
+                self.stop()
+            else:
+                raise RuntimeError(
+                    f"stactools worker for {self.package_name} {self.group_name} "
+                    "exited while creating an item"
+                )
+
+        response = json.loads(response_line)
+        if not response["ok"]:
+            command = ["stac", self.group_name, "create-item", *args]
+            for option, value in options.items():
+                command.extend([f"--{option}", value])
+            raise subprocess.CalledProcessError(
+                returncode=1,
+                cmd=command,
+                output=response["error"],
+                stderr=response["traceback"],
+            )
+
+        return response["item"]
+
+
+@contextmanager
+def acquire_worker(package_name: str, group_name: str) -> Iterator[StactoolsWorker]:
+    """Borrow an idle worker for a package and group, creating one if all are busy.
+
+    Workers are returned to the pool afterwards, so concurrent records for the
+    same package each get their own process and there are never more workers
+    than records being processed at once.
+    """
+    key = (package_name, group_name)
+    with _workers_lock:
+        idle = _idle_workers.setdefault(key, [])
+        if idle:
+            worker = idle.pop()
+        else:
+            worker = StactoolsWorker(package_name, group_name)
+            _all_workers.append(worker)
+
+    try:
+        yield worker
+    finally:
+        with _workers_lock:
+            _idle_workers.setdefault(key, []).append(worker)
+
+
+@atexit.register
+def stop_workers() -> None:
+    with _workers_lock:
+        for worker in _all_workers:
+            worker.stop()
+        _all_workers.clear()
+        _idle_workers.clear()
@@ -0,0 +1,99 @@
+"""Long-lived stactools worker process.
+
+Runs with the interpreter of a stactools environment, not in the handler's own
+environment, so it only uses the standard library and stactools::
+
+    python worker_process.py <group_name>
+
+Reads one create-item request per line on stdin::
+
+    {"args": ["https://example.com/data.tif"], "options": {"option": "value"}}
+
+and writes one response per line on stdout::
+
+    {"ok": true, "item": {...}}
+    {"ok": false, "error": "...", "traceback": "..."}
+
+A ``{"ping": true}`` request is answered with ``{"ok": true}`` once stactools and
+its plugins are imported.
+
+Anything the stactools commands print goes to stderr, so it cannot corrupt the
+responses.
+"""
+
+import json
+import logging
+import os
+import sys
+import tempfile
+import traceback
+
+
+def main() -> None:
+    group_name = sys.argv[1]
+
+    protocol = os.fdopen(os.dup(sys.stdout.fileno()), "w", buffering=1)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+
+    import pystac
+    from stactools.cli.cli import cli
+
+    captured = {}
+    save_object = pystac.STACObject.save_object
+
+    def capture_save_object(self, include_self_link=True, dest_href=None, stac_io=None):
+        # keep the item in memory instead of writing it and reading it back
+        if dest_href is not None and dest_href == captured.get("destination"):
+            captured["item"] = self.to_dict(include_self_link=include_self_link)
+            return
+        return save_object(self, include_self_link, dest_href, stac_io)
+
+    pystac.STACObject.save_object = capture_save_object
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        destination = os.path.join(output_dir, "item.json")
+
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+
+            captured.clear()
+            captured["destination"] = destination
+            # the cli group adds a log handler on every invocation
+            logging.getLogger("stactools").handlers.clear()
+
+            try:
+                request = json.loads(line)
+                if request.get("ping"):
+                    protocol.write(json.dumps({"ok": True}) + "\n")
+                    continue
+
+                args = [group_name, "create-item", *request["args"]]
+                for option, value in request.get("options", {}).items():
+                    args.extend([f"--{option}", value])
+                args.append(destination)
+
+                cli.main(args=args, prog_name="stac", standalone_mode=False)
+
+                if "item" in captured:
+                    item = captured["item"]
+                else:
+                    with open(destination) as f:
+                        item = json.load(f)
+                response = {"ok": True, "item": item}
+            except (Exception, SystemExit) as e:
+                response = {
+                    "ok": False,
+                    "error": f"{type(e).__name__}: {e}",
+                    "traceback": traceback.format_exc(),
+                }
+            finally:
+                if os.path.exists(destination):
+                    os.remove(destination)
+
+            protocol.write(json.dumps(response) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import os
+import subprocess
+import threading
+
+import pytest
+from stactools_item_generator import environment
+
+
+@pytest.fixture(autouse=True)
+def env_dir(tmp_path, monkeypatch):
+    """Build environments in a temporary directory with an empty cache."""
+    monkeypatch.setattr(environment, "STACTOOLS_ENV_DIR", tmp_path)
+    monkeypatch.setattr(environment, "_environments", {})
+    monkeypatch.setattr(environment, "_installed_versions", {})
+    return tmp_path
+
+
+@pytest.fixture
+def mock_build(monkeypatch):
+    builds = []
+
+    def _build(package_name, env_path):
+        builds.append(package_name)
+        env_path.mkdir()
+        (env_path / environment.READY_MARKER).touch()
+
+    monkeypatch.setattr(environment, "build_environment", _build)
+    return builds
+
+
+@pytest.mark.parametrize(
+    "package_name,key",
+    [
+        ("stactools-glad-glclu2020", "stactools-glad-glclu2020-latest"),
+        (
+            "stactools-glad-global-forest-change==0.1.2",
+            "stactools-glad-global-forest-change-0.1.2",
+        ),
+        ("stactools-fake @ file:///tmp/fake", "stactools-fake_file_tmp_fake-latest"),
+    ],
+)
+def test_environment_key(package_name, key):
+    assert environment.environment_key(package_name) == key
+
+
+@pytest.mark.parametrize(
+    "requirement,name",
+    [
+        ("stactools-glad-glclu2020", "stactools-glad-glclu2020"),
+        ("Stactools_GLAD.Forest[extra]==0.1.2", "stactools-glad-forest"),
+        ("stactools-fake @ file:///tmp/fake", "stactools-fake"),
+    ],
+)
+def test_distribution_name(requirement, name):
+    assert environment.distribution_name(requirement) == name
+
+
+def test_package_versions(env_dir, monkeypatch):
+    def _build(package_name, env_path):
+        site_packages = env_path / "lib" / "python3.12" / "site-packages"
+        for name, version in [("stactools", "0.5.3"), ("stactools_test", "1.2.0")]:
+            dist_info = site_packages / f"{name}-{version}.dist-info"
+            dist_info.mkdir(parents=True)
+            (dist_info / "METADATA").write_text(
+                f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n"
+            )
+        (env_path / environment.READY_MARKER).touch()
+
+    monkeypatch.setattr(environment, "build_environment", _build)
+
+    assert environment.package_versions("stactools-test") == {
+        "stactools": "0.5.3",
+        "stactools-test": "1.2.0",
+    }
+
+
+def test_get_environment_builds_once_per_package_version(env_dir, mock_build):
+    first = environment.get_environment("stactools-test==1.0")
+    second = environment.get_environment("stactools-test==1.0")
+    other_version = environment.get_environment("stactools-test==2.0")
+
+    assert first == second == env_dir / "stactools-test-1.0"
+    assert other_version == env_dir / "stactools-test-2.0"
+    assert mock_build == ["stactools-test==1.0", "stactools-test==2.0"]
+
+
+def test_get_environment_builds_once_for_concurrent_requests(mock_build):
+    barrier = threading.Barrier(8)
+
+    def request():
+        barrier.wait()
+        environment.get_environment("stactools-test")
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert mock_build == ["stactools-test"]
+
+
+def test_get_environment_reuses_ready_environment_on_disk(env_dir, mock_build):
+    ready = env_dir / "stactools-test-latest"
+    ready.mkdir()
+    (ready / environment.READY_MARKER).touch()
+
+    assert environment.get_environment("stactools-test") == ready
+    assert mock_build == []
+
+
+def test_build_environment_failure_leaves_nothing_behind(env_dir, monkeypatch):
+    def _run(command, capture_output, text, check):
+        if command[:3] == ["uv", "pip", "install"]:
+            raise subprocess.CalledProcessError(1, command, stderr="no solution")
+        env_path = command[-1]
+        os.makedirs(env_path)
+        return subprocess.CompletedProcess(command, 0)
+
+    monkeypatch.setattr(environment.subprocess, "run", _run)
+
+    with pytest.raises(subprocess.CalledProcessError):
+        environment.get_environment("stactools-missing")
+
+    assert list(env_dir.iterdir()) == []
+    assert "stactools-missing-latest" not in environment._environments
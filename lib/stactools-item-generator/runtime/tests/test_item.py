@@ -1,8 +1,21 @@
+import io
 import json
 import subprocess
+from contextlib import closing, contextmanager
+from pathlib import Path
 
+import boto3
 import pytest
-from stactools_item_generator.item import ItemRequest, create_stac_item
+from moto import mock_s3
+from pydantic import ValidationError
+from stactools_item_generator.environment import environment_key
+from stactools_item_generator.item import (
+    BatchItemRequest,
+    ItemRequest,
+    create_stac_item,
+    create_stac_items,
+    read_manifest,
+)
 
 
 @pytest.fixture
@@ -30,7 +43,12 @@ def mock_stactools_command(monkeypatch):
             args=command, returncode=0, stdout="ok", stderr=""
         )
 
+    monkeypatch.setattr("stactools_item_generator.item.USE_STACTOOLS_WORKER", False)
     monkeypatch.setattr("stactools_item_generator.item.subprocess.run", _run)
+    monkeypatch.setattr(
+        "stactools_item_generator.item.get_environment",
+        lambda package_name: Path("/envs") / environment_key(package_name),
+    )
     return commands
 
 
@@ -69,7 +87,214 @@ def mock_stactools_command(monkeypatch):
 def test_item(item_request: ItemRequest, mock_stactools_command: list[list[str]]) -> None:
     stac_item = create_stac_item(item_request)
     command = mock_stactools_command[0]
-    assert command[0] == "uvx"
-    assert command[2].endswith(item_request.package_name)
+    assert command[0] == str(
+        Path("/envs") / environment_key(item_request.package_name) / "bin" / "python"
+    )
+    assert command[1:5] == ["-m", "stactools.cli", item_request.group_name, "create-item"]
     if item_request.collection_id:
         assert stac_item.collection == item_request.collection_id
+
+
+def test_item_with_worker(monkeypatch) -> None:
+    workers = []
+
+    class FakeWorker:
+        def __init__(self, package_name, group_name):
+            self.package_name = package_name
+            self.group_name = group_name
+            self.requests = []
+            workers.append(self)
+
+        def create_item(self, args, options):
+            self.requests.append((args, options))
+            return {
+                "type": "Feature",
+                "stac_version": "1.0.0",
+                "id": "test-item",
+                "properties": {"datetime": "2023-01-01T00:00:00Z"},
+                "geometry": {"type": "Point", "coordinates": [0, 0]},
+                "links": [],
+                "assets": {},
+                "bbox": [0, 0, 0, 0],
+                "stac_extensions": [],
+            }
+
+    monkeypatch.setattr("stactools_item_generator.item.USE_STACTOOLS_WORKER", True)
+
+    @contextmanager
+    def _acquire_worker(package_name, group_name):
+        yield FakeWorker(package_name, group_name)
+
+    monkeypatch.setattr("stactools_item_generator.item.acquire_worker", _acquire_worker)
+
+    stac_item = create_stac_item(
+        ItemRequest(
+            package_name="stactools-glad-glclu2020",
+            group_name="gladglclu2020",
+            create_item_args=["s3://bucket/50N_090W.tif"],
+            create_item_options={"asset-key": "data"},
+            collection_id="test",
+        )
+    )
+
+    assert workers[0].package_name == "stactools-glad-glclu2020"
+    assert workers[0].group_name == "gladglclu2020"
+    assert workers[0].requests == [(["s3://bucket/50N_090W.tif"], {"asset-key": "data"})]
+    assert stac_item.id == "test-item"
+    assert stac_item.collection == "test"
+
+
+def make_item_dict(item_id: str) -> dict:
+    return {
+        "type": "Feature",
+        "stac_version": "1.0.0",
+        "id": item_id,
+        "properties": {"datetime": "2023-01-01T00:00:00Z"},
+        "geometry": {"type": "Point", "coordinates": [0, 0]},
+        "links": [],
+        "assets": {},
+        "bbox": [0, 0, 0, 0],
+        "stac_extensions": [],
+    }
+
+
+@pytest.mark.parametrize(
+    "inputs",
+    [
+        {},
+        {"create_item_args_list": []},
+        {"create_item_args_list": [["a.tif"]], "manifest_url": "s3://bucket/list"},
+    ],
+)
+def test_batch_item_request_requires_one_input_source(inputs) -> None:
+    with pytest.raises(ValidationError, match="Exactly one of"):
+        BatchItemRequest(package_name="stactools-test", group_name="test", **inputs)
+
+
+def test_create_stac_items_reports_inputs_individually(monkeypatch) -> None:
+    acquired = []
+
+    class FakeWorker:
+        def create_item(self, args, options):
+            assert options == {"asset-key": "data"}
+            if args[0] == "bad.tif":
+                raise subprocess.CalledProcessError(1, ["stac"], "", "traceback")
+            return make_item_dict(args[0].split(".")[0])
+
+    @contextmanager
+    def _acquire_worker(package_name, group_name):
+        acquired.append((package_name, group_name))
+        yield FakeWorker()
+
+    monkeypatch.setattr("stactools_item_generator.item.USE_STACTOOLS_WORKER", True)
+    monkeypatch.setattr("stactools_item_generator.item.acquire_worker", _acquire_worker)
+
+    results = list(
+        create_stac_items(
+            BatchItemRequest(
+                package_name="stactools-test",
+                group_name="test",
+                create_item_args_list=[["a.tif"], ["bad.tif"], ["c.tif"]],
+                create_item_options={"asset-key": "data"},
+                collection_id="test-collection",
+            )
+        )
+    )
+
+    assert acquired == [("stactools-test", "test")]
+    assert [args for args, _ in results] == [["a.tif"], ["bad.tif"], ["c.tif"]]
+    assert results[0][1].id == "a"
+    assert results[0][1].collection == "test-collection"
+    assert isinstance(results[1][1], subprocess.CalledProcessError)
+    assert results[2][1].id == "c"
+
+
+def test_create_stac_items_without_worker(monkeypatch) -> None:
+    monkeypatch.setattr("stactools_item_generator.item.USE_STACTOOLS_WORKER", False)
+    monkeypatch.setattr("stactools_item_generator.item.acquire_worker", pytest.fail)
+
+    def _generate_item_dict(request, worker=None):
+        assert worker is None
+        return make_item_dict(request.create_item_args[0].split(".")[0])
+
+    monkeypatch.setattr(
+        "stactools_item_generator.item.generate_item_dict", _generate_item_dict
+    )
+
+    results = list(
+        create_stac_items(
+            BatchItemRequest(
+                package_name="stactools-test",
+                group_name="test",
+                create_item_args_list=[["a.tif"], ["b.tif"]],
+            )
+        )
+    )
+
+    assert [item.id for _, item in results] == ["a", "b"]
+
+
+def test_create_stac_items_returns_worker_when_closed_early(monkeypatch) -> None:
+    returned = []
+
+    class FakeWorker:
+        def create_item(self, args, options):
+            return make_item_dict(args[0].split(".")[0])
+
+    @contextmanager
+    def _acquire_worker(package_name, group_name):
+        try:
+            yield FakeWorker()
+        finally:
+            returned.append(True)
+
+    monkeypatch.setattr("stactools_item_generator.item.USE_STACTOOLS_WORKER", True)
+    monkeypatch.setattr("stactools_item_generator.item.acquire_worker", _acquire_worker)
+
+    with closing(
+        create_stac_items(
+            BatchItemRequest(
+                package_name="stactools-test",
+                group_name="test",
+                create_item_args_list=[["a.tif"], ["b.tif"]],
+            )
+        )
+    ) as results:
+        _, first = next(results)
+        assert first.id == "a"
+        assert returned == []
+
+    assert returned == [True]
+
+
+def test_read_manifest_from_http(monkeypatch) -> None:
+    manifest = b"https://example.com/a.tif\n\nhttps://example.com/b.tif https://example.com/b_mask.tif\n"
+    timeouts = []
+
+    def _urlopen(url, timeout):
+        timeouts.append(timeout)
+        return io.BytesIO(manifest)
+
+    monkeypatch.setattr("stactools_item_generator.item.urlopen", _urlopen)
+    monkeypatch.setattr("stactools_item_generator.item.MANIFEST_TIMEOUT_SECONDS", 5)
+
+    assert read_manifest("https://example.com/manifest.txt") == [
+        ["https://example.com/a.tif"],
+        ["https://example.com/b.tif", "https://example.com/b_mask.tif"],
+    ]
+    assert timeouts == [5]
+
+
+@mock_s3
+def test_read_manifest_from_s3(monkeypatch) -> None:
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    s3 = boto3.client("s3", region_name="us-east-1")
+    s3.create_bucket(Bucket="manifests")
+    s3.put_object(Bucket="manifests", Key="glad/tiles.txt", Body=b"s3://data/a.tif\n")
+
+    assert read_manifest("s3://manifests/glad/tiles.txt") == [["s3://data/a.tif"]]
+
+
+def test_read_manifest_rejects_other_schemes() -> None:
+    with pytest.raises(ValueError, match="Unsupported manifest URL"):
+        read_manifest("ftp://example.com/manifest.txt")
@@ -0,0 +1,206 @@
+import os
+import time
+
+import boto3
+import pytest
+from moto import mock_s3
+from stactools_item_generator import item, item_cache
+from stactools_item_generator.item import ItemRequest, create_stac_item
+
+
+def make_item_dict(item_id: str) -> dict:
+    return {
+        "type": "Feature",
+        "stac_version": "1.0.0",
+        "id": item_id,
+        "properties": {"datetime": "2023-01-01T00:00:00Z"},
+        "geometry": {"type": "Point", "coordinates": [0, 0]},
+        "links": [],
+        "assets": {},
+        "bbox": [0, 0, 0, 0],
+        "stac_extensions": [],
+    }
+
+
+def make_request(**kwargs) -> ItemRequest:
+    return ItemRequest(
+        **{
+            "package_name": "stactools-test==1.0",
+            "group_name": "test",
+            "create_item_args": ["input/a.tif"],
+            **kwargs,
+        }
+    )
+
+
+@pytest.fixture(autouse=True)
+def package_versions(monkeypatch):
+    """Versions of stactools and the package in its environment, without building it."""
+    versions = {"stactools": "0.5.3", "stactools-test": "1.0"}
+    monkeypatch.setattr(item_cache, "package_versions", lambda package_name: versions)
+    monkeypatch.setattr(item_cache, "_s3_client", None)
+    return versions
+
+
+@pytest.fixture
+def source_versions(monkeypatch):
+    versions = {}
+    monkeypatch.setattr(item_cache, "source_version", versions.get)
+    return versions
+
+
+def test_item_cache_key_normalizes_request(source_versions):
+    key = item_cache.item_cache_key(
+        make_request(create_item_options={"a": "1", "b": "2"})
+    )
+
+    assert key == item_cache.item_cache_key(
+        make_request(create_item_options={"b": "2", "a": "1"}, collection_id="other")
+    )
+    assert key != item_cache.item_cache_key(
+        make_request(create_item_options={"a": "1", "b": "3"})
+    )
+    assert key != item_cache.item_cache_key(make_request(package_name="stactools-test"))
+    assert key != item_cache.item_cache_key(
+        make_request(create_item_args=["input/b.tif"])
+    )
+
+
+def test_item_cache_key_includes_source_versions(source_versions):
+    request = make_request(create_item_args=["https://example.com/a.tif"])
+    source_versions["https://example.com/a.tif"] = '"etag-1"'
+    key = item_cache.item_cache_key(request)
+
+    source_versions["https://example.com/a.tif"] = '"etag-2"'
+
+    assert item_cache.item_cache_key(request) != key
+
+
+def test_item_cache_key_includes_package_versions(source_versions, package_versions):
+    request = make_request(package_name="stactools-test")
+    key = item_cache.item_cache_key(request)
+
+    package_versions["stactools-test"] = "1.1"
+    assert item_cache.item_cache_key(request) != key
+    package_versions["stactools-test"] = "1.0"
+    package_versions["stactools"] = "0.6.0"
+    assert item_cache.item_cache_key(request) != key
+
+
+def test_get_s3_client_is_reused(monkeypatch):
+    clients = []
+
+    def _client(*args, **kwargs):
+        clients.append(kwargs)
+        return clients
+
+    monkeypatch.setattr(item_cache.boto3, "client", _client)
+
+    assert item_cache.get_s3_client() is item_cache.get_s3_client()
+    assert len(clients) == 1
+
+
+def test_source_version_from_http(monkeypatch):
+    class Response:
+        headers = {"Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"}
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            pass
+
+    requests = []
+
+    def _urlopen(request, timeout):
+        requests.append(request)
+        return Response()
+
+    monkeypatch.setattr(item_cache, "urlopen", _urlopen)
+
+    assert (
+        item_cache.source_version("https://example.com/a.tif")
+        == "Wed, 01 Jan 2025 00:00:00 GMT"
+    )
+    assert requests[0].get_method() == "HEAD"
+    assert item_cache.source_version("input/a.tif") is None
+
+
+@mock_s3
+def test_source_version_from_s3(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    s3 = boto3.client("s3", region_name="us-east-1")
+    s3.create_bucket(Bucket="data")
+    etag = s3.put_object(Bucket="data", Key="a.tif", Body=b"raster")["ETag"]
+
+    assert item_cache.source_version("s3://data/a.tif") == etag
+    assert item_cache.source_version("s3://data/missing.tif") is None
+
+
+def test_local_item_cache_round_trip(tmp_path):
+    cache = item_cache.LocalItemCache(tmp_path)
+
+    assert cache.get("ab12") is None
+    cache.put("ab12", make_item_dict("a"))
+
+    assert cache.get("ab12") == make_item_dict("a")
+    assert item_cache.LocalItemCache(tmp_path).total_bytes == cache.total_bytes
+
+
+def test_local_item_cache_evicts_least_recently_used(tmp_path):
+    size = len(item_cache.json_backend.dumps(make_item_dict("a")))
+    cache = item_cache.LocalItemCache(tmp_path, max_bytes=3 * size)
+    for i, key in enumerate(["aa", "bb", "cc"]):
+        cache.put(key, make_item_dict("a"))
+        os.utime(cache.path(key), (time.time() - 100 + i, time.time() - 100 + i))
+
+    cache.get("aa")
+    cache.put("dd", make_item_dict("a"))
+
+    assert cache.get("bb") is None
+    assert cache.get("aa") is not None
+    assert cache.get("cc") is not None
+    assert cache.get("dd") is not None
+    assert cache.total_bytes == 3 * size
+
+
+@mock_s3
+def test_s3_item_cache_round_trip(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    s3 = boto3.client("s3", region_name="us-east-1")
+    s3.create_bucket(Bucket="cache")
+    monkeypatch.setattr(item_cache, "ITEM_CACHE_URL", "s3://cache/items")
+    monkeypatch.setattr(item_cache, "_cache", None)
+
+    cache = item_cache.get_item_cache()
+
+    assert isinstance(cache, item_cache.S3ItemCache)
+    assert cache.get("ab12") is None
+    cache.put("ab12", make_item_dict("a"))
+    assert cache.get("ab12") == make_item_dict("a")
+    assert s3.head_object(Bucket="cache", Key="items/ab12.json")
+
+
+def test_create_stac_item_uses_cache(tmp_path, monkeypatch, source_versions):
+    monkeypatch.setattr(item_cache, "ITEM_CACHE_URL", str(tmp_path))
+    monkeypatch.setattr(item_cache, "_cache", None)
+    monkeypatch.setattr(item, "USE_STACTOOLS_WORKER", False)
+    commands = []
+
+    def _run_create_item_command(request):
+        commands.append(request)
+        return make_item_dict("a")
+
+    monkeypatch.setattr(item, "run_create_item_command", _run_create_item_command)
+
+    first = create_stac_item(make_request(collection_id="one"))
+    second = create_stac_item(make_request(collection_id="two"))
+
+    assert len(commands) == 1
+    assert first.id == second.id == "a"
+    assert (first.collection, second.collection) == ("one", "two")
+
+
+def test_item_cache_disabled_by_default(monkeypatch):
+    monkeypatch.setattr(item_cache, "ITEM_CACHE_URL", None)
+    assert item_cache.get_item_cache() is None
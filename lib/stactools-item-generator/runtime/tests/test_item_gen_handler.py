@@ -2,12 +2,14 @@ import json
 import logging
 import os
 import subprocess
+import threading
+import time
 from unittest.mock import patch
 
 import pytest
 from stac_pydantic.item import Item
 from stactools_item_generator import handler as item_gen_handler
-from stactools_item_generator.item import ItemRequest
+from stactools_item_generator.item import MANIFEST_TIMEOUT_SECONDS, ItemRequest
 
 
 @pytest.fixture(autouse=True)
@@ -17,6 +19,8 @@ def setup_environment(monkeypatch):
         "ITEM_LOAD_TOPIC_ARN", "arn:aws:sns:us-east-1:123456789012:fake-topic"
     )
     monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    # most tests hand out results in call order, so process records one by one
+    monkeypatch.setattr(item_gen_handler, "ITEM_CONCURRENCY", 1)
 
 
 @pytest.fixture
@@ -30,9 +34,15 @@ def mock_context(mocker):
 
 @pytest.fixture
 def mock_sns_client(mocker):
-    """Mock the boto3 SNS client and its publish method."""
+    """Mock the boto3 SNS client and its publish_batch method."""
     mock_client_instance = mocker.MagicMock()
-    mock_client_instance.publish.return_value = {"MessageId": "fake-sns-message-id"}
+    mock_client_instance.publish_batch.side_effect = lambda **kwargs: {
+        "Successful": [
+            {"Id": entry["Id"], "MessageId": "fake-sns-message-id"}
+            for entry in kwargs["PublishBatchRequestEntries"]
+        ],
+        "Failed": [],
+    }
 
     mock_boto_client = patch(
         "stactools_item_generator.handler.boto3.client",
@@ -119,6 +129,15 @@ def create_sqs_event(messages: list[dict]) -> dict:
     return {"Records": records}
 
 
+def published_messages(mock_sns_client) -> list[str]:
+    """Return the messages of every publish_batch call, in order."""
+    return [
+        entry["Message"]
+        for call in mock_sns_client.publish_batch.call_args_list
+        for entry in call.kwargs["PublishBatchRequestEntries"]
+    ]
+
+
 # --- Test Cases ---
 
 
@@ -166,9 +185,11 @@ def test_handler_success_single_message(
     assert call_args[0].collection_id == item_request_data["collection_id"]
 
     # Check SNS publish call
-    mock_sns_client.publish.assert_called_once_with(
+    mock_sns_client.publish_batch.assert_called_once_with(
         TopicArn=os.environ["ITEM_LOAD_TOPIC_ARN"],
-        Message=mock_create_stac_item.mock_item_json,
+        PublishBatchRequestEntries=[
+            {"Id": "0", "Message": mock_create_stac_item.mock_item_json}
+        ],
     )
 
     # Check logs
@@ -225,14 +246,13 @@ def test_handler_success_multiple_messages(
     # Assert
     assert result is None
     assert mock_create_stac_item.call_count == 2
-    assert mock_sns_client.publish.call_count == 2
-
-    # Check publish calls
-    assert mock_sns_client.publish.call_args_list[0] == mocker.call(
-        TopicArn=os.environ["ITEM_LOAD_TOPIC_ARN"], Message=item1_json
-    )
-    assert mock_sns_client.publish.call_args_list[1] == mocker.call(
-        TopicArn=os.environ["ITEM_LOAD_TOPIC_ARN"], Message=item2_json
+    # Both items are published with a single batch call
+    mock_sns_client.publish_batch.assert_called_once_with(
+        TopicArn=os.environ["ITEM_LOAD_TOPIC_ARN"],
+        PublishBatchRequestEntries=[
+            {"Id": "0", "Message": item1_json},
+            {"Id": "1", "Message": item2_json},
+        ],
     )
 
     assert "Successfully processed." in caplog.text
@@ -286,9 +306,7 @@ def test_handler_partial_failure_create_item(
 
     # Check calls
     assert mock_create_stac_item.call_count == 2
-    mock_sns_client.publish.assert_called_once_with(
-        TopicArn=os.environ["ITEM_LOAD_TOPIC_ARN"], Message=mock_item_ok_json
-    )
+    assert published_messages(mock_sns_client) == [mock_item_ok_json]
 
     # Check logs
     assert f"[{event['Records'][0]['messageId']}] Successfully processed." in caplog.text
@@ -300,11 +318,18 @@ def test_handler_partial_failure_create_item(
     assert "Finished processing batch. 1 failure(s) reported." in caplog.text
 
 
+@pytest.mark.parametrize("json_backend", ["json", "orjson"])
 def test_handler_partial_failure_json_decode(
-    mock_context, mock_sns_client, mock_create_stac_item, caplog
+    mock_context,
+    mock_sns_client,
+    mock_create_stac_item,
+    caplog,
+    monkeypatch,
+    json_backend,
 ):
-    """Test partial batch failure when JSON decoding fails."""
+    """Test partial batch failure when JSON decoding fails, with either backend."""
     # Arrange
+    monkeypatch.setattr(item_gen_handler.json_backend, "BACKEND", json_backend)
     item_request_data_ok = {
         "package_name": "stactools-ok",
         "group_name": "okgroup",
@@ -349,9 +374,7 @@ def test_handler_partial_failure_json_decode(
 
     # Check calls
     mock_create_stac_item.assert_called_once()
-    mock_sns_client.publish.assert_called_once_with(
-        TopicArn=os.environ["ITEM_LOAD_TOPIC_ARN"], Message=mock_item_ok_json
-    )
+    assert published_messages(mock_sns_client) == [mock_item_ok_json]
 
     # Check logs
     assert f"[{malformed_record['messageId']}] Failed to decode JSON:" in caplog.text
@@ -391,9 +414,7 @@ def test_handler_partial_failure_validation(
 
     # Check calls
     mock_create_stac_item.assert_called_once()
-    mock_sns_client.publish.assert_called_once_with(
-        TopicArn=os.environ["ITEM_LOAD_TOPIC_ARN"], Message=mock_item_ok_json
-    )
+    assert published_messages(mock_sns_client) == [mock_item_ok_json]
 
     # Check logs
     assert (
@@ -436,7 +457,7 @@ def test_handler_all_records_fail(
 
     # Check calls - should never call these since validation fails
     mock_create_stac_item.assert_not_called()
-    mock_sns_client.publish.assert_not_called()
+    mock_sns_client.publish_batch.assert_not_called()
 
     # Check logs
     assert "Finished processing batch. 2 failure(s) reported." in caplog.text
@@ -455,7 +476,7 @@ def test_handler_empty_batch(
     # Assert
     assert result is None
     mock_create_stac_item.assert_not_called()
-    mock_sns_client.publish.assert_not_called()
+    mock_sns_client.publish_batch.assert_not_called()
     assert "Received batch with 0 records." in caplog.text
     assert "Finished processing batch. All records successful." in caplog.text
 
@@ -505,7 +526,7 @@ def test_handler_sns_publish_failure(
     event = create_sqs_event([item_request_data])
 
     # Configure mock to simulate SNS publish failure
-    mock_sns_client.publish.side_effect = Exception("SNS publish failed")
+    mock_sns_client.publish_batch.side_effect = Exception("SNS publish failed")
 
     # Act
     result = item_gen_handler.handler(event, mock_context)
@@ -517,3 +538,428 @@ def test_handler_sns_publish_failure(
     # Check logs
     assert "SNS publish failed" in caplog.text
     assert f"[{event['Records'][0]['messageId']}] Marked as failed." in caplog.text
+
+
+def make_items(mock_create_stac_item, count, **properties):
+    """Create distinct items based on the mock item."""
+    return [
+        Item(
+            **{
+                **mock_create_stac_item.mock_item_dict,
+                "id": f"item_{i}",
+                "properties": {
+                    **mock_create_stac_item.mock_item_dict["properties"],
+                    **properties,
+                },
+            }
+        )
+        for i in range(count)
+    ]
+
+
+def item_request(i):
+    return {
+        "package_name": "stactools-test",
+        "group_name": "testgroup",
+        "create_item_args": [f"input/file_{i}.tif"],
+    }
+
+
+def test_handler_publishes_in_batches_of_ten(
+    mock_context, mock_sns_client, mock_create_stac_item
+):
+    """Test that items are published with PublishBatch in groups of at most ten."""
+    # Arrange
+    event = create_sqs_event([item_request(i) for i in range(23)])
+    items = make_items(mock_create_stac_item, 23)
+    mock_create_stac_item.side_effect = items
+
+    # Act
+    result = item_gen_handler.handler(event, mock_context)
+
+    # Assert
+    assert result is None
+    batch_sizes = [
+        len(call.kwargs["PublishBatchRequestEntries"])
+        for call in mock_sns_client.publish_batch.call_args_list
+    ]
+    assert batch_sizes == [10, 10, 3]
+    assert published_messages(mock_sns_client) == [
+        item.model_dump_json() for item in items
+    ]
+
+
+def test_handler_splits_batches_at_the_sns_payload_limit(
+    mock_context, mock_sns_client, mock_create_stac_item
+):
+    """Test that a batch never carries more than the SNS payload limit in total."""
+    # Arrange
+    event = create_sqs_event([item_request(i) for i in range(3)])
+    items = make_items(mock_create_stac_item, 3, padding="x" * 100_000)
+    mock_create_stac_item.side_effect = items
+
+    # Act
+    result = item_gen_handler.handler(event, mock_context)
+
+    # Assert
+    assert result is None
+    batch_sizes = [
+        len(call.kwargs["PublishBatchRequestEntries"])
+        for call in mock_sns_client.publish_batch.call_args_list
+    ]
+    assert batch_sizes == [2, 1]
+
+
+def test_handler_maps_failed_batch_entries_to_sqs_message_ids(
+    mock_context, mock_sns_client, mock_create_stac_item, caplog
+):
+    """Test that entries SNS rejects are reported as failures of their SQS message."""
+    # Arrange
+    event = create_sqs_event([item_request(i) for i in range(3)])
+    mock_create_stac_item.side_effect = make_items(mock_create_stac_item, 3)
+    mock_sns_client.publish_batch.side_effect = lambda **kwargs: {
+        "Successful": [
+            {"Id": "0", "MessageId": "sns-0"},
+            {"Id": "2", "MessageId": "sns-2"},
+        ],
+        "Failed": [
+            {
+                "Id": "1",
+                "Code": "InternalError",
+                "Message": "try again",
+                "SenderFault": False,
+            }
+        ],
+    }
+
+    # Act
+    result = item_gen_handler.handler(event, mock_context)
+
+    # Assert
+    assert result == {"batchItemFailures": [{"itemIdentifier": "sqs-msg-id-1"}]}
+    assert "[sqs-msg-id-1] SNS publish failed: InternalError: try again" in caplog.text
+    assert "[sqs-msg-id-0] Successfully processed." in caplog.text
+    assert "[sqs-msg-id-2] Successfully processed." in caplog.text
+
+
+def test_handler_offloads_oversized_items_to_s3(
+    mock_context, mock_sns_client, mock_create_stac_item, monkeypatch, mocker
+):
+    """Test that items over the SNS limit are written to S3 and a pointer is sent."""
+    # Arrange
+    monkeypatch.setenv("ITEM_OFFLOAD_BUCKET", "offload-bucket")
+    mock_s3_client = mocker.MagicMock()
+    mocker.patch(
+        "stactools_item_generator.handler.boto3.client",
+        side_effect=lambda service, **kwargs: (
+            mock_s3_client if service == "s3" else mock_sns_client
+        ),
+    )
+
+    event = create_sqs_event([item_request(0), item_request(1)])
+    small_item = make_items(mock_create_stac_item, 1)[0]
+    large_item = make_items(mock_create_stac_item, 2, padding="x" * 300_000)[1]
+    mock_create_stac_item.side_effect = [small_item, large_item]
+
+    # Act
+    result = item_gen_handler.handler(event, mock_context)
+
+    # Assert
+    assert result is None
+    key = "offloaded-items/test_collection/item_1.json"
+    mock_s3_client.put_object.assert_called_once_with(
+        Bucket="offload-bucket",
+        Key=key,
+        Body=large_item.model_dump_json().encode("utf-8"),
+        ContentType="application/json",
+    )
+    small_message, pointer_message = published_messages(mock_sns_client)
+    assert small_message == small_item.model_dump_json()
+    pointer = json.loads(pointer_message)
+    assert pointer["Records"][0]["eventSource"] == "aws:s3"
+    assert pointer["Records"][0]["s3"] == {
+        "bucket": {"name": "offload-bucket"},
+        "object": {"key": key},
+    }
+
+
+def test_handler_fails_oversized_items_without_offload_bucket(
+    mock_context, mock_sns_client, mock_create_stac_item, monkeypatch, caplog
+):
+    """Test that an item over the SNS limit fails when it cannot be offloaded."""
+    # Arrange
+    monkeypatch.delenv("ITEM_OFFLOAD_BUCKET", raising=False)
+    event = create_sqs_event([item_request(0), item_request(1)])
+    items = make_items(mock_create_stac_item, 2)
+    items[1] = make_items(mock_create_stac_item, 2, padding="x" * 300_000)[1]
+    mock_create_stac_item.side_effect = items
+
+    # Act
+    result = item_gen_handler.handler(event, mock_context)
+
+    # Assert
+    assert result == {"batchItemFailures": [{"itemIdentifier": "sqs-msg-id-1"}]}
+    assert published_messages(mock_sns_client) == [items[0].model_dump_json()]
+    assert "ITEM_OFFLOAD_BUCKET is not set" in caplog.text
+
+
+@pytest.mark.parametrize(
+    "memory_mb,concurrency",
+    [(128, 1), (512, 2), (1024, 2), (1769, 2), (3008, 4), (10240, 12)],
+)
+def test_default_item_concurrency(monkeypatch, memory_mb, concurrency):
+    monkeypatch.setenv("AWS_LAMBDA_FUNCTION_MEMORY_SIZE", str(memory_mb))
+    assert item_gen_handler.default_item_concurrency() == concurrency
+
+
+def test_handler_processes_records_concurrently(
+    mock_context, mock_sns_client, mock_create_stac_item, monkeypatch
+):
+    """Test that records are processed in parallel, up to ITEM_CONCURRENCY."""
+    # Arrange
+    monkeypatch.setattr(item_gen_handler, "ITEM_CONCURRENCY", 4)
+    event = create_sqs_event([item_request(i) for i in range(12)])
+    items = {
+        f"input/file_{i}.tif": item
+        for i, item in enumerate(make_items(mock_create_stac_item, 12))
+    }
+    running = 0
+    max_running = 0
+    lock = threading.Lock()
+
+    def _create_stac_item(request):
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return items[request.create_item_args[0]]
+
+    mock_create_stac_item.side_effect = _create_stac_item
+
+    # Act
+    result = item_gen_handler.handler(event, mock_context)
+
+    # Assert
+    assert result is None
+    assert max_running == 4
+    assert published_messages(mock_sns_client) == [
+        item.model_dump_json() for item in items.values()
+    ]
+
+
+def test_handler_reports_exact_failures_when_concurrent(
+    mock_context, mock_sns_client, mock_create_stac_item, monkeypatch
+):
+    """Test that concurrent processing reports exactly the records that failed."""
+    # Arrange
+    monkeypatch.setattr(item_gen_handler, "ITEM_CONCURRENCY", 4)
+    event = create_sqs_event([item_request(i) for i in range(10)])
+    items = make_items(mock_create_stac_item, 10)
+
+    def _create_stac_item(request):
+        i = int(request.create_item_args[0].split("_")[1].split(".")[0])
+        time.sleep(0.01 * (10 - i))
+        if i % 3 == 0:
+            raise ValueError(f"bad input {i}")
+        return items[i]
+
+    mock_create_stac_item.side_effect = _create_stac_item
+
+    # Act
+    result = item_gen_handler.handler(event, mock_context)
+
+    # Assert
+    assert result == {
+        "batchItemFailures": [{"itemIdentifier": f"sqs-msg-id-{i}"} for i in (0, 3, 6, 9)]
+    }
+    assert published_messages(mock_sns_client) == [
+        items[i].model_dump_json() for i in range(10) if i % 3
+    ]
+
+
+@pytest.fixture
+def mock_create_stac_items(mocker):
+    return mocker.patch("stactools_item_generator.handler.create_stac_items")
+
+
+def batch_request(count):
+    return {
+        "package_name": "stactools-test",
+        "group_name": "testgroup",
+        "create_item_args_list": [[f"input/file_{i}.tif"] for i in range(count)],
+    }
+
+
+def test_handler_streams_batch_request_items(
+    mock_context, mock_sns_client, mock_create_stac_item, mock_create_stac_items, caplog
+):
+    """Test that a batch request publishes its items as they are created."""
+    # Arrange
+    event = create_sqs_event([batch_request(23)])
+    items = make_items(mock_create_stac_item, 23)
+    published_before = []
+
+    def _create_stac_items(request):
+        assert request.create_item_args_list[5] == ["input/file_5.tif"]
+        for i, item in enumerate(items):
+            published_before.append(mock_sns_client.publish_batch.call_count)
+            if i in (3, 17):
+                yield (
+                    [f"input/file_{i}.tif"],
+                    subprocess.CalledProcessError(
+                        1, ["stac", "testgroup"], "", f"bad input {i}"
+                    ),
+                )
+            else:
+                yield [f"input/file_{i}.tif"], item
+
+    mock_create_stac_items.side_effect = _create_stac_items
+
+    # Act
+    result = item_gen_handler.handler(event, mock_context)
+
+    # Assert
+    assert result is None
+    mock_create_stac_item.assert_not_called()
+    assert published_messages(mock_sns_client) == [
+        item.model_dump_json() for i, item in enumerate(items) if i not in (3, 17)
+    ]
+    batch_sizes = [
+        len(call.kwargs["PublishBatchRequestEntries"])
+        for call in mock_sns_client.publish_batch.call_args_list
+    ]
+    assert batch_sizes == [10, 10, 1]
+    # the first ten items were published before the rest were created
+    assert published_before[11] == 1
+    assert "[sqs-msg-id-0] [input 3] Subprocess command failed:" in caplog.text
+    assert "bad input 17" in caplog.text
+    assert "[sqs-msg-id-0] Batch request created 21 item(s), 2 input(s) failed." in (
+        caplog.text
+    )
+    assert "[sqs-msg-id-0] Successfully processed." in caplog.text
+
+
+def test_handler_fails_batch_request_when_publishing_fails(
+    mock_context, mock_sns_client, mock_create_stac_item, mock_create_stac_items
+):
+    """Test that a batch request is retried when some of its items were not published."""
+    # Arrange
+    event = create_sqs_event([item_request(0), batch_request(2)])
+    items = make_items(mock_create_stac_item, 3)
+    mock_create_stac_item.return_value = items[0]
+    mock_create_stac_items.return_value = (
+        result
+        for result in [(["input/file_0.tif"], items[1]), (["input/file_1.tif"], items[2])]
+    )
+    # the batch request publishes first, while the single item waits for the
+    # end of the SQS batch
+    mock_sns_client.publish_batch.side_effect = [
+        {
+            "Successful": [{"Id": "0", "MessageId": "m"}],
+            "Failed": [{"Id": "1", "Code": "Throttled", "Message": "slow down"}],
+        },
+        {"Successful": [{"Id": "0", "MessageId": "m"}], "Failed": []},
+    ]
+
+    # Act
+    result = item_gen_handler.handler(event, mock_context)
+
+    # Assert
+    assert result == {"batchItemFailures": [{"itemIdentifier": "sqs-msg-id-1"}]}
+
+
+def test_handler_closes_batch_items_when_publishing_raises(
+    mock_context, mock_sns_client, mock_create_stac_item, mock_create_stac_items
+):
+    """Test that the item generator is closed, returning its worker, on errors."""
+    # Arrange
+    event = create_sqs_event([batch_request(12)])
+    items = make_items(mock_create_stac_item, 12)
+    closed = []
+
+    def _create_stac_items(request):
+        try:
+            for i, item in enumerate(items):
+                yield [f"input/file_{i}.tif"], item
+        finally:
+            closed.append(True)
+
+    mock_create_stac_items.side_effect = _create_stac_items
+    mock_sns_client.publish_batch.side_effect = RuntimeError("SNS is down")
+
+    # Act
+    result = item_gen_handler.handler(event, mock_context)
+
+    # Assert
+    assert result == {"batchItemFailures": [{"itemIdentifier": "sqs-msg-id-0"}]}
+    assert closed == [True]
+
+
+def test_handler_fails_batch_request_when_manifest_times_out(
+    mock_context, mock_sns_client, mock_create_stac_item, mocker
+):
+    """Test that a stalled manifest host fails only its batch request."""
+    # Arrange
+    event = create_sqs_event(
+        [
+            {
+                "package_name": "stactools-test",
+                "group_name": "testgroup",
+                "manifest_url": "https://example.com/manifest.txt",
+            },
+            item_request(1),
+        ]
+    )
+    mock_create_stac_item.return_value = make_items(mock_create_stac_item, 1)[0]
+    urlopen = mocker.patch(
+        "stactools_item_generator.item.urlopen",
+        side_effect=TimeoutError("timed out"),
+    )
+
+    # Act
+    result = item_gen_handler.handler(event, mock_context)
+
+    # Assert
+    assert result == {"batchItemFailures": [{"itemIdentifier": "sqs-msg-id-0"}]}
+    urlopen.assert_called_once_with(
+        "https://example.com/manifest.txt",
+        timeout=MANIFEST_TIMEOUT_SECONDS,
+    )
+    assert len(published_messages(mock_sns_client)) == 1
+
+
+def test_handler_rejects_invalid_batch_request(
+    mock_context, mock_sns_client, mock_create_stac_items
+):
+    """Test that a batch request without inputs fails validation."""
+    # Arrange
+    event = create_sqs_event([{**batch_request(0), "manifest_url": None}])
+
+    # Act
+    result = item_gen_handler.handler(event, mock_context)
+
+    # Assert
+    assert result == {"batchItemFailures": [{"itemIdentifier": "sqs-msg-id-0"}]}
+    mock_create_stac_items.assert_not_called()
+
+
+def test_handler_returns_readiness(mock_context, mocker):
+    """Test that a readiness invocation reports the pre-warmed packages."""
+    packages = [
+        {
+            "package_name": "stactools-test",
+            "group_name": "testgroup",
+            "environment_ready": True,
+            "worker_ready": True,
+            "seconds": 1.5,
+            "error": None,
+        }
+    ]
+    mocker.patch("stactools_item_generator.handler.readiness", return_value=packages)
+
+    result = item_gen_handler.handler({"action": "readiness"}, mock_context)
+
+    assert result == {"packages": packages}
@@ -0,0 +1,117 @@
+import json
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+from stactools_item_generator import environment, prewarm
+
+PACKAGES = [
+    {"package_name": "stactools-ok==1.0", "group_name": "ok"},
+    {"package_name": "stactools-broken", "group_name": "broken"},
+]
+
+
+@pytest.fixture
+def configured(monkeypatch):
+    monkeypatch.setattr(prewarm, "STACTOOLS_PREWARM", json.dumps(PACKAGES))
+    monkeypatch.setattr(prewarm, "_readiness", {})
+
+
+@pytest.fixture
+def workers(monkeypatch):
+    pinged = []
+
+    class FakeWorker:
+        def __init__(self, package_name, group_name):
+            self.package_name = package_name
+            self.group_name = group_name
+
+        def ping(self):
+            pinged.append((self.package_name, self.group_name))
+
+    @contextmanager
+    def _acquire_worker(package_name, group_name):
+        yield FakeWorker(package_name, group_name)
+
+    def _get_environment(package_name):
+        if package_name == "stactools-broken":
+            raise RuntimeError("no matching distribution")
+        return Path("/envs") / environment.environment_key(package_name)
+
+    monkeypatch.setattr(prewarm, "acquire_worker", _acquire_worker)
+    monkeypatch.setattr(environment, "get_environment", _get_environment)
+    return pinged
+
+
+def test_prewarm_packages():
+    assert prewarm.prewarm_packages("") == []
+    assert prewarm.prewarm_packages(json.dumps(PACKAGES)) == [
+        ("stactools-ok==1.0", "ok"),
+        ("stactools-broken", "broken"),
+    ]
+
+
+def test_prewarm_all(configured, workers):
+    assert [status["package_name"] for status in prewarm.readiness()] == [
+        "stactools-ok==1.0",
+        "stactools-broken",
+    ]
+    assert not any(status["environment_ready"] for status in prewarm.readiness())
+
+    prewarm.prewarm_all()
+
+    ok, broken = prewarm.readiness()
+    assert ok["environment_ready"] and ok["worker_ready"] and ok["error"] is None
+    assert not broken["environment_ready"] and not broken["worker_ready"]
+    assert broken["error"] == "no matching distribution"
+    assert workers == [("stactools-ok==1.0", "ok")]
+
+
+def test_prewarm_build_only(configured, workers):
+    results = prewarm.prewarm_all(start_worker=False)
+
+    assert results[0]["environment_ready"] and not results[0]["worker_ready"]
+    assert workers == []
+
+
+def test_prewarm_prebuilt_only(configured, workers, monkeypatch):
+    def _prebuilt_environment(package_name):
+        if package_name == "stactools-ok==1.0":
+            return Path("/image") / environment.environment_key(package_name)
+        return None
+
+    def _get_environment(package_name):
+        assert package_name == "stactools-ok==1.0", "built during init"
+        return Path("/image") / environment.environment_key(package_name)
+
+    monkeypatch.setattr(environment, "prebuilt_environment", _prebuilt_environment)
+    monkeypatch.setattr(environment, "get_environment", _get_environment)
+
+    ok, skipped = prewarm.prewarm_all(prebuilt_only=True)
+
+    assert ok["environment_ready"] and ok["worker_ready"]
+    assert not skipped["environment_ready"] and not skipped["worker_ready"]
+    assert skipped["error"] is None
+    assert workers == [("stactools-ok==1.0", "ok")]
+
+
+def test_prebuilt_environment(tmp_path, monkeypatch):
+    monkeypatch.setattr(environment, "STACTOOLS_PREBUILT_ENV_DIR", tmp_path)
+    prebuilt = tmp_path / environment.environment_key("stactools-ok==1.0")
+    prebuilt.mkdir()
+
+    assert environment.prebuilt_environment("stactools-ok==1.0") is None
+    (prebuilt / environment.READY_MARKER).touch()
+    assert environment.prebuilt_environment("stactools-ok==1.0") == prebuilt
+
+
+def test_get_environment_prefers_prebuilt(tmp_path, monkeypatch):
+    monkeypatch.setattr(environment, "STACTOOLS_ENV_DIR", tmp_path / "cache")
+    monkeypatch.setattr(environment, "STACTOOLS_PREBUILT_ENV_DIR", tmp_path / "image")
+    monkeypatch.setattr(environment, "_environments", {})
+    monkeypatch.setattr(environment, "build_environment", pytest.fail, raising=True)
+    prebuilt = tmp_path / "image" / environment.environment_key("stactools-ok==1.0")
+    prebuilt.mkdir(parents=True)
+    (prebuilt / environment.READY_MARKER).touch()
+
+    assert environment.get_environment("stactools-ok==1.0") == prebuilt
@@ -0,0 +1,128 @@
+import math
+import subprocess
+import sys
+import textwrap
+
+import pytest
+from stactools_item_generator import worker
+
+FAKE_WORKER = textwrap.dedent(
+    """
+    import json
+    import os
+    import sys
+
+    group_name = sys.argv[1]
+    for line in sys.stdin:
+        request = json.loads(line)
+        if request.get("ping"):
+            sys.stdout.write(json.dumps({"ok": True}) + "\\n")
+            sys.stdout.flush()
+            continue
+        source = request["args"][0]
+        if source == "crash-once" and not os.path.exists(sys.argv[2]):
+            open(sys.argv[2], "w").close()
+            os._exit(1)
+        if source == "crash":
+            os._exit(1)
+        if source == "fail":
+            response = {"ok": False, "error": "ValueError: bad", "traceback": "tb"}
+        elif source == "nan":
+            response = {"ok": True, "item": {"id": source, "nodata": float("nan")}}
+        else:
+            item = {"id": source, "group": group_name, "pid": os.getpid()}
+            item.update(request["options"])
+            response = {"ok": True, "item": item}
+        sys.stdout.write(json.dumps(response) + "\\n")
+        sys.stdout.flush()
+    """
+)
+
+
+@pytest.fixture
+def fake_worker(tmp_path, monkeypatch):
+    script = tmp_path / "fake_worker.py"
+    script.write_text(FAKE_WORKER)
+    crash_marker = tmp_path / "crashed"
+
+    def _command(self):
+        return [sys.executable, str(script), self.group_name, str(crash_marker)]
+
+    monkeypatch.setattr(worker.StactoolsWorker, "command", _command)
+    stactools_worker = worker.StactoolsWorker("stactools-fake", "fake")
+    yield stactools_worker
+    stactools_worker.stop()
+
+
+def test_worker_reused_across_items(fake_worker):
+    first = fake_worker.create_item(["item-1"], {"delay": "0"})
+    second = fake_worker.create_item(["item-2"], {})
+
+    assert first == {"id": "item-1", "group": "fake", "pid": first["pid"], "delay": "0"}
+    assert second["id"] == "item-2"
+    assert first["pid"] == second["pid"]
+
+
+def test_worker_item_with_nan(fake_worker):
+    item = fake_worker.create_item(["nan"], {})
+
+    assert item["id"] == "nan"
+    assert math.isnan(item["nodata"])
+
+
+def test_worker_ping_starts_worker(fake_worker):
+    assert not fake_worker.is_alive()
+
+    fake_worker.ping()
+
+    assert fake_worker.is_alive()
+    pid = fake_worker.process.pid
+    assert fake_worker.create_item(["item-1"], {})["pid"] == pid
+
+
+def test_worker_restarts_after_crash(fake_worker):
+    first = fake_worker.create_item(["item-1"], {})
+    item = fake_worker.create_item(["crash-once"], {})
+
+    assert item["id"] == "crash-once"
+    assert item["pid"] != first["pid"]
+    assert fake_worker.is_alive()
+
+
+def test_worker_gives_up_after_repeated_crash(fake_worker):
+    with pytest.raises(RuntimeError, match="exited while creating an item"):
+        fake_worker.create_item(["crash"], {})
+
+    assert fake_worker.create_item(["item-1"], {})["id"] == "item-1"
+
+
+def test_worker_command_failure(fake_worker):
+    with pytest.raises(subprocess.CalledProcessError) as exc_info:
+        fake_worker.create_item(["fail"], {"asset-key": "data"})
+
+    assert exc_info.value.cmd == [
+        "stac",
+        "fake",
+        "create-item",
+        "fail",
+        "--asset-key",
+        "data",
+    ]
+    assert exc_info.value.stderr == "tb"
+    assert fake_worker.is_alive()
+
+
+def test_acquire_worker(monkeypatch):
+    monkeypatch.setattr(worker, "_idle_workers", {})
+    monkeypatch.setattr(worker, "_all_workers", [])
+
+    with worker.acquire_worker("stactools-fake", "fake") as first:
+        with worker.acquire_worker("stactools-fake", "fake") as second:
+            assert second is not first
+        with worker.acquire_worker("stactools-fake", "other") as other:
+            assert other.group_name == "other"
+
+    with worker.acquire_worker("stactools-fake", "fake") as reused:
+        assert reused in (first, second)
+
+    assert len(worker._all_workers) == 3